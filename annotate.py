@@ -0,0 +1,172 @@
+import multiprocessing
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Optional, List, Tuple, Iterable, Iterator
+from grammar import *
+from lexicon import *
+
+# Annotates running text with the lexicon: every token gets its lemma, UPOS tag and
+# inflection code, in a CoNLL-U-like layout with one sentence block per input line.
+#
+#   # text = Собаки спят.
+#   1  Собаки  собака  NOUN  2  Case=Nom|Number=Plur  _  _  _  Codes=2,3
+#   2  спят  _  X  _  _  _  _  _  _
+#   3  .  _  PUNCT  _  _  _  _  _  _
+#
+# The inflection code goes in the XPOS column and its Universal Dependencies features in
+# FEATS; when a form has several readings the first is given and MISC lists the codes of
+# all of them (_ for an uninflected reading). Columns the lexicon knows nothing about are
+# left as _.
+
+# words may carry stress marks and be hyphenated (кто-нибудь); anything else that is not
+# space is a token of its own
+TOKEN = re.compile(r'[\w\u0301\u0300]+(?:-[\w\u0301\u0300]+)*|[^\w\s]')
+
+# distinct tokens whose readings each annotator keeps; running text is dominated by a few
+# thousand of them
+READINGS_CACHE_SIZE = 65536
+
+# lines handed to a worker at a time, and batches in flight per worker
+BATCH_LINES = 1000
+BATCHES_PER_PROCESS = 2
+
+Reading = Tuple[str, SpeechPart, Optional[int]]
+
+
+def tokenize(line: str) -> List[str]:
+    """
+    Splits a line of text into tokens
+    :param line: The text
+    :return: The words and punctuation marks, in order
+    """
+    return TOKEN.findall(line)
+
+
+class Annotator(object):
+    """
+    Annotates text against a mapped lexicon, remembering the readings of frequent tokens
+    """
+    def __init__(self, lexicon: MappedLexicon, cache_size: int = READINGS_CACHE_SIZE):
+        """
+        Returns a new annotator
+        :param lexicon: The mapped lexicon
+        :param cache_size: The most distinct tokens whose readings are remembered
+        """
+        self.lexicon = lexicon
+        self.readings = lru_cache(maxsize=cache_size)(self.find_readings)
+
+    def find_readings(self, token: str) -> List[Reading]:
+        """
+        Looks a token up: as an uninflected word and as an inflected form, and failing both
+        regardless of stress marks, ё and case (a capitalized first word, a form typed without stress)
+        :param token: The token
+        :return: A list of (lemma, SpeechPart, inflection code or None for an uninflected word) tuples;
+        uninflected readings come first, as function words (но, к) are far more frequent than their homographs
+        """
+        readings: List[Reading] = [(entry.lemma, entry.pos, None)
+                                   for entry in self.lexicon.lookup(token) if not entry.forms]
+        readings.extend(self.lexicon.lookup_form(token))
+        if not readings:
+            for match in self.lexicon.lookup_normalized(token):
+                entry = self.lexicon.entry(match.entry)
+                if not entry.forms:
+                    found = [(entry.lemma, entry.pos, None)]
+                else:
+                    found = [(entry.lemma, entry.pos, code) for (form, code) in entry.forms if form == match.form]
+                readings.extend(reading for reading in found if reading not in readings)
+        return readings
+
+    def token_line(self, idx: int, token: str) -> str:
+        """
+        Returns the line of one token
+        :param idx: The token's 1-based position in its sentence
+        :param token: The token
+        :return: The ten tab-separated columns
+        """
+        readings = self.readings(token)
+        (lemma, upos, xpos, feats, misc) = ('_', 'X', '_', '_', '_')
+        if readings:
+            (lemma, pos, code) = readings[0]
+            upos = pos.to_upos() or 'X'
+            if code is not None:
+                (xpos, feats) = (str(code), code2feats(code) or '_')
+            if len(readings) > 1:
+                misc = 'Codes=' + ','.join('_' if code is None else str(code) for (_, _, code) in readings)
+        elif not token[0].isalnum():
+            upos = 'PUNCT'
+        return '\t'.join([str(idx), token, lemma, upos, xpos, feats, '_', '_', '_', misc])
+
+    def annotate_line(self, line: str) -> str:
+        """
+        Annotates one line of text as a sentence
+        :param line: The text
+        :return: The sentence block, ending with a blank line; empty for a blank line
+        """
+        line = line.strip()
+        if not line:
+            return ''
+        lines = [f'# text = {line}']
+        lines.extend(self.token_line(idx, token) for (idx, token) in enumerate(tokenize(line), 1))
+        return '\n'.join(lines) + '\n\n'
+
+    def annotate_batch(self, lines: List[str]) -> str:
+        return ''.join(self.annotate_line(line) for line in lines)
+
+
+# the annotator of a pool worker, made by init_worker
+_worker_annotator: Optional[Annotator] = None
+
+
+def init_worker(path: str):
+    """
+    Maps the lexicon in a pool worker; the pages are shared with every other process mapping it
+    :param path: The lexicon file
+    :return: Nothing
+    """
+    global _worker_annotator
+    _worker_annotator = Annotator(MappedLexicon(path))
+
+
+def annotate_worker_batch(lines: List[str]) -> str:
+    return _worker_annotator.annotate_batch(lines)
+
+
+def batches(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def annotate_lines(lines: Iterable[str], path: str, processes: Optional[int] = 1,
+                   batch_lines: int = BATCH_LINES) -> Iterator[str]:
+    """
+    Annotates text, reading it and producing the annotation as it goes
+    :param lines: The text, line by line
+    :param path: The lexicon file
+    :param processes: Worker processes; 1 annotates in this process, None uses one per CPU
+    :param batch_lines: Lines handed to a worker at a time
+    :return: An iterator of annotated chunks, in input order; at most a few batches per worker
+    are held in memory at a time, whatever the size of the input
+    """
+    if processes == 1:
+        with MappedLexicon(path) as lexicon:
+            annotator = Annotator(lexicon)
+            for batch in batches(lines, batch_lines):
+                yield annotator.annotate_batch(batch)
+        return
+    with multiprocessing.Pool(processes, init_worker, (path,)) as pool:
+        # Pool.imap would read the whole input ahead, so batches are submitted only as results are taken
+        limit = (processes or multiprocessing.cpu_count()) * BATCHES_PER_PROCESS
+        pending = deque()
+        for batch in batches(lines, batch_lines):
+            pending.append(pool.apply_async(annotate_worker_batch, (batch,)))
+            if len(pending) >= limit:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
@@ -0,0 +1,435 @@
+import asyncio
+import json
+import socket
+import ssl
+import time
+import urllib.error
+import urllib.parse
+from concurrent.futures import Executor
+from functools import lru_cache
+from typing import Optional, Tuple, FrozenSet
+from service import *
+from singleflight import AsyncSingleFlight
+
+# An ASGI application with the same /forms/<w> contract as the Flask app in main.py.
+# The Wiktionary fetch runs on the event loop, so a worker holds thousands of lookups
+# in flight at once; only the parse, which is CPU-bound, goes to an executor (lxml
+# releases the GIL while it builds the tree, so threads overlap there).
+#
+#   uvicorn asgi:app                       or      main.py runserver --asgi
+FORMS_PREFIX = '/forms/'
+SUGGEST_PREFIX = '/suggest/'
+ENDINGS_PREFIX = '/endings/'
+COMPLETE_PREFIX = '/complete/'
+MAX_REDIRECTS = 5
+# the largest page and the most response headers accepted from Wiktionary, whose biggest pages are
+# a few megabytes; a longer response is an upstream error rather than a reason to run out of memory
+MAX_PAGE_BYTES = 32 * 1024 * 1024
+MAX_RESPONSE_HEADERS = 200
+# the largest request body accepted, on POST /inflect
+MAX_REQUEST_BYTES = 4 * 1024 * 1024
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+@lru_cache()
+def ssl_context() -> ssl.SSLContext:
+    return ssl.create_default_context()
+
+
+async def read_body(reader: asyncio.StreamReader, headers: dict, limit: int = MAX_PAGE_BYTES) -> bytes:
+    """
+    Reads a response body
+    :param reader: The stream positioned after the response headers
+    :param headers: The response headers, with lower-cased names
+    :param limit: The most bytes to accept
+    :return: The body
+    :raises ValueError: if the body is longer than limit or its framing is malformed
+    :raises asyncio.IncompleteReadError: if the connection closes before the body ends
+    """
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        body = bytearray()
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise asyncio.IncompleteReadError(bytes(body), None)
+            size = int(line.split(b';')[0], 16)
+            if size == 0:
+                return bytes(body)
+            if len(body) + size > limit:
+                raise ValueError(f'Response body over {limit} bytes')
+            body += await reader.readexactly(size)
+            if await reader.readline() != b'\r\n':
+                raise ValueError('Malformed chunk')
+    if 'content-length' in headers:
+        length = int(headers['content-length'])
+        if not 0 <= length <= limit:
+            raise ValueError(f'Response body of {length} bytes, over {limit}')
+        return await reader.readexactly(length)
+    body = await reader.read(limit + 1)
+    while len(body) <= limit:
+        more = await reader.read(limit + 1 - len(body))
+        if not more:
+            return body
+        body += more
+    raise ValueError(f'Response body over {limit} bytes')
+
+
+async def fetch_page(url: str, headers: dict, redirects: int = MAX_REDIRECTS) -> Optional[bytes]:
+    """
+    Fetches a page without blocking the event loop
+    :param url: The page URL, already quoted
+    :param headers: Extra request headers
+    :param redirects: How many more redirects to follow
+    :return: The page content
+    :raises urllib.error.HTTPError: for an error status, as urlopen raises it on the blocking path
+    :raises ValueError: for a malformed response, or one with too many headers or too long a body
+    """
+    parts = urllib.parse.urlsplit(url)
+    https = parts.scheme == 'https'
+    (reader, writer) = await asyncio.open_connection(parts.hostname, parts.port or (443 if https else 80),
+                                                     ssl=ssl_context() if https else None)
+    try:
+        target = parts.path + (f'?{parts.query}' if parts.query else '')
+        lines = [f'GET {target} HTTP/1.0', f'Host: {parts.netloc}']
+        lines.extend(f'{name}: {value}' for (name, value) in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        try:
+            # at most the reader's limit, 64 KiB
+            head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+        except asyncio.LimitOverrunError as e:
+            raise ValueError('Response headers too long') from e
+        (status_line, *header_lines) = head.split('\r\n')
+        if len(header_lines) > MAX_RESPONSE_HEADERS:
+            raise ValueError(f'Over {MAX_RESPONSE_HEADERS} response headers')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        for line in header_lines:
+            if ':' in line:
+                (name, value) = line.split(':', 1)
+                response_headers[name.strip().lower()] = value.strip()
+        if status in REDIRECT_STATUSES and 'location' in response_headers and redirects > 0:
+            location = urllib.parse.urljoin(url, response_headers['location'])
+            return await fetch_page(location, headers, redirects - 1)
+        if status >= 300:
+            raise urllib.error.HTTPError(url, status, status_line.split(None, 2)[-1], response_headers, None)
+        return await read_body(reader, response_headers, MAX_PAGE_BYTES)
+    finally:
+        writer.close()
+
+
+async def fetch_word(page: RuWikitionary) -> Optional[bytes]:
+    """
+    Fetches a word's page with the page's URL, headers and timeout
+    :param page: The page to fetch
+    :return: The page content, or None if there is no page for the word
+    :raises UpstreamError: if Wiktionary cannot be reached, does not answer in time, answers with an error
+    status other than 404 or with a malformed or oversized response
+    """
+    try:
+        return await asyncio.wait_for(fetch_page(page.url, page.request_headers()), page.timeout)
+    except urllib.error.HTTPError as e:
+        return page_not_found(page.word, e)
+    except asyncio.TimeoutError as e:
+        raise UpstreamError(page.word, socket.timeout('timed out')) from e
+    except (OSError, EOFError, ValueError) as e:
+        raise UpstreamError(page.word, e) from e
+
+
+async def request_body(receive, limit: int = MAX_REQUEST_BYTES) -> Optional[bytes]:
+    """
+    Reads a request body
+    :param receive: The ASGI receive callable
+    :param limit: The most bytes to accept
+    :return: The body, or None if it is longer than limit or the client went away
+    """
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body += message.get('body', b'')
+        if len(body) > limit:
+            return None
+        if not message.get('more_body'):
+            return bytes(body)
+
+
+def request_headers(scope) -> dict:
+    """
+    Returns the headers of an ASGI request
+    :param scope: The request scope
+    :return: A dict of lower-cased header name to value
+    """
+    return {name.decode('latin-1').lower(): value.decode('latin-1') for (name, value) in scope.get('headers', [])}
+
+
+def query_arguments(scope) -> dict:
+    """
+    Returns the query arguments of an ASGI request
+    :param scope: The request scope
+    :return: A dict of argument name to its first value
+    """
+    query = urllib.parse.parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    return {name: values[0] for (name, values) in query.items()}
+
+
+class FormsApp(object):
+    """
+    ASGI application serving /forms/<w>
+    """
+    def __init__(self, lexicon: Optional[MappedLexicon] = None, executor: Optional[Executor] = None,
+                 cache: Optional[ResponseCache] = None, max_age: int = MAX_AGE,
+                 negative_max_age: int = NEGATIVE_MAX_AGE, index: Optional[SymmetricDeleteIndex] = None,
+                 suffixes: Optional[SuffixIndex] = None, completions: Optional[CompletionTrie] = None):
+        """
+        Returns a new application
+        :param lexicon: Words found in this lexicon are served without fetching them
+        :param executor: Where pages are parsed; None uses the event loop's default thread pool
+        :param cache: Where fetched answers are kept, or None to fetch every time
+        :param max_age: Cache-Control max-age of a found word
+        :param negative_max_age: Cache-Control max-age of a "not found" answer
+        :param index: The fuzzy index behind /suggest, which fetched words are added to; None answers /suggest
+        with 404 and keeps no index
+        :param suffixes: The suffix index of the lexicon behind /endings, or None to answer it with 404
+        :param completions: The completion trie of the lexicon behind /complete, or None to answer it with 404
+        """
+        self.lexicon = lexicon
+        self.executor = executor
+        self.cache = cache
+        self.max_age = max_age
+        self.negative_max_age = negative_max_age
+        self.flights = AsyncSingleFlight()
+        self.index = index
+        self.suffixes = suffixes
+        self.completions = completions
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        if scope['path'] == '/stats' and scope['method'] in ('GET', 'HEAD'):
+            await self.respond(scope, send, stats_output(self.cache, self.flights), 200)
+            return
+        if scope['path'] == '/export' and scope['method'] in ('GET', 'HEAD'):
+            await self.export(scope, send)
+            return
+        if scope['path'].startswith(SUGGEST_PREFIX) and scope['method'] in ('GET', 'HEAD'):
+            await self.suggest(scope, send, scope['path'][len(SUGGEST_PREFIX):])
+            return
+        if scope['path'].startswith(ENDINGS_PREFIX) and scope['method'] in ('GET', 'HEAD'):
+            await self.endings(scope, send, scope['path'][len(ENDINGS_PREFIX):])
+            return
+        if scope['path'] == '/inflect' and scope['method'] == 'POST':
+            await self.inflect(scope, receive, send)
+            return
+        if scope['path'].startswith(COMPLETE_PREFIX) and scope['method'] in ('GET', 'HEAD'):
+            await self.complete(scope, send, scope['path'][len(COMPLETE_PREFIX):])
+            return
+        ru_word = scope['path'][len(FORMS_PREFIX):]
+        if scope['method'] not in ('GET', 'HEAD') or not scope['path'].startswith(FORMS_PREFIX) \
+                or not ru_word or '/' in ru_word:
+            await self.respond(scope, send, {'error': 'Not found'}, 404)
+            return
+        try:
+            arguments = query_arguments(scope)
+            (codes, upos) = forms_arguments(arguments)
+            features = features_argument(arguments)
+        except ValueError as e:
+            await self.respond(scope, send, {'inp': request_key(ru_word), 'error': str(e)}, 400)
+            return
+        (w_output, status, modified) = await self.word_output(ru_word, codes, upos)
+        if features:
+            w_output = with_features(w_output)
+        headers = caching_headers(w_output, status, modified, self.max_age, self.negative_max_age)
+        received = request_headers(scope)
+        if not_modified(headers, received.get('if-none-match'), received.get('if-modified-since')):
+            await self.respond(scope, send, None, 304, headers)
+            return
+        await self.respond(scope, send, w_output, status, headers)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def export(self, scope, send):
+        """
+        Streams the lexicon as NDJSON, as /export in main.py does, reading each chunk in the executor
+        :param scope: The request scope
+        :param send: The ASGI send callable
+        :return: Nothing
+        """
+        if self.lexicon is None:
+            await self.respond(scope, send, {'error': 'No lexicon is loaded'}, 404)
+            return
+        try:
+            arguments = query_arguments(scope)
+            (cursor, limit) = export_arguments(arguments)
+        except ValueError:
+            await self.respond(scope, send, {'error': 'cursor and limit must be non-negative integers'}, 400)
+            return
+        compress = accepts_gzip(request_headers(scope).get('accept-encoding'))
+        headers = [(b'content-type', b'application/x-ndjson'), (b'vary', b'Accept-Encoding'),
+                   (b'access-control-allow-origin', b'*')]
+        if compress:
+            headers.append((b'content-encoding', b'gzip'))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        if scope['method'] != 'HEAD':
+            # reading, encoding and compressing a chunk runs in the executor so the event loop keeps serving
+            # other requests; each send waits for the client to take the chunk, so a slow reader holds back
+            # the reading
+            loop = asyncio.get_running_loop()
+            chunks = export_chunks(self.lexicon, cursor, limit, compress, export_compact(arguments))
+            while True:
+                chunk = await loop.run_in_executor(self.executor, next, chunks, None)
+                if chunk is None:
+                    break
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def suggest(self, scope, send, ru_word: str):
+        """
+        Answers /suggest/<w> from the fuzzy index, as main.py does
+        :param scope: The request scope
+        :param send: The ASGI send callable
+        :param ru_word: The word, possibly misspelled
+        :return: Nothing
+        """
+        if self.index is None:
+            await self.respond(scope, send, {'error': SUGGESTIONS_NOT_LOADED}, 404)
+            return
+        try:
+            w_output = suggest_output(self.index, request_key(ru_word), query_arguments(scope))
+        except ValueError:
+            await self.respond(scope, send, {'error': 'distance and limit must be non-negative integers'}, 400)
+            return
+        await self.respond(scope, send, w_output, 200)
+
+    async def endings(self, scope, send, suffix: str):
+        """
+        Answers /endings/<suffix> from the suffix index, as main.py does
+        :param scope: The request scope
+        :param send: The ASGI send callable
+        :param suffix: The ending
+        :return: Nothing
+        """
+        if self.suffixes is None:
+            await self.respond(scope, send, {'error': ENDINGS_NOT_LOADED}, 404)
+            return
+        suffix = request_key(suffix)
+        try:
+            w_output = endings_output(self.suffixes, suffix, query_arguments(scope))
+        except ValueError as e:
+            await self.respond(scope, send, {'inp': suffix, 'error': str(e)}, 400)
+            return
+        await self.respond(scope, send, w_output, 200)
+
+    async def complete(self, scope, send, prefix: str):
+        """
+        Answers /complete/<prefix> from the completion trie, as main.py does
+        :param scope: The request scope
+        :param send: The ASGI send callable
+        :param prefix: What has been typed so far
+        :return: Nothing
+        """
+        if self.completions is None:
+            await self.respond(scope, send, {'error': COMPLETIONS_NOT_LOADED}, 404)
+            return
+        try:
+            w_output = complete_output(self.completions, request_key(prefix), query_arguments(scope))
+        except ValueError:
+            await self.respond(scope, send, {'error': 'limit must be a non-negative integer'}, 400)
+            return
+        await self.respond(scope, send, w_output, 200)
+
+    async def inflect(self, scope, receive, send):
+        """
+        Answers POST /inflect from the lexicon, as main.py does; the lookups run in the executor
+        :param scope: The request scope
+        :param receive: The ASGI receive callable
+        :param send: The ASGI send callable
+        :return: Nothing
+        """
+        body = await request_body(receive)
+        if self.lexicon is None:
+            await self.respond(scope, send, {'error': 'No lexicon is loaded'}, 404)
+            return
+        if body is None:
+            await self.respond(scope, send, {'error': f'The body is longer than {MAX_REQUEST_BYTES} bytes'}, 413)
+            return
+        try:
+            requests = inflect_arguments(json.loads(body.decode('utf-8')))
+        except ValueError as e:
+            await self.respond(scope, send, {'error': str(e)}, 400)
+            return
+        loop = asyncio.get_running_loop()
+        w_output = await loop.run_in_executor(self.executor, inflect_output, self.lexicon, requests)
+        await self.respond(scope, send, w_output, 200)
+
+    async def word_output(self, ru_word: str, codes: Optional[FrozenSet[int]] = None,
+                          upos: Optional[str] = None) -> Tuple[dict, int, float]:
+        """
+        Returns the payload for a word, as service.word_output does, without blocking the event loop
+        :param ru_word: The lemma or inflected form
+        :param codes: Only the forms with these inflection codes, or None for all of them
+        :param upos: The part of speech asked for, or None
+        :return: A tuple of the payload, the HTTP status and the time the answer was made
+        """
+        ru_word = request_key(ru_word)
+        w_output = lexicon_output(self.lexicon, ru_word, codes, upos)
+        if w_output is not None:
+            return w_output, 200, self.lexicon.modified
+        ru_word = strip_stress(ru_word)
+        if self.cache is not None:
+            cached = self.cache.get(ru_word)
+            if cached is not None:
+                return filter_output(cached.payload, codes, upos), cached.status, cached.stored
+        (w_output, status, modified) = await self.flights.do(ru_word, self.fetched_output, ru_word)
+        return filter_output(w_output, codes, upos), status, modified
+
+    async def fetched_output(self, ru_word: str) -> Tuple[dict, int, float]:
+        try:
+            data = await fetch_word(RuWikitionary(ru_word, False))
+        except UpstreamError as e:
+            (w_output, status) = upstream_error_output(ru_word, e)
+        else:
+            if data is None:
+                w_output = not_found_output(ru_word)
+            else:
+                loop = asyncio.get_running_loop()
+                w_output = await loop.run_in_executor(self.executor, parse_output, ru_word, data)
+                learn_output(self.index, w_output)
+            status = 200
+        if self.cache is not None:
+            return self.cache.put(ru_word, w_output, status)[:3]
+        return w_output, status, time.time()
+
+    async def respond(self, scope, send, w_output: Optional[dict], status: int, extra_headers: Optional[dict] = None):
+        """
+        Sends a response
+        :param scope: The request scope
+        :param send: The ASGI send callable
+        :param w_output: The JSON payload, or None for a bodiless 304
+        :param status: The HTTP status
+        :param extra_headers: More headers, as a dict of name to value
+        :return: Nothing
+        """
+        headers = [(b'access-control-allow-origin', b'*')]
+        headers.extend((name.lower().encode('latin-1'), value.encode('latin-1'))
+                       for (name, value) in (extra_headers or {}).items())
+        body = b''
+        if w_output is not None:
+            body = json.dumps(w_output, ensure_ascii=False).encode('utf-8')
+            headers.extend([(b'content-type', b'application/json'),
+                            (b'content-length', str(len(body)).encode('ascii'))])
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+
+app = FormsApp()
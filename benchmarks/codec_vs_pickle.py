@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""Size and speed of the binary word codec against pickle and JSON
+
+The codec's gain is size: its batch is about half pickle's. It decodes slower than
+pickle, whose loader is written in C, so it does not pay off where decode time matters
+more than bytes stored or sent.
+
+Parses every page in html_samples/ and serializes the resulting grammar objects
+as one batch, comparing codec.py with pickle (highest protocol) and with JSON
+holding the same fields.
+
+Usage:
+    python benchmarks/codec_vs_pickle.py [REPEAT]
+
+REPEAT defaults to 200 encode/decode rounds. Run from the repository root.
+"""
+import glob
+import json
+import os
+import pickle
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ruwiktionary import *
+from codec import *
+
+
+def sample_words() -> list:
+    words = []
+    for path in sorted(glob.glob('html_samples/*.html')):
+        word = os.path.basename(path)[:-len('.html')].split('_')[-1]
+        with open(path, 'rb') as file:
+            page = RuWikitionary.from_bytes(word, file.read())
+        words.extend([w for (pos, w) in page.parse_all() if w is not None])
+    return words
+
+
+def json_encode(words: list) -> bytes:
+    records = []
+    for word in words:
+        tag = WORD_TAGS[type(word)]
+        records.append({'class': tag, 'lemma': word.value,
+                        'fields': [get_field(word, path) for (path, kind) in WORD_CLASSES[tag][1]]})
+    return json.dumps(records, ensure_ascii=False).encode('utf-8')
+
+
+def json_decode(data: bytes) -> list:
+    words = []
+    for record in json.loads(data):
+        (cls, schema) = WORD_CLASSES[record['class']]
+        word = cls(record['lemma'])
+        for ((path, kind), value) in zip(schema, record['fields']):
+            set_field(word, path, value if value is not None or kind == SCALAR else [])
+        words.append(word)
+    return words
+
+
+def main(repeat: int):
+    words = sample_words()
+    formats = [
+        ('codec', encode_words, decode_words),
+        ('pickle', lambda w: pickle.dumps(w, pickle.HIGHEST_PROTOCOL), pickle.loads),
+        ('json', json_encode, json_decode),
+    ]
+    print(f'{len(words)} grammar objects from html_samples/, {repeat} rounds')
+    print(f'{"format":8} {"bytes":>8} {"encode ms":>10} {"decode ms":>10}')
+    for (name, encode, decode) in formats:
+        data = encode(words)
+        encode_time = timeit.timeit(lambda: encode(words), number=repeat) / repeat
+        decode_time = timeit.timeit(lambda: decode(data), number=repeat) / repeat
+        print(f'{name:8} {len(data):8} {encode_time * 1000:10.3f} {decode_time * 1000:10.3f}')
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+"""Requests per second of the /forms server against a local stub Wiktionary
+
+Starts a stub Wiktionary serving the html_samples pages, runs `main.py runserver`
+against it in a subprocess and drives /forms with concurrent clients for a fixed
+time, cycling through the sample words. Every request misses the lexicon and the
+response cache is off unless a size is given, so this measures fetching, parsing
+and serializing.
+
+Usage:
+    load_test.py [--workers=N] [--concurrency=N] [--duration=SECONDS] [--delay=SECONDS] [--cache-size=N]
+                 [--asgi | --debug]
+
+Options:
+    -w N --workers=N                Server worker processes. [default: 4]
+    -c N --concurrency=N            Concurrent client threads. [default: 16]
+    -d SECONDS --duration=SECONDS   Length of the run. [default: 10]
+    --delay=SECONDS                 Latency the stub Wiktionary adds to every page. [default: 0]
+    --cache-size=N                  Response cache size of each server worker. [default: 0]
+    --asgi                          Measure the ASGI application (needs uvicorn).
+    --debug                         Measure the Flask development server instead.
+
+Run from the repository root.
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from docopt import docopt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import StubWiktionary, sample_pages
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def client(base_url: str, words: list, offset: int, until: float, latencies: list, errors: list):
+    idx = offset
+    while time.monotonic() < until:
+        url = base_url + urllib.parse.quote(words[idx % len(words)])
+        idx += 1
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                response.read()
+        except (urllib.error.URLError, OSError):
+            errors.append(1)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main(workers: int, concurrency: int, duration: float, delay: float, cache_size: int, mode: str):
+    words = sorted(sample_pages())
+    port = free_port()
+    with StubWiktionary(delay) as stub:
+        command = [sys.executable, 'main.py', 'runserver', '--host=127.0.0.1', f'--port={port}',
+                   f'--workers={workers}', f'--upstream={stub.base_url}', f'--cache-size={cache_size}']
+        if mode:
+            command.append(f'--{mode}')
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(port)
+            base_url = f'http://127.0.0.1:{port}/forms/'
+            (latencies, errors) = ([], [])
+            until = time.monotonic() + duration
+            threads = [threading.Thread(target=client, args=(base_url, words, i, until, latencies, errors))
+                       for i in range(concurrency)]
+            started = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+    latencies.sort()
+    server_name = {'debug': 'flask debug server', 'asgi': f'{workers} asgi workers'}.get(mode, f'{workers} workers')
+    print(f'{server_name}, {concurrency} clients, {elapsed:.1f} s, stub delay {delay * 1000:.0f} ms')
+    print(f'{len(latencies)} requests, {len(errors)} errors, {len(latencies) / elapsed:.1f} req/s')
+    if latencies:
+        print(f'latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms, '
+              f'p99 {percentile(latencies, 0.99) * 1000:.1f} ms')
+
+
+if __name__ == "__main__":
+    arguments = docopt(__doc__)
+    main(int(arguments['--workers']), int(arguments['--concurrency']), float(arguments['--duration']),
+         float(arguments['--delay']), int(arguments['--cache-size']),
+         'asgi' if arguments['--asgi'] else 'debug' if arguments['--debug'] else None)
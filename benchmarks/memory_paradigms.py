@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+"""Memory benchmark for grammar objects
+
+Builds synthetic noun, adjective and verb paradigms and reports the bytes held
+per lemma, once with the slot-based grammar classes and once with the same object
+graph rebuilt as plain dict-backed objects (the layout before __slots__).
+
+Usage:
+    python benchmarks/memory_paradigms.py [COUNT]
+
+COUNT defaults to 100000 paradigms. Run from the repository root.
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grammar import *
+
+
+class DictBacked(object):
+    """
+    A plain object with a per-instance __dict__
+    """
+
+
+def dict_backed(obj):
+    """
+    Rebuilds a grammar object graph with dict-backed objects holding the same attributes
+    :param obj: A grammar object, list or scalar value
+    :return: The dict-backed copy; strings and enums are shared, not copied
+    """
+    if isinstance(obj, list):
+        return [dict_backed(x) for x in obj]
+    if not hasattr(type(obj), '__slots__'):
+        return obj
+    copy = DictBacked()
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if hasattr(obj, name):
+                setattr(copy, name, dict_backed(getattr(obj, name)))
+    return copy
+
+
+def synthetic_noun(idx: int) -> Noun:
+    stem = f'кошк{idx}'
+    noun = Noun(f'{stem}а')
+    endings = {'nominative': ('а', 'и'), 'genitive': ('и', ''), 'dative': ('е', 'ам'),
+               'accusative': ('у', ''), 'instrumental': ('ой', 'ами'), 'prepositional': ('е', 'ах')}
+    for casestr, (singular, plural) in endings.items():
+        noun.add_form_case_name(casestr, True, [stem + singular])
+        noun.add_form_case_name(casestr, False, [stem + plural])
+    return noun
+
+
+def synthetic_adjective(idx: int) -> Adjective:
+    stem = f'хорош{idx}'
+    adjective = Adjective(f'{stem}ий')
+    rows = {'nominative': ('ий', 'ее', 'ая', 'ие'), 'genitive': ('его', 'его', 'ей', 'их'),
+            'dative': ('ему', 'ему', 'ей', 'им'), 'accusative_animate': ('его', 'ее', 'ую', 'их'),
+            'accusative_inanimate': ('ий', 'ее', 'ую', 'ие'), 'instrumental': ('им', 'им', 'ей', 'ими'),
+            'prepositional': ('ем', 'ем', 'ей', 'их'), 'short_form': ('', 'о', 'а', 'и')}
+    for casestr, endings in rows.items():
+        setattr(adjective, casestr, AdjectiveInflection.from_term_list([stem + x for x in endings]))
+    return adjective
+
+
+def synthetic_verb(idx: int) -> Verb:
+    stem = f'дела{idx}'
+    verb = Verb(f'{stem}ть')
+    verb.present.add_form_list([stem + x for x in ('ю', 'ешь', 'ет', 'ем', 'ете', 'ют')])
+    verb.future.add_form_list([f'{x} {stem}ть' for x in ('буду', 'будешь', 'будет', 'будем', 'будете', 'будут')])
+    for gender, ending in zip(['masculine', 'feminine', 'neuter', 'plural'], ['л', 'ла', 'ло', 'ли']):
+        verb.add_past_form(stem + ending, gender)
+    verb.imperative.singular = f'{stem}й'
+    verb.imperative.plural = f'{stem}йте'
+    verb.present_active_participle = f'{stem}ющий'
+    verb.past_active_participle = f'{stem}вший'
+    verb.present_adverbial_participle = f'{stem}я'
+    verb.past_adverbial_participle = [f'{stem}в', f'{stem}вши']
+    return verb
+
+
+def synthetic_paradigms(count: int) -> list:
+    builders = [synthetic_noun, synthetic_adjective, synthetic_verb]
+    return [builders[idx % 3](idx) for idx in range(count)]
+
+
+def main(count: int):
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    lexicon = synthetic_paradigms(count)
+    slotted = tracemalloc.get_traced_memory()[0] - baseline
+
+    # the copy shares the strings, so once the originals are gone
+    # it holds exactly the same data in the old layout
+    copied = dict_backed(lexicon)
+    del lexicon
+    gc.collect()
+    dict_based = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    print(f'{count} paradigms (nouns, adjectives and verbs in equal numbers)')
+    print(f'before (dict-backed):  {dict_based / count:8.0f} bytes per lemma')
+    print(f'after  (__slots__):    {slotted / count:8.0f} bytes per lemma')
+    print(f'saved:                 {100 * (1 - slotted / dict_based):8.1f} %')
+    return copied
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,185 @@
+from typing import Optional, List, Tuple
+from grammar import *
+from stringpool import StringPool, write_varint, read_varint, read_strings, intern_form
+
+# Layout of a serialized batch:
+#   magic 'RPM', version byte
+#   string table (StringPool.to_bytes: count, then length-prefixed UTF-8 strings)
+#   word count (varint)
+#   per word: class tag byte, lemma string id (varint), Zaliznyak index as a scalar field,
+#   then one entry per schema field:
+#     scalar field  varint(string id + 1), 0 for None
+#     list field    varint(count), then that many string ids
+MAGIC = b'RPM'
+VERSION = 1
+
+SCALAR = 0
+LIST = 1
+
+NOUN_CASES = ['nominative', 'genitive', 'dative', 'accusative', 'instrumental', 'prepositional',
+              'vocative', 'locative']
+ADJECTIVE_CASES = ['nominative', 'genitive', 'dative', 'accusative_animate', 'accusative_inanimate',
+                   'instrumental', 'prepositional', 'short_form']
+ADJECTIVE_GENDERS = ['masculine', 'feminine', 'neuter', 'plural']
+PRONOUN_CASES = ['nominative', 'genitive', 'dative', 'accusative', 'instrumental', 'prepositional']
+
+
+def _verb_schema() -> List[Tuple[Tuple[str, ...], int]]:
+    fields = []
+    for tense in ['present', 'future']:
+        for number in ['singular', 'plural']:
+            for person in ['p1', 'p2', 'p3']:
+                fields.append(((tense, number, person), SCALAR))
+    fields.extend([(('past', gender), SCALAR) for gender in ['masculine', 'feminine', 'neuter', 'plural']])
+    fields.extend([(('imperative', number), SCALAR) for number in ['singular', 'plural']])
+    fields.extend([((name,), SCALAR) for name in ['present_active_participle', 'past_active_participle',
+                                                   'present_adverbial_participle', 'present_passive_participle',
+                                                   'past_passive_participle']])
+    fields.append((('past_adverbial_participle',), LIST))
+    return fields
+
+
+# every field of a class as (attribute path, kind); the order is part of the format
+NOUN_SCHEMA = [((case, number), LIST) for case in NOUN_CASES for number in ['singular', 'plural']]
+ADJECTIVE_SCHEMA = [((case, gender), SCALAR) for case in ADJECTIVE_CASES for gender in ADJECTIVE_GENDERS]
+PRONOUN_SCHEMA = [((case,), SCALAR) for case in PRONOUN_CASES]
+VERB_SCHEMA = _verb_schema()
+
+# class tag → (class, schema); tags are part of the format, so only ever append
+WORD_CLASSES = {
+    1: (Noun, NOUN_SCHEMA),
+    2: (Adjective, ADJECTIVE_SCHEMA),
+    3: (Verb, VERB_SCHEMA),
+    4: (Pronoun, PRONOUN_SCHEMA),
+    5: (PossessivePronoun, ADJECTIVE_SCHEMA),
+    6: (DemonstrativePronoun, ADJECTIVE_SCHEMA),
+}
+WORD_TAGS = {cls: tag for (tag, (cls, schema)) in WORD_CLASSES.items()}
+
+
+def get_field(word: Word, path: Tuple[str, ...]):
+    """
+    Reads a field of a grammar object
+    :param word: The grammar object
+    :param path: Attribute names leading to the field, e.g. ('present', 'singular', 'p1')
+    :return: The field value; None if it was never set
+    """
+    value = word
+    for name in path:
+        value = getattr(value, name, None)
+    return value
+
+
+def set_field(word: Word, path: Tuple[str, ...], value):
+    """
+    Writes a field of a grammar object
+    :param word: The grammar object
+    :param path: Attribute names leading to the field
+    :param value: The value to store
+    :return: Nothing
+    """
+    owner = word
+    for name in path[:-1]:
+        owner = getattr(owner, name)
+    setattr(owner, path[-1], value)
+
+
+def encode_words(words: List[Word]) -> bytes:
+    """
+    Serializes grammar objects into one batch sharing a single string table
+    :param words: Any of Noun, Adjective, Verb, Pronoun, PossessivePronoun or DemonstrativePronoun objects
+    :return: The serialized batch
+    """
+    pool = StringPool()
+    body = bytearray()
+    write_varint(body, len(words))
+    for word in words:
+        tag = WORD_TAGS.get(type(word))
+        if tag is None:
+            raise ValueError(f'Cannot encode {type(word).__name__}')
+        body.append(tag)
+        write_varint(body, pool.id_for(word.value))
+        write_varint(body, 0 if word.zaliznyak is None else pool.id_for(word.zaliznyak) + 1)
+        for (path, kind) in WORD_CLASSES[tag][1]:
+            value = get_field(word, path)
+            if kind == SCALAR:
+                write_varint(body, 0 if value is None else pool.id_for(value) + 1)
+            else:
+                value = value or []
+                write_varint(body, len(value))
+                for item in value:
+                    write_varint(body, pool.id_for(item))
+    return MAGIC + bytes([VERSION]) + pool.to_bytes() + bytes(body)
+
+
+def decode_words(data) -> List[Word]:
+    """
+    Reads grammar objects serialized by encode_words
+    :param data: The serialized batch as bytes or any buffer
+    :return: The grammar objects, in the order they were encoded
+    :raises ValueError: if the data is not a batch this version reads, or is truncated or corrupt
+    """
+    data = memoryview(data)
+    if len(data) <= len(MAGIC) or bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError('Not a serialized word batch')
+    version = data[len(MAGIC)]
+    if version != VERSION:
+        raise ValueError(f'Unsupported word batch version {version}')
+    (strings, offset) = read_strings(data, len(MAGIC) + 1)
+    strings = [intern_form(text) for text in strings]
+    (count, offset) = read_varint(data, offset)
+    words = []
+    try:
+        for _ in range(count):
+            tag = data[offset]
+            if tag not in WORD_CLASSES:
+                raise ValueError(f'Unknown word class tag {tag}')
+            (cls, schema) = WORD_CLASSES[tag]
+            (lemma_id, offset) = read_varint(data, offset + 1)
+            word = cls(strings[lemma_id])
+            (index_id, offset) = read_varint(data, offset)
+            word.zaliznyak = None if index_id == 0 else strings[index_id - 1]
+            for (path, kind) in schema:
+                # nearly every value fits in one byte, so skip the call for those
+                value = data[offset]
+                if value < 0x80:
+                    offset += 1
+                else:
+                    (value, offset) = read_varint(data, offset)
+                if kind == SCALAR:
+                    value = None if value == 0 else strings[value - 1]
+                else:
+                    items = []
+                    for _ in range(value):
+                        (string_id, offset) = read_varint(data, offset)
+                        items.append(strings[string_id])
+                    value = items
+                owner = word
+                for name in path[:-1]:
+                    owner = getattr(owner, name)
+                setattr(owner, path[-1], value)
+            words.append(word)
+    except IndexError:
+        # a tag or a value past the end of the data, or a string id past the table; catching it
+        # here keeps bounds checks out of the loop every batch goes through
+        raise ValueError('Truncated or corrupt word batch') from None
+    return words
+
+
+def encode_word(word: Word) -> bytes:
+    """
+    Serializes a single grammar object
+    :param word: The grammar object
+    :return: The serialized word
+    """
+    return encode_words([word])
+
+
+def decode_word(data) -> Optional[Word]:
+    """
+    Reads a single grammar object serialized by encode_word
+    :param data: The serialized word
+    :return: The grammar object, or None if the batch is empty
+    """
+    words = decode_words(data)
+    return words[0] if words else None
@@ -0,0 +1,134 @@
+from functools import lru_cache
+from typing import Optional, List, Iterator
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet
+from grammar import *
+from lexicon import *
+
+# The lexicon as a table with one row per form, for analytical tools:
+#
+#   lemma      pos   form     code  description
+#   собака     NOUN  соба́ка   1     noun, nominative singular
+#   собака     NOUN  соба́ки   2     noun, nominative plural
+#   но         CCONJ но       null  null
+#
+# An uninflected entry is one row with its lemma as the form and no code. Lemma, pos, code
+# and description repeat from row to row and are dictionary-encoded; the form is mostly
+# unique and is not. Rows are written a batch at a time, so memory use depends on the batch
+# size and not on the size of the lexicon.
+SCHEMA = pyarrow.schema([
+    ('lemma', pyarrow.dictionary(pyarrow.int32(), pyarrow.string())),
+    ('pos', pyarrow.dictionary(pyarrow.int8(), pyarrow.string())),
+    ('form', pyarrow.string()),
+    ('code', pyarrow.dictionary(pyarrow.int16(), pyarrow.uint16())),
+    ('description', pyarrow.dictionary(pyarrow.int16(), pyarrow.string())),
+])
+DICTIONARY_COLUMNS = ['lemma', 'pos', 'code', 'description']
+
+# rows per Parquet row group and per Arrow record batch
+ROW_GROUP_ROWS = 100000
+
+# file name suffix -> format
+COLUMNAR_FORMATS = {'.parquet': 'parquet', '.arrows': 'arrows'}
+
+
+def columnar_format(path: str) -> Optional[str]:
+    """
+    Tells which columnar format a file name asks for
+    :param path: The output file name
+    :return: 'parquet' for .parquet, 'arrows' (the Arrow IPC stream format) for .arrows, otherwise None
+    """
+    for (suffix, name) in COLUMNAR_FORMATS.items():
+        if path.lower().endswith(suffix):
+            return name
+    return None
+
+
+@lru_cache(maxsize=None)
+def description(code: int) -> Optional[str]:
+    return code2term(code)
+
+
+def record_batches(lexicon: MappedLexicon, batch_rows: int = ROW_GROUP_ROWS, cursor: int = 0,
+                   limit: Optional[int] = None) -> Iterator[pyarrow.RecordBatch]:
+    """
+    Reads the lexicon as record batches of SCHEMA, one entry at a time from the mapped file
+    :param lexicon: The mapped lexicon
+    :param batch_rows: The rows of a batch; only the last batch may be shorter
+    :param cursor: The entry to start at
+    :param limit: The most entries to read, or None for all the rest
+    :return: An iterator of record batches; an entry's rows may be split across two batches
+    """
+    stop = len(lexicon) if limit is None else min(len(lexicon), cursor + limit)
+    columns: List[list] = [[], [], [], []]
+    for idx in range(max(cursor, 0), stop):
+        entry = lexicon.entry(idx)
+        upos = entry.pos.to_upos()
+        for (form, code) in entry.forms or [(entry.lemma, None)]:
+            columns[0].append(entry.lemma)
+            columns[1].append(upos)
+            columns[2].append(form)
+            columns[3].append(code)
+            if len(columns[0]) == batch_rows:
+                yield record_batch(*columns)
+                columns = [[], [], [], []]
+    if columns[0]:
+        yield record_batch(*columns)
+
+
+def record_batch(lemmas: List[str], upos: List[str], forms: List[str],
+                 codes: List[Optional[int]]) -> pyarrow.RecordBatch:
+    """
+    Builds a record batch of SCHEMA, each dictionary holding the values of this batch only
+    :param lemmas: The lemma of each row
+    :param upos: The UPOS of each row
+    :param forms: The form of each row
+    :param codes: The inflection code of each row, or None
+    :return: The record batch
+    """
+    code_array = pyarrow.array(codes, pyarrow.uint16()).dictionary_encode().cast(SCHEMA.field('code').type)
+    descriptions = pyarrow.array([description(code.as_py()) for code in code_array.dictionary], pyarrow.string())
+    return pyarrow.record_batch([
+        pyarrow.array(lemmas, pyarrow.string()).dictionary_encode(),
+        pyarrow.array(upos, pyarrow.string()).dictionary_encode().cast(SCHEMA.field('pos').type),
+        pyarrow.array(forms, pyarrow.string()),
+        code_array,
+        # a description per code, so the code's indices serve for both
+        pyarrow.DictionaryArray.from_arrays(code_array.indices, descriptions),
+    ], schema=SCHEMA)
+
+
+def write_columnar(lexicon: MappedLexicon, path: str, file_format: Optional[str] = None,
+                   row_group_rows: int = ROW_GROUP_ROWS, cursor: int = 0, limit: Optional[int] = None,
+                   compression: str = 'zstd') -> int:
+    """
+    Writes the lexicon's forms to a Parquet or Arrow file, streaming it a row group at a time
+    :param lexicon: The mapped lexicon
+    :param path: The output file
+    :param file_format: 'parquet' or 'arrows', or None to go by the file name (see columnar_format)
+    :param row_group_rows: The rows of a Parquet row group or of an Arrow record batch
+    :param cursor: The entry to start at
+    :param limit: The most entries to write, or None for all the rest
+    :param compression: The Parquet compression codec, or 'none'
+    :return: The number of rows written
+    :raises ValueError: for an unknown format
+    """
+    file_format = file_format or columnar_format(path)
+    if file_format == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(path, SCHEMA, use_dictionary=DICTIONARY_COLUMNS,
+                                               compression=compression)
+    elif file_format == 'arrows':
+        # the stream format, as the IPC file format cannot replace a dictionary from one batch to the next
+        writer = pyarrow.ipc.new_stream(path, SCHEMA)
+    else:
+        raise ValueError(f'Unknown columnar format: {file_format}')
+    rows = 0
+    with writer:
+        for batch in record_batches(lexicon, row_group_rows, cursor, limit):
+            if file_format == 'parquet':
+                writer.write_batch(batch, row_group_size=row_group_rows)
+            else:
+                writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
@@ -0,0 +1,114 @@
+import bisect
+import heapq
+from typing import Optional, List, Dict, Tuple, Iterable
+from normalize import normalize_form
+
+# Prefix completion of lemmas, for clients that look words up as they are typed. The lemmas
+# are sorted by their normalized spelling, so the lemmas under a prefix are one range of the
+# list, and ranked: by frequency when a frequency list is given, then shorter first. Every
+# trie node (every prefix) with more than TOP_K lemmas under it has its best TOP_K
+# precomputed; the others have few enough lemmas to rank when asked. A query is then a dict
+# lookup or a binary search over at most TOP_K lemmas.
+TOP_K = 10
+
+
+def load_frequencies(lines: Iterable[str]) -> Dict[str, int]:
+    """
+    Reads a frequency list: one word and its count per line, in either order, separated by
+    whitespace. Blank lines, lines starting with # and lines without a count are skipped
+    :param lines: The lines of the list
+    :return: A dict of normalized spelling to count; counts of spellings that normalize alike are added
+    """
+    frequencies: Dict[str, int] = {}
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 2 or fields[0].startswith('#'):
+            continue
+        counts = [field for field in fields if field.replace('.', '', 1).isdigit()]
+        words = [field for field in fields if not field.replace('.', '', 1).isdigit()]
+        if not counts or not words:
+            continue
+        key = normalize_form(words[0])
+        frequencies[key] = frequencies.get(key, 0) + int(float(counts[0]))
+    return frequencies
+
+
+class CompletionTrie(object):
+    """
+    Lemmas by prefix, best first, regardless of stress marks, ё and case
+    """
+    def __init__(self, lemmas: Iterable[str], frequencies: Optional[Dict[str, int]] = None, k: int = TOP_K):
+        """
+        Builds the trie
+        :param lemmas: The lemmas; repeated ones are kept once
+        :param frequencies: A dict of normalized spelling to count, as load_frequencies returns; None ranks
+        shorter lemmas first
+        :param k: The most completions of a query
+        """
+        self.k = k
+        pairs = sorted({(normalize_form(lemma), lemma) for lemma in lemmas})
+        self.keys: List[str] = [key for (key, lemma) in pairs]
+        self.lemmas: List[str] = [lemma for (key, lemma) in pairs]
+        frequencies = frequencies or {}
+        order = sorted(range(len(pairs)), key=lambda idx: (-frequencies.get(self.keys[idx], 0),
+                                                            len(self.keys[idx]), self.keys[idx]))
+        # rank of each lemma, 0 for the best
+        self.ranks: List[int] = [0] * len(order)
+        for (rank, idx) in enumerate(order):
+            self.ranks[idx] = rank
+        # prefix -> indices of its best k lemmas, best first, for prefixes with more than k lemmas
+        self.top: Dict[str, Tuple[int, ...]] = {}
+        self.build(0, len(self.keys), '')
+
+    def __len__(self):
+        return len(self.lemmas)
+
+    @classmethod
+    def from_lexicon(cls, lexicon, frequencies: Optional[Dict[str, int]] = None, k: int = TOP_K):
+        """
+        Returns a trie of every lemma of a lexicon, reading the lemmas without decoding the forms
+        :param lexicon: A MappedLexicon
+        :param frequencies: A dict of normalized spelling to count, or None
+        :param k: The most completions of a query
+        :return: New instance of the class
+        """
+        lemma_ids = {lexicon.entry_fields(idx)[0] for idx in range(len(lexicon))}
+        return cls((lexicon.string(lemma_id) for lemma_id in lemma_ids), frequencies, k)
+
+    def build(self, low: int, high: int, prefix: str):
+        """
+        Precomputes the best lemmas of a node and of its descendants
+        :param low: The first lemma under the node
+        :param high: The end of the lemmas under the node
+        :param prefix: The node's prefix
+        :return: Nothing
+        """
+        if high - low <= self.k:
+            return
+        self.top[prefix] = tuple(heapq.nsmallest(self.k, range(low, high), key=self.ranks.__getitem__))
+        depth = len(prefix)
+        idx = low
+        # a lemma spelled as the prefix itself sorts first and belongs to no child
+        while idx < high and len(self.keys[idx]) == depth:
+            idx += 1
+        while idx < high:
+            child = self.keys[idx][:depth + 1]
+            end = bisect.bisect_left(self.keys, child + '\U0010ffff', idx, high)
+            self.build(idx, end, child)
+            idx = end
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Returns the best lemmas starting with a prefix
+        :param prefix: The prefix, in any spelling
+        :param limit: The most lemmas to return, at most k; None for k
+        :return: The lemmas as stored, best first
+        """
+        limit = self.k if limit is None else min(limit, self.k)
+        key = normalize_form(prefix)
+        best = self.top.get(key)
+        if best is None:
+            low = bisect.bisect_left(self.keys, key)
+            high = bisect.bisect_left(self.keys, key + '\U0010ffff', low)
+            best = sorted(range(low, high), key=self.ranks.__getitem__)
+        return [self.lemmas[idx] for idx in best[:limit]]
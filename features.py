@@ -0,0 +1,253 @@
+import re
+from functools import lru_cache
+from typing import Optional, List, Dict, Tuple
+import numpy
+from grammar import *
+from lexicon import *
+from normalize import strip_stress
+from zaliznyak import ZERO_ENDINGS, noun_endings
+
+# Morphological features packed into a uint32 per form, so that a query over every form of the
+# lexicon is one mask-and-compare over an array:
+#
+#   bits  0-3   part of speech (SpeechPart value)
+#   bits  4-6   Case        bits 15-16  Tense      bits 23-24  Degree
+#   bits  7-8   Number      bits 17-18  Mood       bit  25     Variant
+#   bits  9-10  Gender      bits 19-20  VerbForm   bit  26     Poss
+#   bits 11-12  Animacy     bits 21-22  Voice      bit  27     PronType
+#   bits 13-14  Person
+#
+# A field holds 0 when the feature does not apply, otherwise the 1-based index of its value.
+# The features come from grammar.ud_feature_table, so they are those of the inflection code,
+# except for a noun's Gender and Animacy, which are lexical and come from the gender token of
+# its Zaliznyak index ('жо 3*a': Fem, Anim); a noun of common gender ('мо-жо') has neither.
+FEATURE_FIELDS: Dict[str, Tuple[int, int, Tuple[str, ...]]] = {
+    'Case': (4, 3, ('Nom', 'Gen', 'Dat', 'Acc', 'Ins', 'Loc', 'Voc')),
+    'Number': (7, 2, ('Sing', 'Plur')),
+    'Gender': (9, 2, ('Masc', 'Fem', 'Neut')),
+    'Animacy': (11, 2, ('Anim', 'Inan')),
+    'Person': (13, 2, ('1', '2', '3')),
+    'Tense': (15, 2, ('Pres', 'Past', 'Fut')),
+    'Mood': (17, 2, ('Ind', 'Imp')),
+    'VerbForm': (19, 2, ('Fin', 'Part', 'Conv')),
+    'Voice': (21, 2, ('Act', 'Pass')),
+    'Degree': (23, 2, ('Cmp', 'Sup')),
+    'Variant': (25, 1, ('Short',)),
+    'Poss': (26, 1, ('Yes',)),
+    'PronType': (27, 1, ('Dem',)),
+}
+POS_BITS = 0xF
+NOUN_GENDER = re.compile(r'^(м|ж|с)(о?)(?: |$)')
+GENDERS = {'м': 'Masc', 'ж': 'Fem', 'с': 'Neut'}
+
+# the lexicon file's ENTRY and ROW records, read in place
+ENTRY_DTYPE = numpy.dtype({'names': ['lemma', 'first', 'count', 'pos'], 'formats': ['<u4', '<u4', '<u2', 'u1'],
+                           'offsets': [0, 4, 8, 10], 'itemsize': ENTRY.size})
+ROW_DTYPE = numpy.dtype({'names': ['form', 'code'], 'formats': ['<u4', '<u2'], 'offsets': [0, 4],
+                         'itemsize': ROW.size})
+
+
+def field_bits(name: str, value: str) -> Tuple[int, int]:
+    """
+    Returns where a feature value lives in a bitmask
+    :param name: The feature name, e.g. 'Case'
+    :param value: Its value, e.g. 'Gen'
+    :return: A tuple of the mask of the feature's field and the bits of the value
+    :raises KeyError: for an unknown feature
+    :raises ValueError: for an unknown value
+    """
+    (shift, width, values) = FEATURE_FIELDS[name]
+    return ((1 << width) - 1) << shift, (values.index(value) + 1) << shift
+
+
+@lru_cache()
+def code_features() -> Dict[int, int]:
+    """
+    Packs the UD features of every inflection code
+    :return: A dict of inflection code to feature bits, without the part of speech
+    """
+    table = {}
+    for (code, feats) in ud_feature_table().items():
+        bits = 0
+        for pair in feats.split('|') if feats != '_' else []:
+            (name, value) = pair.split('=')
+            bits |= field_bits(name, value)[1]
+        table[code] = bits
+    return table
+
+
+@lru_cache()
+def code_feature_array() -> numpy.ndarray:
+    """
+    Returns code_features as a uint32 array indexed by inflection code, for packing many codes at once
+    :return: The array; indices that are not inflection codes hold 0
+    """
+    table = code_features()
+    array = numpy.zeros(max(table) + 1, dtype=numpy.uint32)
+    for (code, bits) in table.items():
+        array[code] = bits
+    return array
+
+
+def index_features(index: Optional[str]) -> int:
+    """
+    Packs the lexical features of a noun's Zaliznyak index
+    :param index: The index, e.g. 'жо 3*a', or None
+    :return: The Gender and Animacy bits, or 0 for an index without a single gender
+    """
+    match = NOUN_GENDER.match(index or '')
+    if match is None:
+        return 0
+    (gender, animate) = match.groups()
+    return field_bits('Gender', GENDERS[gender])[1] | field_bits('Animacy', 'Anim' if animate else 'Inan')[1]
+
+
+def zero_ending_codes(index: Optional[str]) -> List[int]:
+    """
+    Returns the inflection codes a noun's generated paradigm fills with a zero ending
+    :param index: The noun's Zaliznyak index, or None
+    :return: The codes; none for an index the rules do not cover
+    """
+    try:
+        endings = noun_endings(index)
+    except ValueError:
+        return []
+    return [code for (code, variants) in endings.items() if all(ending in ZERO_ENDINGS for ending in variants)]
+
+
+def encode_features(code: int, pos: SpeechPart) -> int:
+    """
+    Packs the features of one form
+    :param code: The inflection code
+    :param pos: The part of speech of its entry
+    :return: The uint32 bitmask
+    """
+    return code_features().get(code, 0) | pos.value
+
+
+def decode_features(bits: int) -> Dict[str, object]:
+    """
+    Unpacks a bitmask
+    :param bits: A bitmask made by encode_features
+    :return: A dict of 'pos' to the SpeechPart and of each feature present to its value
+    """
+    features: Dict[str, object] = {'pos': SpeechPart(int(bits) & POS_BITS)}
+    for (name, (shift, width, values)) in FEATURE_FIELDS.items():
+        idx = (int(bits) >> shift) & ((1 << width) - 1)
+        if idx:
+            features[name] = values[idx - 1]
+    return features
+
+
+class FeatureTable(object):
+    """
+    Every inflected form of a lexicon as columns of NumPy arrays, one element per row of the
+    lexicon file: the entry, the lemma and form string ids, the inflection code and the packed
+    features. Uninflected entries have no rows and so are not in the table.
+    """
+    # per entry: 1 + the string id of its Zaliznyak index, or 0
+    INDEX_DTYPE = numpy.dtype('<u4')
+
+    def __init__(self, lexicon: MappedLexicon):
+        """
+        Builds the table by reading the lexicon's entry and row sections as arrays, without
+        decoding a string or visiting the rows one by one
+        :param lexicon: The mapped lexicon; it must stay open while the table is used
+        """
+        self.lexicon = lexicon
+        # copied out of the mapping so that the lexicon can still be closed
+        entries = numpy.frombuffer(lexicon.buffer, ENTRY_DTYPE, lexicon.entry_count, lexicon.entries_at).copy()
+        rows = numpy.frombuffer(lexicon.buffer, ROW_DTYPE, lexicon.row_count, lexicon.rows_at).copy()
+        self.entries: numpy.ndarray = numpy.repeat(numpy.arange(len(entries), dtype=numpy.uint32),
+                                                   entries['count'])
+        self.lemma_ids: numpy.ndarray = entries['lemma'][self.entries]
+        self.form_ids: numpy.ndarray = rows['form'].astype(numpy.uint32)
+        self.codes: numpy.ndarray = rows['code'].astype(numpy.uint16)
+        # only the distinct indexes, a few hundred, are decoded
+        indexes = numpy.frombuffer(lexicon.buffer, self.INDEX_DTYPE, lexicon.entry_count, lexicon.indexes_at)
+        (index_ids, self.index_slots) = numpy.unique(indexes, return_inverse=True)
+        self.index_strings: List[Optional[str]] = [lexicon.string(int(index_id) - 1) if index_id else None
+                                                   for index_id in index_ids]
+        nouns = entries['pos'] == SpeechPart.NOUN.value
+        lexical = numpy.array([index_features(index) for index in self.index_strings], dtype=numpy.uint32)
+        entry_features = numpy.where(nouns, lexical[self.index_slots], 0).astype(numpy.uint32)
+        self.features: numpy.ndarray = (code_feature_array()[self.codes] |
+                                        entries['pos'][self.entries].astype(numpy.uint32) |
+                                        entry_features[self.entries])
+        self._nouns = nouns
+        self._finals: Optional[numpy.ndarray] = None
+
+    def __len__(self):
+        return len(self.features)
+
+    def select(self, pos: Optional[SpeechPart] = None, **features: str) -> numpy.ndarray:
+        """
+        Selects forms by part of speech and features, with a single comparison over the table
+        :param pos: The part of speech, or None for any
+        :param features: Feature values, e.g. Case='Gen', Number='Plur'
+        :return: A boolean array, True for the selected forms
+        """
+        (mask, value) = (POS_BITS if pos is not None else 0, pos.value if pos is not None else 0)
+        for (name, feature_value) in features.items():
+            (field_mask, bits) = field_bits(name, feature_value)
+            mask |= field_mask
+            value |= bits
+        return (self.features & numpy.uint32(mask)) == numpy.uint32(value)
+
+    @property
+    def finals(self) -> numpy.ndarray:
+        """
+        The last letter of every form, stress marks aside, as a code point; computed on first use,
+        once per distinct form
+        """
+        if self._finals is None:
+            (form_ids, inverse) = numpy.unique(self.form_ids, return_inverse=True)
+            letters = [ord((strip_stress(self.lexicon.string(int(form_id))) or '\0')[-1]) for form_id in form_ids]
+            self._finals = numpy.array(letters, dtype=numpy.uint32)[inverse]
+        return self._finals
+
+    def last_letter_in(self, letters: str) -> numpy.ndarray:
+        """
+        Selects forms by their last letter, which says nothing about their ending (see zero_ending)
+        :param letters: The letters to accept, e.g. 'аяь'
+        :return: A boolean array, True for the selected forms
+        """
+        return numpy.isin(self.finals, numpy.array([ord(letter) for letter in letters], dtype=numpy.uint32))
+
+    def zero_ending(self) -> numpy.ndarray:
+        """
+        Selects the forms of nouns whose inflection code has a zero ending by the ending tables of
+        zaliznyak.py, from the noun's Zaliznyak index: ко́шек and дынь, but not но
+        :return: A boolean array, True for the selected forms; False for the nouns the rules do not cover
+        """
+        # one row of codes per distinct index, looked up by (index, code)
+        zero = numpy.zeros((len(self.index_strings), int(self.codes.max(initial=0)) + 1), dtype=bool)
+        for (slot, index) in enumerate(self.index_strings):
+            zero[slot, [code for code in zero_ending_codes(index) if code < zero.shape[1]]] = True
+        return zero[self.index_slots[self.entries], self.codes] & self._nouns[self.entries]
+
+    def group_count(self, by: str, selected: Optional[numpy.ndarray] = None) -> Dict[object, int]:
+        """
+        Counts forms by a feature or by part of speech
+        :param by: A feature name, or 'pos'
+        :param selected: A boolean array from select, or None to count every form
+        :return: A dict of value (a SpeechPart for 'pos') to the number of forms; forms without
+        the feature are counted under None
+        """
+        features = self.features if selected is None else self.features[selected]
+        if by == 'pos':
+            counts = numpy.bincount(features & POS_BITS, minlength=POS_BITS + 1)
+            return {SpeechPart(idx): int(count) for (idx, count) in enumerate(counts) if idx and count}
+        (shift, width, values) = FEATURE_FIELDS[by]
+        counts = numpy.bincount((features >> shift) & ((1 << width) - 1), minlength=len(values) + 1)
+        return {(values[idx - 1] if idx else None): int(count) for (idx, count) in enumerate(counts) if count}
+
+    def forms(self, selected: numpy.ndarray) -> List[Tuple[str, str, int]]:
+        """
+        Reads the strings of selected forms
+        :param selected: A boolean array from select
+        :return: A list of (lemma, form, inflection code) tuples, in lexicon order
+        """
+        return [(self.lexicon.string(int(lemma_id)), self.lexicon.string(int(form_id)), int(code))
+                for (lemma_id, form_id, code) in zip(self.lemma_ids[selected], self.form_ids[selected],
+                                                     self.codes[selected])]
@@ -0,0 +1,189 @@
+import threading
+from collections import namedtuple, OrderedDict
+from typing import Optional, List, Dict, Set, Tuple
+from normalize import normalize_form
+
+# Misspelling-tolerant lookup with a symmetric-delete index: every known spelling is stored
+# under each string obtained by deleting up to max_distance of its letters. Two spellings
+# within that edit distance share at least one such string, so a query only generates its
+# own deletions and checks the few spellings filed under them, whatever the vocabulary size.
+MAX_DISTANCE = 2
+# lemmas learned from fetched words that an index keeps; each costs every deletion of every form
+# (about 75 KB), so the oldest are evicted beyond this
+MAX_LEARNED = 1000
+
+Suggestion = namedtuple('Suggestion', ['form', 'lemma', 'distance'])
+Suggestion.__doc__ = '''A known form close to a query: the form as stored, its lemma and the edit distance'''
+
+
+def deletions(word: str, distance: int) -> Set[str]:
+    """
+    Returns the strings obtained by deleting up to distance letters of a word
+    :param word: The word
+    :param distance: The most letters to delete
+    :return: The set of deletions, the word itself included
+    """
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:idx] + w[idx + 1:] for w in frontier for idx in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance: insertions, deletions, substitutions and transpositions
+    of adjacent letters each count one
+    :param a: A string
+    :param b: Another string
+    :param limit: Distances beyond this are not computed exactly
+    :return: The distance, or limit + 1 if it exceeds limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    (previous, current) = (None, list(range(len(b) + 1)))
+    for i in range(1, len(a) + 1):
+        (before, previous, current) = (previous, current, [i] + [0] * len(b))
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return min(current[len(b)], limit + 1)
+
+
+class SymmetricDeleteIndex(object):
+    """
+    A fuzzy index of forms, compared in their normalized spelling (see normalize.py). Forms can
+    be added at any time, also while other threads query it.
+    """
+    def __init__(self, max_distance: int = MAX_DISTANCE, max_learned: int = MAX_LEARNED):
+        """
+        Returns an empty index
+        :param max_distance: The largest edit distance queries can ask for
+        :param max_learned: The most lemmas learn keeps; the least recently learned are removed beyond it
+        """
+        self.max_distance = max_distance
+        self.max_learned = max_learned
+        # normalized spelling -> the (form, lemma) pairs spelled so
+        self.words: Dict[str, Set[Tuple[str, str]]] = {}
+        # deletion -> the normalized spellings it was made from
+        self.deletes: Dict[str, Set[str]] = {}
+        # learned lemma -> its forms, least recently learned first
+        self.learned: OrderedDict = OrderedDict()
+        # reentrant, since learn adds and removes forms while holding it
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, form: str, lemma: Optional[str] = None):
+        """
+        Adds a form
+        :param form: The form, possibly stress-marked
+        :param lemma: Its lemma, or None if the form is a lemma
+        :return: Nothing
+        """
+        key = normalize_form(form)
+        if not key:
+            return
+        with self._lock:
+            pairs = self.words.get(key)
+            if pairs is None:
+                pairs = self.words[key] = set()
+                for variant in deletions(key, self.max_distance):
+                    self.deletes.setdefault(variant, set()).add(key)
+            pairs.add((form, lemma or form))
+
+    def add_paradigm(self, lemma: str, forms: List[Tuple[str, int]]):
+        """
+        Adds a lemma and its inflected forms
+        :param lemma: The lemma
+        :param forms: A list of (form, inflection code) tuples
+        :return: Nothing
+        """
+        self.add(lemma)
+        for (form, code) in forms:
+            self.add(form, lemma)
+
+    def remove(self, form: str, lemma: Optional[str] = None):
+        """
+        Removes a form added by add
+        :param form: The form, possibly stress-marked
+        :param lemma: Its lemma, or None if the form is a lemma
+        :return: Nothing
+        """
+        key = normalize_form(form)
+        with self._lock:
+            pairs = self.words.get(key)
+            if pairs is None:
+                return
+            pairs.discard((form, lemma or form))
+            if pairs:
+                return
+            del self.words[key]
+            for variant in deletions(key, self.max_distance):
+                keys = self.deletes.get(variant)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.deletes[variant]
+
+    def learn(self, lemma: str, forms: List[Tuple[str, int]]):
+        """
+        Adds a lemma and its forms as add_paradigm does, keeping only the max_learned lemmas learned last,
+        so that an index fed with every fetched word stays bounded
+        :param lemma: The lemma
+        :param forms: A list of (form, inflection code) tuples
+        :return: Nothing
+        """
+        with self._lock:
+            if lemma in self.learned:
+                self.learned.move_to_end(lemma)
+                return
+            self.add_paradigm(lemma, forms)
+            self.learned[lemma] = forms
+            while len(self.learned) > self.max_learned:
+                (evicted, evicted_forms) = self.learned.popitem(last=False)
+                self.remove(evicted)
+                for (form, code) in evicted_forms:
+                    self.remove(form, evicted)
+
+    @classmethod
+    def from_lexicon(cls, lexicon, max_distance: int = MAX_DISTANCE):
+        """
+        Returns an index of every lemma and form of a lexicon
+        :param lexicon: A MappedLexicon
+        :param max_distance: The largest edit distance queries can ask for
+        :return: New instance of the class
+        """
+        index = cls(max_distance)
+        for entry in lexicon:
+            index.add_paradigm(entry.lemma, entry.forms)
+        return index
+
+    def suggest(self, word: str, max_distance: Optional[int] = None, limit: int = 10) -> List[Suggestion]:
+        """
+        Returns the known forms closest to a word
+        :param word: The word, possibly misspelled
+        :param max_distance: The largest edit distance to accept, at most the index's; None for the index's
+        :param limit: The most suggestions to return
+        :return: Suggestions by increasing distance; a known word is its own first suggestion
+        """
+        key = normalize_form(word)
+        distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        with self._lock:
+            candidates = set()
+            for variant in deletions(key, distance):
+                candidates.update(self.deletes.get(variant, ()))
+            found = []
+            for candidate in candidates:
+                candidate_distance = edit_distance(key, candidate, distance)
+                if candidate_distance <= distance:
+                    found.extend(Suggestion(form, lemma, candidate_distance)
+                                 for (form, lemma) in self.words[candidate])
+        found.sort(key=lambda s: (s.distance, s.lemma != s.form, s.form))
+        return found[:limit]
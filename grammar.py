@@ -1,5 +1,5 @@
 from enum import Enum, auto
-from typing import Optional, Union, List
+from typing import Optional, Union, List, Dict, Tuple, Sequence
 import re
 from functools import lru_cache
 import yaml
@@ -28,6 +28,16 @@ def rupos2upos(rupos: str) -> Optional[str]:
         return None
 
 
+@lru_cache()
+def load_inflection_codes() -> dict:
+    """
+    Loads inflection_codes.yaml once; callers must not modify the returned dictionary
+    :return: The inflection codes, keyed by part of speech prefix
+    """
+    with open('inflection_codes.yaml') as file:
+        return yaml.safe_load(file)
+
+
 def code2term(code: int) -> str:
     """
     Returns an English-language description for given inflection code
@@ -244,6 +254,114 @@ def code2term(code: int) -> str:
     return desc
 
 
+# Universal Dependencies features of the keys of inflection_codes.yaml: a code has the features of
+# every key on its path there, so the table follows the file
+UD_KEY_FEATURES = {
+    'nominative': {'Case': 'Nom'}, 'genitive': {'Case': 'Gen'}, 'dative': {'Case': 'Dat'},
+    'accusative': {'Case': 'Acc'}, 'instrumental': {'Case': 'Ins'}, 'prepositional': {'Case': 'Loc'},
+    'locative': {'Case': 'Loc'}, 'vocative': {'Case': 'Voc'},
+    'singular': {'Number': 'Sing'}, 'plural': {'Number': 'Plur'},
+    'masculine': {'Gender': 'Masc', 'Number': 'Sing'}, 'feminine': {'Gender': 'Fem', 'Number': 'Sing'},
+    'neuter': {'Gender': 'Neut', 'Number': 'Sing'},
+    'animate': {'Animacy': 'Anim'}, 'inanimate': {'Animacy': 'Inan'},
+    'present': {'Tense': 'Pres'}, 'past': {'Tense': 'Past'}, 'future': {'Tense': 'Fut'},
+    'first_person': {'Person': '1'}, 'second_person': {'Person': '2'}, 'third_person': {'Person': '3'},
+    'active': {'Voice': 'Act'}, 'passive': {'Voice': 'Pass'}, 'adverbial': {'VerbForm': 'Conv'},
+    'comparative': {'Degree': 'Cmp'}, 'superalative': {'Degree': 'Sup'}, 'short': {'Variant': 'Short'},
+    'pronoun_possessive': {'Poss': 'Yes'}, 'pronoun_demonstrative': {'PronType': 'Dem'},
+}
+
+# features of keys that depend on their parent: a tense directly below verb is a finite form,
+# while in a participle it is only the tense
+UD_SECTION_FEATURES = {
+    ('verb', 'imperative'): {'Mood': 'Imp', 'Person': '2', 'VerbForm': 'Fin'},
+    ('verb', 'past'): {'Mood': 'Ind', 'VerbForm': 'Fin'},
+    ('verb', 'present'): {'Mood': 'Ind', 'VerbForm': 'Fin'},
+    ('verb', 'future'): {'Mood': 'Ind', 'VerbForm': 'Fin'},
+    ('verb', 'participle'): {'VerbForm': 'Part'},
+}
+
+
+@lru_cache()
+def ud_feature_table() -> Dict[int, str]:
+    """
+    Builds the UD FEATS of every inflection code from inflection_codes.yaml. Aspect is not among
+    them: it belongs to the verb, not to the form
+    :return: A dict of inflection code to FEATS string (Case=Gen|Number=Plur), '_' for a code without features
+    """
+    found: Dict[int, List[dict]] = {}
+
+    def walk(node: Union[dict, int], path: Tuple[str, ...], features: dict):
+        if not isinstance(node, dict):
+            found.setdefault(node, []).append(features)
+            return
+        for (key, child) in node.items():
+            child_features = dict(features)
+            child_features.update(UD_KEY_FEATURES.get(key, {}))
+            child_features.update(UD_SECTION_FEATURES.get(path[-1:] + (key,), {}))
+            walk(child, path + (key,), child_features)
+    walk(load_inflection_codes(), (), {})
+
+    table = {}
+    for (code, paths) in found.items():
+        # a code listed in several places (the noun locative, under singular and plural) keeps
+        # only the features they agree on
+        common = {name: value for (name, value) in paths[0].items() if all(p.get(name) == value for p in paths)}
+        table[code] = '|'.join(f'{name}={common[name]}' for name in sorted(common, key=str.lower)) or '_'
+    return table
+
+
+@lru_cache()
+def ud_feature_array() -> List[Optional[str]]:
+    """
+    Returns ud_feature_table as a list indexed by inflection code, for bulk conversion
+    :return: The FEATS string at the index of every code, None at other indices
+    """
+    table = ud_feature_table()
+    array = [None] * (max(table) + 1)
+    for (code, feats) in table.items():
+        array[code] = feats
+    return array
+
+
+@lru_cache()
+def ud_feature_object_array():
+    """
+    Returns ud_feature_array as a numpy object array with one more None at its end, where codes2feats
+    sends every index that is not an inflection code
+    :return: The numpy array
+    """
+    # numpy is only needed by callers that already have it
+    import numpy
+    return numpy.array(ud_feature_array() + [None], dtype=object)
+
+
+def code2feats(code: int) -> Optional[str]:
+    """
+    Returns the Universal Dependencies features of an inflection code
+    :param code: The inflection code
+    :return: The FEATS string, e.g. 'Case=Gen|Number=Plur' for 4; '_' for a code without features
+    and None for an unknown code
+    """
+    return ud_feature_table().get(code)
+
+
+def codes2feats(codes: Sequence[int]):
+    """
+    Returns the Universal Dependencies features of many inflection codes at once, by indexing the
+    precomputed table rather than looking each code up
+    :param codes: Inflection codes, as a sequence or a numpy integer array
+    :return: A list of FEATS strings, or a numpy object array for a numpy array; None for an index
+    that is not an inflection code
+    """
+    array = ud_feature_array()
+    if hasattr(codes, 'dtype'):
+        import numpy
+        size = len(array)
+        return ud_feature_object_array()[numpy.where((codes >= 0) & (codes < size), codes, size)]
+    return [array[code] if 0 <= code < len(array) else None for code in codes]
+
+
 class SpeechPart(Enum):
     """
     Part of speech enumeration
@@ -326,6 +444,8 @@ class NounInflection(object):
     """
     A NounInflection is a single case with singular and plural forms
     """
+    __slots__ = ('singular', 'plural')
+
     def __init__(self):
         self.singular = []
         self.plural = []
@@ -348,6 +468,8 @@ class NounCase(object):
     """
     A single noun case, comprising a NounCaseType and an Inflection
     """
+    __slots__ = ('casetype', 'inflection')
+
     def __init__(self, case_type: NounCaseType, inflection: NounInflection):
         """
         Returns a new instance of the class
@@ -362,6 +484,8 @@ class AdjectiveInflection(object):
     """
     Inflected form of adjective
     """
+    __slots__ = ('masculine', 'feminine', 'neuter', 'plural')
+
     def __init__(self):
         self.masculine = None
         self.feminine = None
@@ -398,6 +522,9 @@ class Word(object):
     """
     A single word comprising its dictionary form and part of speech
     """
+    # grammar objects are held by the million in a lexicon, so none of them carries a __dict__
+    __slots__ = ('value', 'pos', 'zaliznyak', '_inflection_codes')
+
     def __init__(self, word: str, pos: SpeechPart):
         """
         Returns a new instance of Word class
@@ -406,9 +533,24 @@ class Word(object):
         """
         self.value = word
         self.pos = pos
+        # the Zaliznyak index of the page, e.g. 'жо 3*a' or '1a', when the parser found one
+        self.zaliznyak: Optional[str] = None
+        self._inflection_codes: Optional[list] = None
+
+    @property
+    def inflection_code_list(self):
+        """
+        Returns the word's forms and their inflection codes, collected once per instance on first use
+        :return: A list of tuples whose first member is the form and whose second member is the inflection code
+        """
+        if self._inflection_codes is None:
+            self._inflection_codes = self.collect_inflection_codes()
+        return self._inflection_codes
 
 
 class Pronoun(Word):
+    __slots__ = ('nominative', 'genitive', 'dative', 'accusative', 'instrumental', 'prepositional')
+
     def __init__(self, word):
         super().__init__(word, SpeechPart.PRONOUN)
         self.nominative: Optional[str]
@@ -425,11 +567,15 @@ class Pronoun(Word):
         property_name = NounCaseType.case_name_for_type(case_type)
         setattr(self, property_name, word)
 
-    @property
-    @lru_cache()
-    def inflection_code_list(self):
-        with open('inflection_codes.yaml') as file:
-            inflection_codes = yaml.safe_load(file)
+    def code_prefix(self):
+        """
+        Returns the object's code prefix for inflection code discovery
+        :return: Returns the object's code prefix
+        """
+        return 'pron'
+
+    def collect_inflection_codes(self):
+        inflection_codes = load_inflection_codes()
         cases = ['nominative', 'genitive', 'dative', 'accusative', 'instrumental', 'prepositional']
         export_words = []
         for casestr in cases:
@@ -442,6 +588,9 @@ class Noun(Word):
     """
     A single noun word and all of its inflected forms
     """
+    __slots__ = ('nominative', 'genitive', 'dative', 'accusative', 'instrumental', 'prepositional',
+                 'vocative', 'locative')
+
     def __init__(self, word: str):
         """
         Returns a new instance of Noun class
@@ -477,16 +626,20 @@ class Noun(Word):
         case_inflection.add_form(issingular, words)
         setattr(self, casestr, case_inflection)
 
-    @property
-    @lru_cache()
-    def inflection_code_list(self):
+    def code_prefix(self):
+        """
+        Returns the object's code prefix for inflection code discovery
+        :return: Returns the object's code prefix
+        """
+        return 'noun'
+
+    def collect_inflection_codes(self):
         """
         Returns a list of parsed words and inflection codes as defined in inflection_codes.yaml
         :return: Returns a list of tuples whose first member is the inflected form of
         the noun and whose second member is the inflection code.
         """
-        with open('inflection_codes.yaml') as file:
-            inflection_codes = yaml.safe_load(file)
+        inflection_codes = load_inflection_codes()
         cases = ['nominative', 'genitive', 'dative', 'accusative', 'instrumental', 'prepositional',
                  'locative', 'vocative']
         export_words = []
@@ -508,6 +661,9 @@ class AdjectiveLike(Word):
     """
     Base class for an adjective-like object
     """
+    __slots__ = ('nominative', 'genitive', 'dative', 'accusative_animate', 'accusative_inanimate',
+                 'instrumental', 'prepositional', 'short_form', '_code_prefix')
+
     def __init__(self, word: str, pos: SpeechPart):
         """
         Returns a newly initialized instance of the Adjective class
@@ -531,15 +687,12 @@ class AdjectiveLike(Word):
     def code_prefix(self):
         return self._code_prefix
 
-    @property
-    @lru_cache()
-    def inflection_code_list(self):
+    def collect_inflection_codes(self):
         """
         Returns all of the inflected forms of the adjective as list of tuples :return: Inflected forms and their
         codes as list of tuples, the first member of which is the word and the second is the inflection code.
         """
-        with open('inflection_codes.yaml') as file:
-            inflection_codes = yaml.safe_load(file)
+        inflection_codes = load_inflection_codes()
         cases = ['nominative', 'genitive', 'dative', 'accusative_animate',
                  'accusative_inanimate', 'instrumental', 'prepositional',
                  'short_form']
@@ -590,6 +743,8 @@ class Adjective(AdjectiveLike):
     """
     An Adjective object
     """
+    __slots__ = ()
+
     def __init__(self, word: str):
         super(Adjective, self).__init__(word, SpeechPart.ADVERB)
 
@@ -605,6 +760,8 @@ class PossessivePronoun(AdjectiveLike):
     """
     A possessive pronoun object
     """
+    __slots__ = ()
+
     def __init__(self, word: str):
         super(PossessivePronoun, self).__init__(word, SpeechPart.PRONOUN_POSSESSIVE)
 
@@ -620,6 +777,7 @@ class DemonstrativePronoun(AdjectiveLike):
     """
         A demonstrative pronoun object, like этот, тот, etc.
         """
+    __slots__ = ()
 
     def __init__(self, word: str):
         super().__init__(word, SpeechPart.PRONOUN_DEMONSTRATIVE)
@@ -636,6 +794,8 @@ class VerbTensePlurality(object):
     """
     An object that encapsulates three persons (1st person, 2nd person, 3rd person) within a verb conjugation.
     """
+    __slots__ = ('p1', 'p2', 'p3')
+
     def __init__(self):
         self.p1 = None
         self.p2 = None
@@ -646,6 +806,8 @@ class VerbTense(object):
     """
     A verb tense, encapsulating singular and plural columns
     """
+    __slots__ = ('singular', 'plural')
+
     def __init__(self):
         self.singular = VerbTensePlurality()
         self.plural = VerbTensePlurality()
@@ -700,6 +862,8 @@ class VerbPastTense(object):
         neuter      The neuter form of the past tense
         plural      The plural form of the past tense
     """
+    __slots__ = ('masculine', 'feminine', 'neuter', 'plural')
+
     def __init__(self):
         self.masculine = None
         self.feminine = None
@@ -715,6 +879,8 @@ class VerbImperativeTense(object):
         singular    The singular form.
         plural      The plural form.
     """
+    __slots__ = ('singular', 'plural')
+
     def __init__(self):
         self.singular = None
         self.plural = None
@@ -736,6 +902,10 @@ class Verb(Word):
         present_passive_participle      Present passive participle
         past_passive_participle         Past passive participle
     """
+    __slots__ = ('present', 'future', 'past', 'imperative', 'present_active_participle', 'past_active_participle',
+                 'present_adverbial_participle', 'past_adverbial_participle', 'present_passive_participle',
+                 'past_passive_participle')
+
     def __init__(self, word:str):
         super(Verb, self).__init__(word, SpeechPart.VERB)
         self.present = VerbTense()
@@ -760,6 +930,13 @@ class Verb(Word):
             return
         setattr(self.past, genderstr, word)
 
+    def code_prefix(self):
+        """
+        Returns the object's code prefix for inflection code discovery
+        :return: Returns the object's code prefix
+        """
+        return 'verb'
+
     def has_present_tense(self):
         """
         Returns whether object has a present tense or not.
@@ -797,15 +974,12 @@ class Verb(Word):
         except ValueError:
             return None
 
-    @property
-    @lru_cache()
-    def inflection_code_list(self):
+    def collect_inflection_codes(self):
         """
         Returns a list of inflection codes for the valid forms of this verb :return: Inflection codes for this verb a
         list of tuples, the first member of which is the form and the second is the inflection code.
         """
-        with open('inflection_codes.yaml') as file:
-            inflection_codes = yaml.safe_load(file)
+        inflection_codes = load_inflection_codes()
         export_words = []
         src_list = ['p1', 'p2', 'p3']
         p_list = ['first_person', 'second_person', 'third_person']
@@ -0,0 +1,107 @@
+from functools import lru_cache
+from typing import Optional, List, Dict, Tuple, Union, Iterable, FrozenSet
+from grammar import *
+from lexicon import *
+from paradigm import paradigm_layouts
+
+# Inflection for text generation: "this lemma in this slot", asked for many pairs at once.
+# A slot is an inflection code, or Universal Dependencies features (a FEATS string such as
+# 'Case=Gen|Number=Plur', or a dict of feature to value) standing for every code that has
+# them all. Each distinct lemma is looked up in the lexicon once, decoding only the forms of
+# the codes asked for it.
+Slot = Union[int, str, Dict[str, str]]
+
+
+@lru_cache()
+def code_feature_sets() -> Dict[int, FrozenSet[str]]:
+    """
+    Returns the features of every inflection code as sets, for matching
+    :return: A dict of inflection code to its set of 'Name=Value' strings
+    """
+    return {code: frozenset(feats.split('|')) if feats != '_' else frozenset()
+            for (code, feats) in ud_feature_table().items()}
+
+
+@lru_cache(maxsize=4096)
+def feature_codes(feats: str) -> FrozenSet[int]:
+    """
+    Returns the inflection codes that have some features
+    :param feats: A FEATS string, e.g. 'Case=Gen|Number=Plur'
+    :return: Every code whose features include them all
+    :raises ValueError: if no code has them
+    """
+    wanted = frozenset(pair.strip() for pair in feats.split('|') if pair.strip())
+    codes = frozenset(code for (code, features) in code_feature_sets().items() if wanted and wanted <= features)
+    if not codes:
+        raise ValueError(f'No inflection code has the features {feats}')
+    return codes
+
+
+def slot_codes(slot: Slot) -> FrozenSet[int]:
+    """
+    Returns the inflection codes a slot stands for
+    :param slot: An inflection code (an int or a string of digits), a FEATS string or a dict of feature to value
+    :return: The codes
+    :raises ValueError: for an unknown code or features that no code has
+    """
+    if isinstance(slot, dict):
+        slot = '|'.join(f'{name}={value}' for (name, value) in sorted(slot.items(), key=lambda item: item[0].lower()))
+    elif isinstance(slot, str) and slot.strip().isdigit():
+        slot = int(slot)
+    if isinstance(slot, str):
+        return feature_codes(slot)
+    if isinstance(slot, bool) or not isinstance(slot, int):
+        raise ValueError(f'Not an inflection code or features: {slot!r}')
+    if not any(slot in layout.slots for layout in paradigm_layouts().values()):
+        raise ValueError(f'Unknown inflection code {slot}')
+    return frozenset((slot,))
+
+
+def forms_by_code(entries: List[LexiconEntry]) -> Dict[int, List[str]]:
+    """
+    Gathers the forms of a lemma's entries by inflection code
+    :param entries: The entries; homographs are merged
+    :return: A dict of inflection code to its forms, in entry and row order, each form once
+    """
+    forms: Dict[int, List[str]] = {}
+    for entry in entries:
+        for (form, code) in entry.forms:
+            if form not in forms.setdefault(code, []):
+                forms[code].append(form)
+    return forms
+
+
+def inflect_many(lexicon: MappedLexicon, requests: Iterable[Tuple[str, Slot]]) -> List[List[str]]:
+    """
+    Inflects many lemmas at once
+    :param lexicon: The mapped lexicon
+    :param requests: (lemma, slot) tuples, the slot as slot_codes takes it; a lemma is matched as the
+    lexicon matches user input, regardless of stress marks, ё and case
+    :return: For every request, in input order, the forms of the lemma in the slot, by code and then
+    as stored; empty when the lemma is unknown or has no such form
+    :raises ValueError: for an unknown code or features that no code has
+    """
+    wanted = [(lemma, slot_codes(slot)) for (lemma, slot) in requests]
+    codes_by_lemma: Dict[str, set] = {}
+    for (lemma, codes) in wanted:
+        codes_by_lemma.setdefault(lemma, set()).update(codes)
+    paradigms = {lemma: forms_by_code(lexicon.resolve(lemma, codes)) for (lemma, codes) in codes_by_lemma.items()}
+    results = []
+    for (lemma, codes) in wanted:
+        forms = []
+        for code in sorted(codes):
+            forms.extend(form for form in paradigms[lemma].get(code, ()) if form not in forms)
+        results.append(forms)
+    return results
+
+
+def inflect(lexicon: MappedLexicon, lemma: str, slot: Slot) -> Optional[str]:
+    """
+    Inflects one lemma
+    :param lexicon: The mapped lexicon
+    :param lemma: The lemma
+    :param slot: The slot, as slot_codes takes it
+    :return: The first of its forms in the slot, or None
+    """
+    (forms,) = inflect_many(lexicon, [(lemma, slot)])
+    return forms[0] if forms else None
@@ -0,0 +1,340 @@
+import mmap
+import os
+import struct
+from collections import namedtuple
+from typing import Optional, List, Tuple, Iterable, Iterator, Collection
+from grammar import *
+from normalize import normalize_form, split_stress
+
+# A lexicon file is a read-only image that is memory-mapped and searched in place, so
+# opening it costs the same whatever its size and forked workers share its pages.
+#
+#   header     magic, version, the counts and the offsets of the sections below
+#   offsets    uint32 × (strings + 1): start of each string in the string data
+#   strings    UTF-8 text of every lemma and form, sorted bytewise; a string's id is its rank
+#   entries    one ENTRY per paradigm, sorted by lemma id: lemma id, first row, row count, pos
+#   rows       one ROW per inflected form: form id, inflection code
+#   forms      one FORM per distinct (form, entry) pair, sorted by form id
+#   norms      one NORM per distinct (form, entry) pair and per entry's lemma, sorted by the
+#              normalized spelling's id: normalized id, form id, entry, stressed letter
+#   indexes    uint32 per entry: 1 + the string id of its Zaliznyak index, or 0 if it has none
+MAGIC = b'RPMLEX'
+VERSION = 3
+HEADER = struct.Struct('<6sH12I')
+OFFSET = struct.Struct('<I')
+ENTRY = struct.Struct('<IIHB')
+ROW = struct.Struct('<IH')
+FORM = struct.Struct('<II')
+NORM = struct.Struct('<IIIH')
+# the stress field of a form whose stress is not marked
+NO_STRESS = 0xFFFF
+
+LexiconEntry = namedtuple('LexiconEntry', ['lemma', 'pos', 'forms', 'zaliznyak'], defaults=(None,))
+LexiconEntry.__doc__ = '''A lexicon paradigm: the lemma, its SpeechPart, a list of (form, inflection code) tuples
+and its Zaliznyak index (None if the page has none)'''
+
+NormalizedForm = namedtuple('NormalizedForm', ['form', 'stress', 'entry'])
+NormalizedForm.__doc__ = '''A stored form matching a normalized spelling: the form as stored, the index of its
+stressed letter once the stress marks are removed (or None), and the index of its entry'''
+
+
+def entry_from_word(word: Word, pos: SpeechPart) -> LexiconEntry:
+    """
+    Returns the lexicon entry for a parsed grammar object
+    :param word: The grammar object
+    :param pos: Its SpeechPart (AdjectiveLike objects do not record their own)
+    :return: The lexicon entry
+    """
+    forms = [(form, code) for (form, code) in word.inflection_code_list if form]
+    return LexiconEntry(word.value, pos, forms, word.zaliznyak)
+
+
+def entries_from_page(page) -> List[LexiconEntry]:
+    """
+    Returns a lexicon entry for every part of speech block on a page, releasing the page afterwards
+    :param page: A RuWikitionary page
+    :return: The lexicon entries; uninflected parts of speech have no forms
+    """
+    entries = []
+    try:
+        for (pos, word) in page.parse_all():
+            if word is None:
+                entries.append(LexiconEntry(page.word, pos, []))
+            else:
+                entries.append(entry_from_word(word, pos))
+    finally:
+        page.release()
+    return entries
+
+
+def write_lexicon(path: str, entries: Iterable[LexiconEntry]):
+    """
+    Writes a lexicon file
+    :param path: The file to write
+    :param entries: The lexicon entries; a lemma may have several (homographs)
+    :return: Nothing
+    """
+    entries = list(entries)
+    texts = {entry.lemma for entry in entries}
+    for entry in entries:
+        texts.update(form for (form, code) in entry.forms)
+    normalized = {text: normalize_form(text) for text in texts}
+    texts.update(normalized.values())
+    texts.update(entry.zaliznyak for entry in entries if entry.zaliznyak)
+    encoded = sorted(text.encode('utf-8') for text in texts)
+    ids = {text.decode('utf-8'): idx for (idx, text) in enumerate(encoded)}
+
+    offsets = bytearray()
+    position = 0
+    for text in encoded:
+        offsets += OFFSET.pack(position)
+        position += len(text)
+    offsets += OFFSET.pack(position)
+    string_data = b''.join(encoded)
+
+    # Python's sort is stable, so homographs keep their order
+    entries.sort(key=lambda e: ids[e.lemma])
+    entry_data = bytearray()
+    row_data = bytearray()
+    index_data = bytearray()
+    form_pairs = set()
+    norm_pairs = set()
+    row_count = 0
+    for (entry_idx, entry) in enumerate(entries):
+        entry_data += ENTRY.pack(ids[entry.lemma], row_count, len(entry.forms), entry.pos.value)
+        norm_pairs.add((entry.lemma, entry_idx))
+        index_data += OFFSET.pack(ids[entry.zaliznyak] + 1 if entry.zaliznyak else 0)
+        for (form, code) in entry.forms:
+            row_data += ROW.pack(ids[form], code)
+            form_pairs.add((ids[form], entry_idx))
+            norm_pairs.add((form, entry_idx))
+        row_count += len(entry.forms)
+    form_data = b''.join(FORM.pack(form_id, entry_idx) for (form_id, entry_idx) in sorted(form_pairs))
+    norm_records = []
+    for (text, entry_idx) in norm_pairs:
+        stress = split_stress(text)[1]
+        norm_records.append((ids[normalized[text]], ids[text], entry_idx, NO_STRESS if stress is None else stress))
+    norm_data = b''.join(NORM.pack(*record) for record in sorted(norm_records))
+
+    sections = [offsets, string_data, entry_data, row_data, form_data, norm_data, index_data]
+    section_offsets = []
+    position = HEADER.size
+    for section in sections:
+        section_offsets.append(position)
+        position += len(section)
+    header = HEADER.pack(MAGIC, VERSION, len(encoded), len(entries), row_count, len(form_pairs),
+                         len(norm_records), *section_offsets)
+    with open(path, 'wb') as file:
+        file.write(header)
+        for section in sections:
+            file.write(section)
+
+
+class MappedLexicon(object):
+    """
+    A read-only lexicon file, memory-mapped and searched in place
+    """
+    def __init__(self, path: str):
+        """
+        Maps a lexicon file; nothing beyond the header is read
+        :param path: The lexicon file
+        """
+        with open(path, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            # when the file was built, which is when every answer it gives last changed
+            self.modified = os.fstat(file.fileno()).st_mtime
+        (magic, version, self.string_count, self.entry_count, self.row_count, self.form_count, self.norm_count,
+         self.offsets_at, self.strings_at, self.entries_at, self.rows_at, self.forms_at, self.norms_at,
+         self.indexes_at) = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            self.buffer.close()
+            raise ValueError(f'{path} is not a lexicon file')
+        if version != VERSION:
+            self.buffer.close()
+            raise ValueError(f'Unsupported lexicon version {version}')
+
+    def close(self):
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self.entry_count
+
+    def __iter__(self) -> Iterator[LexiconEntry]:
+        for idx in range(self.entry_count):
+            yield self.entry(idx)
+
+    def string_bytes(self, idx: int) -> bytes:
+        """
+        Returns the UTF-8 bytes of a string
+        :param idx: The string id
+        :return: The encoded string
+        """
+        (start,) = OFFSET.unpack_from(self.buffer, self.offsets_at + idx * OFFSET.size)
+        (end,) = OFFSET.unpack_from(self.buffer, self.offsets_at + (idx + 1) * OFFSET.size)
+        return self.buffer[self.strings_at + start:self.strings_at + end]
+
+    def string(self, idx: int) -> str:
+        """
+        Returns a string
+        :param idx: The string id
+        :return: The string
+        """
+        return self.string_bytes(idx).decode('utf-8')
+
+    def entry_fields(self, idx: int) -> Tuple[int, int, int, int]:
+        """
+        Returns the raw fields of an entry
+        :param idx: The entry index
+        :return: A tuple of lemma id, first row, row count and SpeechPart value
+        """
+        return ENTRY.unpack_from(self.buffer, self.entries_at + idx * ENTRY.size)
+
+    def rows(self, first: int, count: int) -> List[Tuple[int, int]]:
+        """
+        Returns a run of rows
+        :param first: The first row
+        :param count: The number of rows
+        :return: A list of (form id, inflection code) tuples
+        """
+        start = self.rows_at + first * ROW.size
+        return list(ROW.iter_unpack(self.buffer[start:start + count * ROW.size]))
+
+    def entry(self, idx: int, codes: Optional[Collection[int]] = None) -> LexiconEntry:
+        """
+        Returns an entry
+        :param idx: The entry index
+        :param codes: Only the forms with these inflection codes, or None for all of them
+        :return: The lexicon entry
+        """
+        (lemma_id, first, count, pos) = self.entry_fields(idx)
+        rows = self.rows(first, count)
+        if codes is not None:
+            # the rows hold the codes, so the strings of the other forms are never read
+            rows = [(form_id, code) for (form_id, code) in rows if code in codes]
+        forms = [(self.string(form_id), code) for (form_id, code) in rows]
+        return LexiconEntry(self.string(lemma_id), SpeechPart(pos), forms, self.zaliznyak(idx))
+
+    def zaliznyak(self, idx: int) -> Optional[str]:
+        """
+        Returns the Zaliznyak index of an entry
+        :param idx: The entry index
+        :return: The index, or None if the page has none
+        """
+        (index_id,) = OFFSET.unpack_from(self.buffer, self.indexes_at + idx * OFFSET.size)
+        return self.string(index_id - 1) if index_id else None
+
+    def lower_bound(self, count: int, key_at, target: bytes) -> int:
+        """
+        Binary search over a sorted section
+        :param count: The number of records in the section
+        :param key_at: Function returning the sort key (encoded string) of a record index
+        :param target: The encoded string to look for
+        :return: The index of the first record whose key is not less than target
+        """
+        (low, high) = (0, count)
+        while low < high:
+            middle = (low + high) // 2
+            if key_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, lemma: str, codes: Optional[Collection[int]] = None) -> List[LexiconEntry]:
+        """
+        Returns the entries of a lemma
+        :param lemma: The dictionary form
+        :param codes: Only the forms with these inflection codes, or None for all of them
+        :return: Every entry of the lemma (several for homographs), or an empty list
+        """
+        target = lemma.encode('utf-8')
+
+        def lemma_at(idx):
+            return self.string_bytes(self.entry_fields(idx)[0])
+        idx = self.lower_bound(self.entry_count, lemma_at, target)
+        entries = []
+        while idx < self.entry_count and lemma_at(idx) == target:
+            entries.append(self.entry(idx, codes))
+            idx += 1
+        return entries
+
+    def lookup_form(self, form: str) -> List[Tuple[str, SpeechPart, int]]:
+        """
+        Analyzes an inflected form
+        :param form: The inflected form, exactly as stored
+        :return: A list of (lemma, SpeechPart, inflection code) tuples, one per reading of the form
+        """
+        target = form.encode('utf-8')
+
+        def form_at(idx):
+            (form_id, entry_idx) = FORM.unpack_from(self.buffer, self.forms_at + idx * FORM.size)
+            return self.string_bytes(form_id)
+        idx = self.lower_bound(self.form_count, form_at, target)
+        readings = []
+        while idx < self.form_count and form_at(idx) == target:
+            (form_id, entry_idx) = FORM.unpack_from(self.buffer, self.forms_at + idx * FORM.size)
+            (lemma_id, first, count, pos) = self.entry_fields(entry_idx)
+            lemma = self.string(lemma_id)
+            for (row_form_id, code) in self.rows(first, count):
+                if row_form_id == form_id:
+                    readings.append((lemma, SpeechPart(pos), code))
+            idx += 1
+        return readings
+
+    def lookup_normalized(self, word: str) -> List[NormalizedForm]:
+        """
+        Finds the stored forms and lemmas that match user input regardless of stress marks, ё and case
+        :param word: The input, in any spelling
+        :return: A NormalizedForm for every (form, entry) pair whose normalized spelling is the input's
+        """
+        target = normalize_form(word).encode('utf-8')
+
+        def norm_at(idx):
+            return self.string_bytes(NORM.unpack_from(self.buffer, self.norms_at + idx * NORM.size)[0])
+        idx = self.lower_bound(self.norm_count, norm_at, target)
+        matches = []
+        while idx < self.norm_count and norm_at(idx) == target:
+            (norm_id, form_id, entry_idx, stress) = NORM.unpack_from(self.buffer, self.norms_at + idx * NORM.size)
+            matches.append(NormalizedForm(self.string(form_id), None if stress == NO_STRESS else stress, entry_idx))
+            idx += 1
+        return matches
+
+    def resolve(self, word: str, codes: Optional[Collection[int]] = None) -> List[LexiconEntry]:
+        """
+        Returns the entries for user input that may be a lemma or an inflected form
+        :param word: The lemma or form
+        :param codes: Only the forms with these inflection codes, or None for all of them
+        :return: The lemma's entries; failing that, the entries of every lemma the form belongs to;
+        failing that, the entries holding a form or lemma spelled the same but for stress, ё and case
+        """
+        entries = self.lookup(word, codes)
+        if entries:
+            return entries
+        for lemma in unique_lemmas(self.lookup_form(word)):
+            entries.extend(self.lookup(lemma, codes))
+        if entries:
+            return entries
+        indices = []
+        for match in self.lookup_normalized(word):
+            if match.entry not in indices:
+                indices.append(match.entry)
+        return [self.entry(idx, codes) for idx in indices]
+
+
+def unique_lemmas(readings: List[Tuple[str, SpeechPart, int]]) -> List[str]:
+    """
+    Returns the distinct lemmas of a form's readings, in order
+    :param readings: The (lemma, SpeechPart, inflection code) tuples returned by lookup_form
+    :return: The lemmas
+    """
+    lemmas = []
+    for (lemma, pos, code) in readings:
+        if lemma not in lemmas:
+            lemmas.append(lemma)
+    return lemmas
@@ -3,53 +3,169 @@
 """ru_pos_mining
 
 Usage:
-    main.py show RUWORD [--code=INFLECTION] [--format=FORMAT]
-    main.py runserver
+    main.py show RUWORD [--code=INFLECTION] [--format=FORMAT] [--lexicon=FILE]
+    main.py build-lexicon FILE RUWORD...
+    main.py export --lexicon=FILE OUTPUT [--cursor=N] [--limit=N] [--row-group-size=N] [--compact]
+    main.py suggest RUWORD --lexicon=FILE [--distance=N] [--limit=N]
+    main.py endings SUFFIX --lexicon=FILE [--code=INFLECTION] [--limit=N]
+    main.py complete PREFIX --lexicon=FILE [--frequencies=FILE] [--limit=N]
+    main.py annotate --lexicon=FILE INPUT OUTPUT [--processes=N]
+    main.py runserver [--lexicon=FILE] [--suggestions] [--endings] [--completions] [--frequencies=FILE]
+                      [--host=HOST] [--port=PORT] [--workers=N] [--timeout=SECONDS] [--upstream=URL]
+                      [--cache-size=N] [--cache-ttl=SECONDS] [--negative-ttl=SECONDS] [--error-ttl=SECONDS]
+                      [--max-age=SECONDS] [--negative-max-age=SECONDS] [--asgi | --debug]
     main.py --version
 
 Options:
     -h --help                           Show this screen.
     --version                           Show version.
-    -c INFLECTION --code=INFLECTION     Return only form for code.
+    -c INFLECTION --code=INFLECTION     Return only form for code, or only forms with this code ending in SUFFIX.
     -f FORMAT --format=FORMAT           Output format 'json' or 'xml'. [default: json]
+    -l FILE --lexicon=FILE              Answer with words found in this lexicon file without fetching them.
+    --cursor=N                          Entry to start the export at. [default: 0]
+    --limit=N                           Most entries to export, or suggestions, forms or completions to show.
+    --frequencies=FILE                  Rank completions by this list of words and their counts.
+    --suggestions                       Serve /suggest from every form of --lexicon and the words fetched since.
+    --endings                           Index every form of --lexicon for /endings before the workers fork.
+    --completions                       Index every lemma of --lexicon for /complete; implied by --frequencies.
+    --row-group-size=N                  Rows per row group of a Parquet or Arrow export. [default: 100000]
+    --compact                           Export nouns and adjectives as their Zaliznyak index and irregular forms.
+    --distance=N                        Largest edit distance of a suggestion, at most 2. [default: 2]
+    -p N --processes=N                  Processes annotating the text; 0 uses one per CPU. [default: 0]
+    --host=HOST                         Address to listen on. [default: 0.0.0.0]
+    --port=PORT                         Port to listen on. [default: 43561]
+    -w N --workers=N                    Worker processes, each serving requests on threads. [default: 4]
+    -t SECONDS --timeout=SECONDS        Seconds to wait for Wiktionary before giving up on a word. [default: 10]
+    --upstream=URL                      Base URL of the Wiktionary pages. [default: https://ru.wiktionary.org/wiki/]
+    --cache-size=N                      Fetched answers each worker keeps; 0 turns the cache off. [default: 10000]
+    --cache-ttl=SECONDS                 Seconds a fetched word is kept. [default: 86400]
+    --negative-ttl=SECONDS              Seconds a "not found" answer is kept. [default: 3600]
+    --error-ttl=SECONDS                 Seconds a Wiktionary failure is kept. [default: 30]
+    --max-age=SECONDS                   Cache-Control max-age of a found word. [default: 86400]
+    --negative-max-age=SECONDS          Cache-Control max-age of a "not found" answer. [default: 300]
+    --asgi                              Serve the asynchronous application in asgi.py with uvicorn.
+    --debug                             Run the single-process Flask development server with the debugger.
 
 """
 from docopt import docopt
 from ruwiktionary import *
 from grammar import *
+from lexicon import *
+from service import *
+from serving import serve, run_asgi_worker
+from annotate import annotate_lines
+from complete import CompletionTrie, load_frequencies
+from stringpool import form_pool
 import json
 from flask import Flask
-from flask import request, jsonify
+from flask import request, jsonify, Response
 from flask_cors import CORS
 
 app = Flask(__name__)
 cors = CORS(app)
 app.config['CORS_HEADERS'] = 'Content-Type'
 app.config['JSON_AS_ASCII'] = False
+app.config['FLIGHTS'] = SingleFlight()
+app.config['MAX_AGE'] = MAX_AGE
+app.config['NEGATIVE_MAX_AGE'] = NEGATIVE_MAX_AGE
 
 
 @app.route('/forms/<w>')
 def serve_word(w):
     ru_word = urllib.parse.unquote(w)
-    # print(ru_word)
-    w_page = RuWikitionary(ru_word, False)
-    w_tree = w_page.root_tree
-    w_word = w_page.parse()
-    if w_page.pos is None:
-        w_output = {'inp': ru_word, 'error': 'Not found. Is this an uninflected form? Spelling?'}
-    else:
-        w_output = {'inp': ru_word, 'pos': w_page.pos.to_upos()}
-        w_outforms = []
-        try:
-            for w in w_word.inflection_code_list:
-                (term, inflection_code) = w
-                description = code2term(inflection_code)
-                w_outforms.append({'code': inflection_code, 'form': term, 'desc': description})
-            w_output['forms'] = w_outforms
-        except AttributeError:
-            pass
-    # print(w_word.inflection_code_list)
-    return jsonify(w_output)
+    try:
+        (codes, upos) = forms_arguments(request.args)
+        features = features_argument(request.args)
+    except ValueError as e:
+        return jsonify({'inp': ru_word, 'error': str(e)}), 400
+    (w_output, status, modified) = word_output(ru_word, app.config.get('LEXICON'), app.config.get('CACHE'),
+                                               app.config.get('FLIGHTS'), codes, upos, app.config.get('FUZZY_INDEX'))
+    if features:
+        w_output = with_features(w_output)
+    headers = caching_headers(w_output, status, modified, app.config['MAX_AGE'], app.config['NEGATIVE_MAX_AGE'])
+    if not_modified(headers, request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since')):
+        return '', 304, headers
+    return jsonify(w_output), status, headers
+
+
+@app.route('/suggest/<w>')
+def serve_suggest(w):
+    index: Optional[SymmetricDeleteIndex] = app.config.get('FUZZY_INDEX')
+    if index is None:
+        return jsonify({'error': SUGGESTIONS_NOT_LOADED}), 404
+    ru_word = request_key(urllib.parse.unquote(w))
+    try:
+        return jsonify(suggest_output(index, ru_word, request.args))
+    except ValueError:
+        return jsonify({'error': 'distance and limit must be non-negative integers'}), 400
+
+
+@app.route('/endings/<suffix>')
+def serve_endings(suffix):
+    index: Optional[SuffixIndex] = app.config.get('SUFFIX_INDEX')
+    if index is None:
+        return jsonify({'error': ENDINGS_NOT_LOADED}), 404
+    suffix = request_key(urllib.parse.unquote(suffix))
+    try:
+        return jsonify(endings_output(index, suffix, request.args))
+    except ValueError as e:
+        return jsonify({'inp': suffix, 'error': str(e)}), 400
+
+
+@app.route('/complete/<prefix>')
+def serve_complete(prefix):
+    trie: Optional[CompletionTrie] = app.config.get('COMPLETION_TRIE')
+    if trie is None:
+        return jsonify({'error': COMPLETIONS_NOT_LOADED}), 404
+    try:
+        return jsonify(complete_output(trie, request_key(urllib.parse.unquote(prefix)), request.args))
+    except ValueError:
+        return jsonify({'error': 'limit must be a non-negative integer'}), 400
+
+
+@app.route('/inflect', methods=['POST'])
+def serve_inflect():
+    lexicon: Optional[MappedLexicon] = app.config.get('LEXICON')
+    if lexicon is None:
+        return jsonify({'error': 'No lexicon is loaded'}), 404
+    try:
+        return jsonify(inflect_output(lexicon, inflect_arguments(request.get_json(silent=True))))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/export')
+def serve_export():
+    lexicon: Optional[MappedLexicon] = app.config.get('LEXICON')
+    if lexicon is None:
+        return jsonify({'error': 'No lexicon is loaded'}), 404
+    try:
+        (cursor, limit) = export_arguments(request.args)
+    except ValueError:
+        return jsonify({'error': 'cursor and limit must be non-negative integers'}), 400
+    compress = accepts_gzip(request.headers.get('Accept-Encoding'))
+    headers = {'Vary': 'Accept-Encoding'}
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+    return Response(export_chunks(lexicon, cursor, limit, compress, export_compact(request.args)),
+                    mimetype='application/x-ndjson', headers=headers)
+
+
+@app.route('/stats')
+def serve_stats():
+    return jsonify(stats_output(app.config.get('CACHE'), app.config.get('FLIGHTS')))
+
+
+def frequencies_argument(path: Optional[str]) -> Optional[Dict[str, int]]:
+    """
+    Reads the frequency list given with --frequencies
+    :param path: The file, or None
+    :return: A dict of normalized spelling to count, or None without a file
+    """
+    if not path:
+        return None
+    with open(path, encoding='utf-8') as lines:
+        return load_frequencies(lines)
 
 
 def object_to_xml(data: Union[dict, bool], root='object'):
@@ -70,32 +186,123 @@ if __name__ == "__main__":
     # show "собака" --format=xml
     arguments = docopt(__doc__, version='ru_pos_mining 0.75')
     print(arguments)
-    if arguments['RUWORD']:
-        page = RuWikitionary(arguments['RUWORD'], False)
-        tree = page.root_tree
-        # print(page.pos)
-        word = page.parse()
-        print(word.inflection_code_list)
+    if arguments['show']:
+        ru_word = arguments['RUWORD'][0]
+        codes = {int(arguments['--code'])} if arguments['--code'] else None
+        entries = []
+        if arguments['--lexicon']:
+            # only the rows of the asked-for code are read from the lexicon
+            with MappedLexicon(arguments['--lexicon']) as lexicon:
+                entries = lexicon.resolve(request_key(ru_word), codes)
+        if entries:
+            (pos, forms) = (entries[0].pos, entries[0].forms)
+        else:
+            page = RuWikitionary(ru_word, False)
+            (pos, word) = page.extract()
+            forms = word.inflection_code_list
+            if codes is not None:
+                forms = [(form, code) for (form, code) in forms if code in codes]
+        print(forms)
         if arguments['--code']:
-            code = int(arguments['--code'])
-            words = [w[0] for w in word.inflection_code_list if w[1] == code]
+            words = [form for (form, code) in forms]
             print(words)
         if arguments['--format']:
             if arguments['--format'] == 'json':
-                output = {'in': arguments['RUWORD'], 'pos': page.pos.to_upos()}
-                outforms = [{f'{x[1]}': x[0]} for x in word.inflection_code_list]
+                output = {'in': ru_word, 'pos': pos.to_upos()}
+                outforms = [{f'{x[1]}': x[0]} for x in forms]
                 output['forms'] = outforms
                 print(json.dumps(output))
             elif arguments['--format'] == 'xml':
-                output = {'in': arguments['RUWORD'], 'pos': page.pos.to_upos()}
+                output = {'in': ru_word, 'pos': pos.to_upos()}
 
                 def forms2dict(x):
                     return {'code': f'{x[1]}', 'form': f'{x[0]}'}
-                outforms = list(map(forms2dict, word.inflection_code_list))
+                outforms = list(map(forms2dict, forms))
                 output['forms'] = outforms
                 print(object_to_xml(output, 'inflections'))
+    elif arguments['build-lexicon']:
+        lexicon_entries = []
+        # forms repeated across pages are held once while the lexicon is built, and dropped with it
+        with form_pool():
+            for ru_word in arguments['RUWORD']:
+                lexicon_entries.extend(entries_from_page(RuWikitionary(ru_word, False)))
+        write_lexicon(arguments['FILE'], lexicon_entries)
+        print(f"{len(lexicon_entries)} entries written to {arguments['FILE']}")
+    elif arguments['export']:
+        compress = arguments['OUTPUT'].endswith('.gz')
+        limit = int(arguments['--limit']) if arguments['--limit'] else None
+        with MappedLexicon(arguments['--lexicon']) as lexicon:
+            if arguments['OUTPUT'].lower().endswith(('.parquet', '.arrows')):
+                # pyarrow is only needed for these formats
+                from columnar import write_columnar
+                write_columnar(lexicon, arguments['OUTPUT'], row_group_rows=int(arguments['--row-group-size']),
+                               cursor=int(arguments['--cursor']), limit=limit)
+            else:
+                with open(arguments['OUTPUT'], 'wb') as file:
+                    for chunk in export_chunks(lexicon, int(arguments['--cursor']), limit, compress,
+                                               arguments['--compact']):
+                        file.write(chunk)
+    elif arguments['suggest']:
+        with MappedLexicon(arguments['--lexicon']) as lexicon:
+            index = SymmetricDeleteIndex.from_lexicon(lexicon)
+        limit = int(arguments['--limit']) if arguments['--limit'] else 10
+        for suggestion in index.suggest(arguments['RUWORD'][0], int(arguments['--distance']), limit):
+            print(f'{suggestion.distance}\t{suggestion.form}\t{suggestion.lemma}')
+    elif arguments['endings']:
+        with MappedLexicon(arguments['--lexicon']) as lexicon:
+            codes = {int(arguments['--code'])} if arguments['--code'] else None
+            limit = int(arguments['--limit']) if arguments['--limit'] else None
+            for ending in SuffixIndex(lexicon).endings(arguments['SUFFIX'], codes, limit=limit):
+                print(f'{ending.form}\t{ending.lemma}\t{ending.pos.to_upos()}\t{ending.code or "_"}')
+    elif arguments['complete']:
+        with MappedLexicon(arguments['--lexicon']) as lexicon:
+            trie = CompletionTrie.from_lexicon(lexicon, frequencies_argument(arguments['--frequencies']))
+        limit = int(arguments['--limit']) if arguments['--limit'] else None
+        for lemma in trie.complete(arguments['PREFIX'], limit):
+            print(lemma)
+    elif arguments['annotate']:
+        processes = int(arguments['--processes']) or None
+        with open(arguments['INPUT'], encoding='utf-8') as text:
+            with open(arguments['OUTPUT'], 'w', encoding='utf-8') as file:
+                for chunk in annotate_lines(text, arguments['--lexicon'], processes):
+                    file.write(chunk)
     elif arguments['runserver']:
-        app.run(debug=True, host='0.0.0.0', port='43561')
+        if arguments['--lexicon']:
+            # mapped before the server starts so that every worker shares the pages
+            app.config['LEXICON'] = MappedLexicon(arguments['--lexicon'])
+            # the in-memory indexes cost seconds and up to gigabytes, so each is built, once and before
+            # the workers fork, only when its endpoint is asked for
+            if arguments['--endings']:
+                app.config['SUFFIX_INDEX'] = SuffixIndex(app.config['LEXICON'])
+            if arguments['--completions'] or arguments['--frequencies']:
+                frequencies = frequencies_argument(arguments['--frequencies'])
+                app.config['COMPLETION_TRIE'] = CompletionTrie.from_lexicon(app.config['LEXICON'], frequencies)
+        if arguments['--suggestions']:
+            # built before the workers fork; each then adds the words it fetches, up to MAX_LEARNED lemmas
+            lexicon = app.config.get('LEXICON')
+            app.config['FUZZY_INDEX'] = \
+                SymmetricDeleteIndex.from_lexicon(lexicon) if lexicon is not None else SymmetricDeleteIndex()
+        RuWikitionary.base_url = arguments['--upstream']
+        RuWikitionary.timeout = float(arguments['--timeout'])
+        app.config['MAX_AGE'] = int(arguments['--max-age'])
+        app.config['NEGATIVE_MAX_AGE'] = int(arguments['--negative-max-age'])
+        if int(arguments['--cache-size']) > 0:
+            app.config['CACHE'] = ResponseCache(int(arguments['--cache-size']), float(arguments['--cache-ttl']),
+                                                float(arguments['--negative-ttl']), float(arguments['--error-ttl']))
+        if arguments['--debug']:
+            app.run(debug=True, host=arguments['--host'], port=int(arguments['--port']))
+        elif arguments['--asgi']:
+            import asgi
+            asgi.app.lexicon = app.config.get('LEXICON')
+            asgi.app.cache = app.config.get('CACHE')
+            asgi.app.index = app.config.get('FUZZY_INDEX')
+            asgi.app.suffixes = app.config.get('SUFFIX_INDEX')
+            asgi.app.completions = app.config.get('COMPLETION_TRIE')
+            (asgi.app.max_age, asgi.app.negative_max_age) = (app.config['MAX_AGE'], app.config['NEGATIVE_MAX_AGE'])
+            serve(asgi.app, arguments['--host'], int(arguments['--port']), int(arguments['--workers']),
+                  run_asgi_worker)
+        else:
+            serve(app, arguments['--host'], int(arguments['--port']), int(arguments['--workers']))
 
 
 
@@ -0,0 +1,61 @@
+import unicodedata
+from typing import Optional, Tuple
+
+# Wiktionary marks stress with combining accents (U+0301 acute for the main stress, U+0300
+# grave for a secondary one) and spells ё, while users rarely type either. Forms are
+# compared in a normalized spelling with both folded away.
+ACUTE = '\u0301'
+GRAVE = '\u0300'
+STRESS_MARKS = {ACUTE, GRAVE}
+
+
+def strip_stress(text: str) -> str:
+    """
+    Removes stress marks, keeping letters that merely decompose into a base and a mark (й, ё)
+    :param text: The text
+    :return: The text without stress marks, in NFC
+    """
+    decomposed = unicodedata.normalize('NFD', text)
+    return unicodedata.normalize('NFC', ''.join(c for c in decomposed if c not in STRESS_MARKS))
+
+
+def normalize_form(text: str) -> str:
+    """
+    Returns the spelling forms are matched by: without stress marks, with ё folded to е and case-folded
+    :param text: A form or user input
+    :return: The normalized spelling
+    """
+    return strip_stress(text).casefold().replace('ё', 'е')
+
+
+def split_stress(form: str) -> Tuple[str, Optional[int]]:
+    """
+    Separates a form's stress from its letters
+    :param form: The form, possibly stress-marked
+    :return: A tuple of the form without stress marks and the index of its stressed letter in it:
+    the first letter with an acute accent, failing that the first ё, failing that None
+    """
+    decomposed = unicodedata.normalize('NFD', form)
+    letters = []
+    position = None
+    for c in decomposed:
+        if c == ACUTE and position is None and letters:
+            position = len(unicodedata.normalize('NFC', ''.join(letters))) - 1
+        if c not in STRESS_MARKS:
+            letters.append(c)
+    bare = unicodedata.normalize('NFC', ''.join(letters))
+    if position is None and 'ё' in bare.lower():
+        position = bare.lower().index('ё')
+    return bare, position
+
+
+def join_stress(bare: str, position: Optional[int]) -> str:
+    """
+    Puts an acute accent back on a form, the inverse of split_stress for forms with one acute
+    :param bare: The form without stress marks
+    :param position: The index of the stressed letter, or None
+    :return: The stress-marked form; ё and unknown stress are left unmarked
+    """
+    if position is None or bare[position] in 'ёЁ':
+        return bare
+    return bare[:position + 1] + ACUTE + bare[position + 1:]
@@ -0,0 +1,126 @@
+from functools import lru_cache
+from typing import Optional, Union, List, Tuple, Dict
+from grammar import *
+from stringpool import intern_form
+
+
+def flatten_codes(node: Union[dict, int]) -> List[int]:
+    """
+    Collects every inflection code below a node of inflection_codes.yaml
+    :param node: A section of the inflection codes, or a single code
+    :return: The codes, in file order
+    """
+    if isinstance(node, dict):
+        codes = []
+        for child in node.values():
+            codes.extend(flatten_codes(child))
+        return codes
+    return [node]
+
+
+class ParadigmLayout(object):
+    """
+    The fixed slot layout of one part of speech. Slots are the part of speech's distinct
+    inflection codes in ascending order, so the slot index is derived from the code alone.
+    """
+    __slots__ = ('prefix', 'codes', 'slots')
+
+    def __init__(self, prefix: str, codes: List[int]):
+        """
+        Returns a new instance of the class
+        :param prefix: The code prefix (section name in inflection_codes.yaml)
+        :param codes: The inflection codes of the section
+        """
+        self.prefix = prefix
+        self.codes: Tuple[int] = tuple(sorted(set(codes)))
+        self.slots: Dict[int, int] = {code: idx for idx, code in enumerate(self.codes)}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def slot_for_code(self, code: int) -> Optional[int]:
+        """
+        Returns the slot index for an inflection code
+        :param code: The inflection code
+        :return: The slot index, or None if the code does not belong to this part of speech
+        """
+        return self.slots.get(code)
+
+
+@lru_cache()
+def paradigm_layouts() -> Dict[str, ParadigmLayout]:
+    """
+    Builds the slot layout of every part of speech in inflection_codes.yaml
+    :return: Layouts keyed by code prefix ('noun', 'adj', 'verb', ...)
+    """
+    return {prefix: ParadigmLayout(prefix, flatten_codes(node))
+            for (prefix, node) in load_inflection_codes().items()}
+
+
+class ParadigmRecord(object):
+    """
+    A paradigm stored as a fixed array of slots, one per inflection code of its part of speech.
+    Each slot holds a tuple of forms, interned in the active string pool (see form_pool); most hold one,
+    some hold alternates (e.g. кошкой/кошкою) and unused slots hold an empty tuple.
+    """
+    __slots__ = ('lemma', 'layout', 'forms')
+
+    def __init__(self, lemma: str, layout: ParadigmLayout):
+        """
+        Returns a new, empty record
+        :param lemma: The dictionary form of the word
+        :param layout: The slot layout of the word's part of speech
+        """
+        self.lemma = intern_form(lemma)
+        self.layout = layout
+        self.forms: List[Tuple[str]] = [()] * len(layout)
+
+    @classmethod
+    def from_word(cls, word: Word):
+        """
+        Returns a new record holding the inflected forms of a grammar object
+        :param word: A Noun, Adjective, Verb, Pronoun, PossessivePronoun or DemonstrativePronoun
+        :return: New instance of the class
+        """
+        record = cls(word.value, paradigm_layouts()[word.code_prefix()])
+        for (form, code) in word.inflection_code_list:
+            record.add_form(form, code)
+        return record
+
+    def add_form(self, form: Optional[str], code: int):
+        """
+        Appends a form to the slot of its inflection code
+        :param form: The inflected form; None is ignored
+        :param code: The inflection code
+        :return: Nothing
+        """
+        if form is None:
+            return
+        slot = self.layout.slots[code]
+        self.forms[slot] = self.forms[slot] + (intern_form(form),)
+
+    def forms_for_code(self, code: int) -> Tuple[str]:
+        """
+        Returns every form for an inflection code
+        :param code: The inflection code
+        :return: A tuple of forms, empty if there are none
+        """
+        slot = self.layout.slots.get(code)
+        return () if slot is None else self.forms[slot]
+
+    def form_for_code(self, code: int) -> Optional[str]:
+        """
+        Returns the first form for an inflection code
+        :param code: The inflection code
+        :return: The form, or None if there is none
+        """
+        forms = self.forms_for_code(code)
+        return forms[0] if forms else None
+
+    @property
+    def inflection_code_list(self) -> List[Tuple[str, int]]:
+        """
+        Returns the forms and their inflection codes, in slot (ascending code) order
+        :return: List of tuples whose first member is the form and whose second is the inflection code
+        """
+        return [(form, code) for (code, forms) in zip(self.layout.codes, self.forms) for form in forms]
@@ -1,4 +1,6 @@
 import random
+import socket
+import urllib.error
 import urllib.parse
 from urllib.request import urlopen, Request
 from lxml import etree
@@ -7,9 +9,35 @@ import re
 import json
 from functools import lru_cache
 from grammar import *
+from stringpool import intern_form, form_pool
 import yaml
 from enum import Enum, auto
-from typing import Optional, Union
+from typing import Optional, Union, List, Tuple, Any
+
+
+RUSSIAN_HEADING = 'Русский'
+MORPHOLOGY_HEADING = 'Морфологические и синтаксические свойства'
+PRONOUN_TABLE_RULES = 'contains(@rules, "all") and contains(@width, "210")'
+# the Zaliznyak index comes after the type of declension or conjugation, in one of two phrasings:
+# 'тип склонения 3*a по классификации а. а. зализняка' and 'тип спряжения по классификации а. зализняка — 1a'
+ZALIZNYAK_TYPE = re.compile(r'тип (?:склонения|спряжения)\s+([^\s(]+)\s+по классификации')
+ZALIZNYAK_DASH = re.compile(r'зализняка\s*[—–-]\s*(\S+)')
+NOUN_GENDERS = {'мужской род': 'м', 'женский род': 'ж', 'средний род': 'с'}
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows; U; Windows NT 5.1; it; rv:1.8.1.11) Gecko/20071127 Firefox/2.0.0.11',
+    'Opera/9.25 (Windows NT 5.1; U; en)',
+    'Mozilla/4.0 (compatible; MSIE 6.0; Windows NT 5.1; SV1; .NET CLR 1.1.4322; .NET CLR 2.0.50727)',
+    'Mozilla/5.0 (compatible; Konqueror/3.5; Linux) KHTML/3.5.5 (like Gecko) (Kubuntu)',
+    'Mozilla/5.0 (Windows NT 5.1) AppleWebKit/535.19 (KHTML, like Gecko) Chrome/18.0.1025.142 Safari/535.19',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.7; rv:11.0) Gecko/20100101 Firefox/11.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.6; rv:8.0.1) Gecko/20100101 Firefox/8.0.1',
+    'Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/535.19 (KHTML, like Gecko) Chrome/18.0.1025.151 '
+    'Safari/535.19',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/42.0.2311.135 '
+    'Safari/537.36 Edge/12.246',
+    'Mozilla/5.0 (X11; CrOS x86_64 8172.45.0) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/51.0.2704.64 '
+    'Safari/537.36 '
+]
 
 
 def unique_list(l):
@@ -62,6 +90,25 @@ def cyrillic(text):
     return html.unescape(text)
 
 
+def zaliznyak_index(text: str) -> Optional[str]:
+    """
+    Reads the Zaliznyak index from the paragraph describing a part of speech
+    :param text: The lower-cased paragraph
+    :return: The index, e.g. '1a' or '4a/b'; a noun's is prefixed with its gender, and о when it is
+    animate, as Zaliznyak writes it: 'жо 3*a'. None if the paragraph has none
+    """
+    match = ZALIZNYAK_TYPE.search(text) or ZALIZNYAK_DASH.search(text)
+    if match is None:
+        return None
+    index = match.group(1).rstrip('.,;')
+    if 'существительное' in text:
+        genders = [abbreviation for (name, abbreviation) in NOUN_GENDERS.items() if name in text]
+        if len(genders) == 1:
+            animate = 'одушевл' in text.replace('неодушевл', '')
+            index = f'{genders[0]}{"о" if animate else ""} {index}'
+    return index
+
+
 def casetranslate(casestr: str, direction: CaseTranslateDirection) -> Optional[str]:
     case_names_en = ['nominative', 'genitive', 'dative', 'accusative', 'instrumental', 'prepositional', 'locative',
                      'vocative']
@@ -75,71 +122,144 @@ def casetranslate(casestr: str, direction: CaseTranslateDirection) -> Optional[s
         return None
 
 
+class UpstreamError(Exception):
+    """
+    Wiktionary could not be reached, did not answer within the timeout or answered with an error status
+    """
+    def __init__(self, word: str, reason):
+        super().__init__(f'Fetching {word} failed: {reason}')
+        self.word = word
+        self.reason = reason
+
+    @property
+    def timed_out(self) -> bool:
+        return isinstance(self.reason, socket.timeout)
+
+
+def page_not_found(word: str, error: urllib.error.HTTPError) -> None:
+    """
+    Interprets an error status of a page fetch, the same way for the blocking and the asynchronous fetch
+    :param word: The word whose page was fetched
+    :param error: The error status
+    :return: None for a 404: the word has no page
+    :raises UpstreamError: for any other status; a 429 or a 503 is an outage to retry soon
+    """
+    if error.code != 404:
+        raise UpstreamError(word, error) from error
+    return None
+
+
 def col_idx_to_en_number(col_idx: int) -> Optional[str]:
     return ['singular', 'plural'][col_idx - 1] if 1 <= col_idx <= 2 else None
 
 
 class RuWikitionary(object):
+    # where pages are fetched from, and how many seconds to wait on each socket operation
+    # of the fetch (None waits forever); the server sets both from its options
+    base_url = 'https://ru.wiktionary.org/wiki/'
+    timeout: Optional[float] = None
+
     def __init__(self, word: str, use_local: bool = False, local_fn=None):
         self.use_local = use_local
         self.word = word
         self.local_fn = local_fn
+        self.data = None
+        self.tree = None
+        # per-instance caches rather than lru_cache, which would keep every page
+        # (and its multi-megabyte tree) alive at class level
+        self._response = None
+        self._fetched = False
+        self._pos = None
+        self._pos_found = False
+        self._released = False
+
+    @classmethod
+    def from_bytes(cls, word: str, data):
+        """
+        Returns a page object for already-fetched page content
+        :param word: The Russian word whose page this is
+        :param data: The page HTML as bytes, str or any buffer (mmap, memoryview); it is
+        handed to lxml as is, without copying it or touching the disk
+        :return: New instance of the class
+        """
+        page = cls(word, False)
+        page.data = data
+        return page
+
+    @classmethod
+    def from_tree(cls, word: str, tree):
+        """
+        Returns a page object for an already-built lxml tree
+        :param word: The Russian word whose page this is
+        :param tree: The lxml tree (or root element) of the page
+        :return: New instance of the class
+        """
+        page = cls(word, False)
+        page.tree = tree
+        return page
 
     @property
-    @lru_cache()
     def url(self) -> str:
         """Returns the Russian Wiktionary for object's word
 
         """
         ru_word = urllib.parse.quote(self.word)
-        return f"https://ru.wiktionary.org/wiki/{ru_word}"
+        return f"{self.base_url}{ru_word}"
+
+    def request_headers(self) -> dict:
+        """
+        Returns the headers for a page request, with a user-agent picked at random
+        :return: A dict of header name to value
+        """
+        return {'user-agent': random.choice(USER_AGENTS)}
 
     @property
-    @lru_cache()
     def url_response(self):
         """
         Using rotating user-agent values in the header returns the response
         object from web request to Russian Wiktionary page
 
-        :return: urlopen Response object
-        """
-        user_agents = [
-            'Mozilla/5.0 (Windows; U; Windows NT 5.1; it; rv:1.8.1.11) Gecko/20071127 Firefox/2.0.0.11',
-            'Opera/9.25 (Windows NT 5.1; U; en)',
-            'Mozilla/4.0 (compatible; MSIE 6.0; Windows NT 5.1; SV1; .NET CLR 1.1.4322; .NET CLR 2.0.50727)',
-            'Mozilla/5.0 (compatible; Konqueror/3.5; Linux) KHTML/3.5.5 (like Gecko) (Kubuntu)',
-            'Mozilla/5.0 (Windows NT 5.1) AppleWebKit/535.19 (KHTML, like Gecko) Chrome/18.0.1025.142 Safari/535.19',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.7; rv:11.0) Gecko/20100101 Firefox/11.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.6; rv:8.0.1) Gecko/20100101 Firefox/8.0.1',
-            'Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/535.19 (KHTML, like Gecko) Chrome/18.0.1025.151 '
-            'Safari/535.19',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/42.0.2311.135 '
-            'Safari/537.36 Edge/12.246',
-            'Mozilla/5.0 (X11; CrOS x86_64 8172.45.0) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/51.0.2704.64 '
-            'Safari/537.36 '
-        ]
-        randomint = random.randint(0, 9)
-        headers = {'user-agent': user_agents[randomint]}
+        :return: urlopen Response object, or None if there is no page for the word
+        :raises UpstreamError: if Wiktionary cannot be reached, does not answer in time or answers with an
+        error status other than 404
+        """
+        if self._fetched:
+            return self._response
         try:
-            response = urlopen(Request(self.url, headers=headers))
-        except urllib.error.HTTPError:
-            response = None
+            response = urlopen(Request(self.url, headers=self.request_headers()), timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            response = page_not_found(self.word, e)
+        except (urllib.error.URLError, OSError) as e:
+            raise UpstreamError(self.word, getattr(e, 'reason', e)) from e
+        self._response = response
+        self._fetched = True
         return response
 
     @property
-    @lru_cache()
     def root_tree(self):
         """
         The root tree for the Russian word page.
         :return: The root tree for the page
+        :raises ValueError: if the page has been released
         """
+        if self.tree is not None:
+            return self.tree
+        if self._released:
+            # loading it again would fetch a from_bytes page from the network, or a fetched one twice
+            raise ValueError(f'The page for {self.word} has been released')
         htmlparser = etree.HTMLParser()
-        if self.use_local:
+        if self.data is not None:
+            tree = etree.ElementTree(etree.fromstring(self.data, htmlparser))
+        elif self.use_local:
             tree = etree.parse(f'html_samples/{self.local_fn}', htmlparser)
         else:
             if self.url_response is None:
                 return None
-            tree = etree.parse(self.url_response, htmlparser)
+            try:
+                tree = etree.parse(self.url_response, htmlparser)
+            except OSError as e:
+                # the body is read as it is parsed, so a stalled transfer times out here
+                raise UpstreamError(self.word, e) from e
         # could use scrapy for this
         # but if you read() the url_response, it consumes it
         # then the response is invalid for using in the lxml etree
@@ -148,42 +268,100 @@ class RuWikitionary(object):
         # selector = scrapy.Selector(text=self.url_response.read(), type='html')
         # extract_list = selector.xpath('''//*[@id="mw-content-text"]/div[1]/p[2]//text()''').extract()
         # extract_str = ''.join(extract_list)
+        self.tree = tree
         return tree
 
+    def release(self):
+        """
+        Drops the page content, the lxml tree and the HTTP response so their memory can be
+        reclaimed; the part of speech stays cached. Accessing root_tree afterwards raises
+        ValueError rather than loading the page again.
+        :return: Nothing
+        """
+        if self._response is not None:
+            self._response.close()
+        self._response = None
+        self.tree = None
+        self.data = None
+        self._released = True
+
+    def extract(self) -> Tuple[Optional[SpeechPart], Union[Verb, Adjective, Noun, PossessivePronoun, None]]:
+        """
+        Builds the tree, parses it and releases the tree and the response right away, so that
+        only the compact grammar object outlives the call
+        :return: A tuple whose first member is the SpeechPart of the page (or None) and whose second
+        member is the parsed grammar object (or None)
+        """
+        try:
+            pos = self.pos
+            word = self.parse_pos(pos)
+        finally:
+            self.release()
+        return pos, word
+
+    def table_rows(self, table, root_path: str):
+        """
+        Returns the rows of an inflection table
+        :param table: The table element to read, or None to read the page's tables
+        :param root_path: The XPath to the page's table rows, used when table is None
+        :return: List of <tr> elements
+        """
+        if table is None:
+            return self.root_tree.xpath(root_path)
+        return table.xpath('tbody/tr')
+
     def alternate_morphology(self):
         b = self.root_tree.xpath('''//*[@id="mw-content-text"]/div[1]/p[3]//text()''')
         b_str = ' '.join([x.strip() for x in b]).lower()
         return b_str
 
     @property
-    @lru_cache()
     def pos(self):
         """
         Accessor for the part of speech property
         :return:
         """
-        if self.root_tree is None:
-            return None
+        if not self._pos_found:
+            self._pos = self.page_pos()
+            self._pos_found = True
+        return self._pos
+
+    def morphology_text(self) -> str:
+        """
+        Reads the paragraph describing the page's part of speech
+        :return: The lower-cased text of the paragraph
+        """
         b = self.root_tree.xpath('''//*[@id="mw-content-text"]/div[1]/p[2]//text()''')
         b_str = ' '.join([x.strip() for x in b]).lower()
         # preposition like в, с, к can fail because their morphological information
         # is not in the usual spot
         if b_str.strip() == self.word:
             b_str = self.alternate_morphology()
-        return SpeechPart.from_wiki_text(b_str)
+        return b_str
 
-    def parse_noun(self) -> Optional[Noun]:
+    def page_pos(self) -> Optional[SpeechPart]:
+        """
+        Reads the part of speech from the page
+        :return: The SpeechPart of the page or None
+        """
+        if self.root_tree is None:
+            return None
+        return SpeechPart.from_wiki_text(self.morphology_text())
+
+    def parse_noun(self, table=None) -> Optional[Noun]:
         """
         Parses the page for noun inflection
+        :param table: The morfotable to read; defaults to the first one on the page
         :return: A Noun object or None
         """
         noun = Noun(self.word)
         # some words, e.g. кошка have a table for every sense
-        # so we'll try to use only the first one for simplicity
+        # so unless we are given one, we'll use only the first one for simplicity
         # //*[@id="mw-content-text"]/div[1]/table[2]
-        pre_path = '//*[@id="mw-content-text"]/div[1]/table[contains(@class, "morfotable") and contains(@class, "ru")]'
-        pre_block = self.root_tree.xpath(pre_path)
-        tbody_block = pre_block[0].getchildren()
+        if table is None:
+            pre_path = '//*[@id="mw-content-text"]/div[1]/table[contains(@class, "morfotable") and contains(@class, "ru")]'
+            table = self.root_tree.xpath(pre_path)[0]
+        tbody_block = table.getchildren()
         block = tbody_block[0].getchildren()
 
         for idx, case_row in enumerate(block):
@@ -202,7 +380,7 @@ class RuWikitionary(object):
                         # test for these multiples by looking for a <br/> tag in the HTML'
                         ct = cell.itertext()
                         for w_ct in ct:
-                            forms.append(w_ct.strip())
+                            forms.append(intern_form(w_ct.strip()))
                         number = col_idx_to_en_number(cell_idx)
                         encase = casetranslate(case_text, CaseTranslateDirection.RU2EN)
                         for form in forms:
@@ -210,14 +388,13 @@ class RuWikitionary(object):
                             noun.add_form_case_name(encase, issingular, [form])
         return noun
 
-    def parse_pronoun(self) -> Optional[Pronoun]:
+    def parse_pronoun(self, table=None) -> Optional[Pronoun]:
         pronoun = Pronoun(self.word)
         # this is a little fragile but unless the page formatting
         # changes drastically, it should work because just relying on the order
         # of tables on the page is too variable
-        table_rules = 'contains(@rules, "all") and contains(@width, "210")'
-        table_path = f'//table[{table_rules}]/tbody/tr'
-        block = self.root_tree.xpath(table_path)
+        table_path = f'//table[{PRONOUN_TABLE_RULES}]/tbody/tr'
+        block = self.table_rows(table, table_path)
         for idx, case_row in enumerate(block):
             if idx < 1:
                 continue
@@ -225,18 +402,19 @@ class RuWikitionary(object):
                 td = case_row.getchildren()[1]
                 cases = [NounCaseType.NOMINATIVE, NounCaseType.GENITIVE, NounCaseType.DATIVE,
                          NounCaseType.ACCUSATIVE, NounCaseType.INSTRUMENTAL, NounCaseType.PREPOSITIONAL]
-                pronoun.add_form(cases[idx-1], td.text.strip())
+                pronoun.add_form(cases[idx-1], intern_form(td.text.strip()))
         return pronoun
 
-    def parse_adjective(self) -> Optional[Adjective]:
+    def parse_adjective(self, table=None) -> Optional[Adjective]:
         """
         Parses the page for adjective inflection.
+        :param table: The morfotable to read; defaults to the morfotables on the page
         :return: Either a parse Adjective object or None
         """
         adjective = Adjective(self.word)
         root_path = '//*[@id="mw-content-text"]/div[1]/table[contains(@class, "morfotable") and contains(@class, ' \
                     '"ru")]/tbody/tr'
-        block = self.root_tree.xpath(root_path)
+        block = self.table_rows(table, root_path)
         for idx, case_row in enumerate(block):
             if idx < 2:
                 continue
@@ -252,7 +430,7 @@ class RuWikitionary(object):
                         case_or_animacy_text = a_block[0].get('title')
                     else:
                         try:
-                            celltext = cell.text.strip()
+                            celltext = intern_form(cell.text.strip())
                             row_words.append(celltext)
                         except AttributeError:
                             pass
@@ -277,9 +455,10 @@ class RuWikitionary(object):
                     adjective.short_form = AdjectiveInflection.from_term_list(row_words)
         return adjective
 
-    def parse_verb(self) -> Optional[Verb]:
+    def parse_verb(self, table=None) -> Optional[Verb]:
         """
         Parses the page for verb conjugation information
+        :param table: The morfotable to read; defaults to the morfotables on the page
         :return: A parsed Verb object or None
         """
         verb = Verb(self.word)
@@ -288,7 +467,7 @@ class RuWikitionary(object):
         (pmf, pff, pnf, ppf) = (False, False, False, False)
         root_path = '//*[@id="mw-content-text"]/div[1]/table[contains(@class, "morfotable") and contains(@class, ' \
                     '"ru")]/tbody/tr '
-        block = self.root_tree.xpath(root_path)
+        block = self.table_rows(table, root_path)
         for idx, case_row in enumerate(block):
             if idx == 0:
                 for header_col_idx, header_td in enumerate(case_row.xpath('th')):
@@ -312,7 +491,7 @@ class RuWikitionary(object):
                 for col_idx, column in enumerate(column_block):
                     celltext = None
                     if column.text:
-                        celltext = column.text.strip()
+                        celltext = intern_form(column.text.strip())
                     if col_idx == 1:
                         if number == 1:
                             if base_tense == VerbTenseType.PRESENT:
@@ -328,7 +507,7 @@ class RuWikitionary(object):
                         # past tense column
                         celltexts = column.xpath('text()')
                         if celltexts:
-                            celltexts = [x.strip() for x in celltexts]
+                            celltexts = [intern_form(x.strip()) for x in celltexts]
                             for past_text_idx, past_text in enumerate(celltexts):
                                 if number == 1 and person == 1:
                                     # the first item is masculine and second is feminine
@@ -380,11 +559,12 @@ class RuWikitionary(object):
                             # deal with future tense, this must be an imperfective verb
                             aux_verbs = ['буду', 'будешь', 'будет',
                                          'будем', 'будете', 'будут']
-                            future_verbs = [f'{x} {self.word}' for x in aux_verbs]
+                            future_verbs = [intern_form(f'{x} {self.word}') for x in aux_verbs]
                             verb.future.add_form_list(future_verbs)
                         else:
-                            forms_list = column.xpath('a/text()')
-                            for form in forms_list:
+                            # plain strings: lxml's smart strings would keep the whole tree alive
+                            forms_list = column.xpath('a/text()', smart_strings=False)
+                            for form in map(intern_form, forms_list):
                                 if current_pos == 'действительное причастие прошедшего времени':
                                     # this is a past active participle
                                     verb.past_active_participle = form
@@ -402,15 +582,16 @@ class RuWikitionary(object):
 
         return verb
 
-    def parse_possessive_pronoun(self) -> Optional[PossessivePronoun]:
+    def parse_possessive_pronoun(self, table=None) -> Optional[PossessivePronoun]:
         """
         Extracts declension information for a possessive pronoun.
+        :param table: The morfotable to read; defaults to the morfotables on the page
         :return: A PossessivePronoun object or None
         """
         pronoun = PossessivePronoun(self.word)
         root_path = '//*[@id="mw-content-text"]/div[1]/table[contains(@class, "morfotable") and contains(@class, ' \
                     '"ru")]/tbody/tr'
-        block = self.root_tree.xpath(root_path)
+        block = self.table_rows(table, root_path)
         last_row_words = []
         for idx, case_row in enumerate(block):
             if idx < 2:
@@ -424,23 +605,23 @@ class RuWikitionary(object):
                     # read the <td>/<a> title
                     if idx == AdjectiveTableRow.ACCUSATIVE_ANIMATE.value:
                         if cell_idx > 1:
-                            row_words.append(cell.text.strip())
+                            row_words.append(intern_form(cell.text.strip()))
                     elif idx == AdjectiveTableRow.ACCUSATIVE_INANIMATE.value:
                         # accusative inanimate is tricky because the neuter and feminine
                         # forms aren't listed in the table
                         if cell_idx == 1:
-                            row_words.append(cell.text.strip())
+                            row_words.append(intern_form(cell.text.strip()))
                             # add add the neuter and feminine forms that are missing from table
                             row_words.extend(last_row_words[1:3])
                         elif cell_idx > 1:
-                            row_words.append(cell.text.strip())
+                            row_words.append(intern_form(cell.text.strip()))
                     elif idx == AdjectiveTableRow.INSTRUMENTAL.value:
                         if cell_idx > 0:
-                            ct = ' '.join(cell.itertext()).strip()
+                            ct = intern_form(' '.join(cell.itertext()).strip())
                             row_words.append(ct)
                     else:
                         if cell_idx > 0:
-                            row_words.append(cell.text.strip())
+                            row_words.append(intern_form(cell.text.strip()))
                     if cell_idx == 0:
                         a_block = cell.xpath('a')
                         case_or_animacy_text = a_block[0].get('title')
@@ -461,15 +642,16 @@ class RuWikitionary(object):
                 last_row_words = row_words
         return pronoun
 
-    def parse_demonstrative_pronoun(self) -> Optional[DemonstrativePronoun]:
+    def parse_demonstrative_pronoun(self, table=None) -> Optional[DemonstrativePronoun]:
         """
         Extracts declension information for a demonstrative pronoun.
+        :param table: The morfotable to read; defaults to the morfotables on the page
         :return: A PossessivePronoun object or None
         """
         pronoun = DemonstrativePronoun(self.word)
         root_path = '//*[@id="mw-content-text"]/div[1]/table[contains(@class, "morfotable") and contains(@class, ' \
                     '"ru")]/tbody/tr'
-        block = self.root_tree.xpath(root_path)
+        block = self.table_rows(table, root_path)
         last_row_words = []
         for idx, case_row in enumerate(block):
             if idx < 2:
@@ -483,23 +665,23 @@ class RuWikitionary(object):
                     # read the <td>/<a> title
                     if idx == AdjectiveTableRow.ACCUSATIVE_ANIMATE.value:
                         if cell_idx > 1:
-                            row_words.append(cell.text.strip())
+                            row_words.append(intern_form(cell.text.strip()))
                     elif idx == AdjectiveTableRow.ACCUSATIVE_INANIMATE.value:
                         # accusative inanimate is tricky because the neuter and feminine
                         # forms aren't listed in the table
                         if cell_idx == 1:
-                            row_words.append(cell.text.strip())
+                            row_words.append(intern_form(cell.text.strip()))
                             # add add the neuter and feminine forms that are missing from table
                             row_words.extend(last_row_words[1:3])
                         elif cell_idx > 1:
-                            row_words.append(cell.text.strip())
+                            row_words.append(intern_form(cell.text.strip()))
                     elif idx == AdjectiveTableRow.INSTRUMENTAL.value:
                         if cell_idx > 0:
-                            ct = ' '.join(cell.itertext()).strip()
+                            ct = intern_form(' '.join(cell.itertext()).strip())
                             row_words.append(ct)
                     else:
                         if cell_idx > 0:
-                            row_words.append(cell.text.strip())
+                            row_words.append(intern_form(cell.text.strip()))
                     if cell_idx == 0:
                         a_block = cell.xpath('a')
                         case_or_animacy_text = a_block[0].get('title')
@@ -520,20 +702,112 @@ class RuWikitionary(object):
                 last_row_words = row_words
         return pronoun
 
+    def parse_pos(self, pos: Optional[SpeechPart], table=None) -> Union[Verb, Adjective, Noun, PossessivePronoun, None]:
+        """
+        Parses inflection info for the given part of speech
+        :param pos: The SpeechPart to parse for
+        :param table: The inflection table to read; defaults to the page's tables
+        :return: Any of Verb, Adjective, Noun, DemonstrativePronoun, or PossessivePronoun objects (or None)
+        """
+        word = None
+        # forms repeated within the page are held once; the pool goes with the page unless a build shares its own
+        with form_pool():
+            if pos == SpeechPart.NOUN:
+                word = self.parse_noun(table)
+            elif pos == SpeechPart.ADJECTIVE:
+                word = self.parse_adjective(table)
+            elif pos == SpeechPart.VERB:
+                word = self.parse_verb(table)
+            elif pos == SpeechPart.PRONOUN_POSSESSIVE:
+                word = self.parse_possessive_pronoun(table)
+            elif pos == SpeechPart.PRONOUN:
+                word = self.parse_pronoun(table)
+            elif pos == SpeechPart.PRONOUN_DEMONSTRATIVE:
+                word = self.parse_demonstrative_pronoun(table)
+        if word is not None and table is None:
+            # the page's own table, so the page's own paragraph; parse_all reads each block's
+            word.zaliznyak = zaliznyak_index(self.morphology_text())
+        return word
+
     def parse(self) -> Union[Verb, Adjective, Noun, PossessivePronoun, None]:
         """
         Parses the page for inflection info, returning the appropriate part of speech object
         :return: Any of Verb, Adjective, Noun, DemonstrativePronoun, or PossessivePronoun objects (or None)
         """
-        if self.pos == SpeechPart.NOUN:
-            return self.parse_noun()
-        elif self.pos == SpeechPart.ADJECTIVE:
-            return self.parse_adjective()
-        elif self.pos == SpeechPart.VERB:
-            return self.parse_verb()
-        elif self.pos == SpeechPart.PRONOUN_POSSESSIVE:
-            return self.parse_possessive_pronoun()
-        elif self.pos == SpeechPart.PRONOUN:
-            return self.parse_pronoun()
-        elif self.pos == SpeechPart.PRONOUN_DEMONSTRATIVE:
-            return self.parse_demonstrative_pronoun()
+        return self.parse_pos(self.pos)
+
+    def morphology_blocks(self) -> List[Tuple[str, Any]]:
+        """
+        Walks the Russian section of the page once, collecting every morphology block. Homograph pages
+        (e.g. кошка, стать, печь) have one block per sense or part of speech.
+        :return: A list of tuples whose first member is the lower-cased part of speech text of the block
+        and whose second member is the block's inflection table (or None for uninflected words)
+        """
+        if self.root_tree is None:
+            return []
+        content = self.root_tree.xpath('//*[@id="mw-content-text"]/div[1]')
+        if not content:
+            return []
+        blocks = []
+        in_russian = False
+        in_morphology = False
+        table = None
+        paragraphs = []
+
+        def close_block():
+            if in_morphology:
+                # the first paragraph is the word split into syllables, the next describes it
+                texts = [t for t in paragraphs[1:] if t.strip() != self.word]
+                blocks.append((texts[0] if texts else '', table))
+
+        for element in content[0].iterchildren():
+            if element.tag in ('h1', 'h2', 'h3', 'h4'):
+                close_block()
+                in_morphology = False
+                heading = ' '.join(element.xpath('span[@class="mw-headline"]//text()')).strip()
+                if element.tag == 'h1':
+                    if in_russian:
+                        break
+                    in_russian = heading == RUSSIAN_HEADING
+                elif in_russian and element.tag == 'h3' and heading == MORPHOLOGY_HEADING:
+                    in_morphology = True
+                    table = None
+                    paragraphs = []
+            elif in_morphology:
+                if element.tag == 'table' and table is None and self.is_inflection_table(element):
+                    table = element
+                elif element.tag == 'p' and len(paragraphs) < 3:
+                    paragraphs.append(' '.join([x.strip() for x in element.itertext()]).lower())
+        close_block()
+        return blocks
+
+    @staticmethod
+    def is_inflection_table(table) -> bool:
+        """
+        Returns whether a table element holds an inflection paradigm
+        :param table: The lxml table element
+        :return: True for a morfotable or a pronoun declension table, otherwise False
+        """
+        css_class = table.get('class') or ''
+        if 'morfotable' in css_class.split() and 'ru' in css_class.split():
+            return True
+        return 'all' in (table.get('rules') or '') and '210' in (table.get('width') or '')
+
+    def parse_all(self) -> List[Tuple[SpeechPart, Union[Verb, Adjective, Noun, PossessivePronoun, None]]]:
+        """
+        Parses every part of speech block on the page in a single pass over the tree
+        :return: A list of tuples whose first member is the SpeechPart of the block and whose second
+        member is its parsed grammar object, or None if that part of speech is not inflected
+        """
+        parsed = []
+        # one pool for every block, so that forms shared between senses are held once
+        with form_pool():
+            for (pos_text, table) in self.morphology_blocks():
+                pos = SpeechPart.from_wiki_text(pos_text)
+                if pos is None:
+                    continue
+                word = self.parse_pos(pos, table) if table is not None else None
+                if word is not None:
+                    word.zaliznyak = zaliznyak_index(pos_text)
+                parsed.append((pos, word))
+        return parsed
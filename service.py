@@ -0,0 +1,651 @@
+import email.utils
+import hashlib
+import json
+import threading
+import zlib
+import time
+import unicodedata
+from collections import OrderedDict, namedtuple
+from typing import Optional, List, Tuple, Iterator, FrozenSet
+from grammar import *
+from ruwiktionary import *
+from lexicon import *
+from paradigm import paradigm_layouts
+from normalize import strip_stress
+from fuzzy import SymmetricDeleteIndex, MAX_DISTANCE
+from suffix import SuffixIndex
+from complete import CompletionTrie
+from inflect import Slot, slot_codes, inflect_many
+from singleflight import SingleFlight
+from zaliznyak import CompactParadigm, compress, expand
+
+# The /forms contract, shared by the Flask app in main.py and the ASGI app in asgi.py:
+# each function returns the JSON payload for a word, or the payload and an HTTP status.
+NOT_FOUND_ERROR = 'Not found. Is this an uninflected form? Spelling?'
+
+NOT_FOUND_AS_POS_ERROR = 'Not found as {pos}'
+
+# Cache-Control max-age defaults for answers on /forms: found words change rarely, while a
+# missing page may be created at any time
+MAX_AGE = 86400
+NEGATIVE_MAX_AGE = 300
+
+# forms per /endings answer when no limit is given
+ENDINGS_LIMIT = 100
+
+# answers of /suggest, /endings and /complete when the server was started without their index
+SUGGESTIONS_NOT_LOADED = 'No fuzzy index is loaded; start the server with --suggestions'
+ENDINGS_NOT_LOADED = 'No ending index is loaded; start the server with --lexicon and --endings'
+COMPLETIONS_NOT_LOADED = 'No completion trie is loaded; start the server with --lexicon and --completions'
+
+# (lemma, slot) requests per POST /inflect
+MAX_INFLECT_REQUESTS = 10000
+
+# lines per chunk of an /export stream, so that a chunk is tens of kilobytes
+EXPORT_CHUNK_LINES = 500
+
+CachedResponse = namedtuple('CachedResponse', ['payload', 'status', 'stored', 'expires'])
+CachedResponse.__doc__ = '''A cached /forms answer: the payload, its HTTP status, and when it was stored and expires'''
+
+
+def request_key(ru_word: str) -> str:
+    """
+    Normalizes a requested word so that spellings differing only in surrounding space or in
+    Unicode composition (е + U+0308 against ё) are looked up, and cached, as one
+    :param ru_word: The requested word
+    :return: The normalized word
+    """
+    return unicodedata.normalize('NFC', ru_word.strip())
+
+
+class ResponseCache(object):
+    """
+    A thread-safe LRU cache of /forms payloads. Entries expire after a TTL chosen by outcome:
+    words that were found live longest, "not found" answers less long and upstream failures
+    only briefly, so that an outage is retried soon.
+    """
+    def __init__(self, max_entries: int = 10000, ttl: float = 86400.0, negative_ttl: float = 3600.0,
+                 error_ttl: float = 30.0, clock=time.time):
+        """
+        Returns an empty cache
+        :param max_entries: The least recently used entry is dropped beyond this many
+        :param ttl: Seconds a found word is kept
+        :param negative_ttl: Seconds a "not found" answer is kept
+        :param error_ttl: Seconds an upstream failure is kept
+        :param clock: Returns the current time in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.error_ttl = error_ttl
+        self.clock = clock
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def ttl_for(self, payload: dict, status: int) -> float:
+        if status != 200:
+            return self.error_ttl
+        if 'error' in payload:
+            return self.negative_ttl
+        return self.ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Returns a live entry, counting a hit or a miss
+        :param key: The normalized word
+        :return: The cached response, or None if there is none or it has expired
+        """
+        with self._lock:
+            cached = self.entries.get(key)
+            if cached is not None and cached.expires <= self.clock():
+                del self.entries[key]
+                self.expirations += 1
+                cached = None
+            if cached is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return cached
+
+    def put(self, key: str, payload: dict, status: int) -> CachedResponse:
+        """
+        Stores a response
+        :param key: The normalized word
+        :param payload: The JSON payload
+        :param status: The HTTP status
+        :return: The cached response
+        """
+        now = self.clock()
+        cached = CachedResponse(payload, status, now, now + self.ttl_for(payload, status))
+        if self.max_entries <= 0:
+            return cached
+        with self._lock:
+            self.entries[key] = cached
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return cached
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters
+        :return: A dict of entries, max_entries, hits, misses, hit_ratio, expirations and evictions
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self.entries), 'max_entries': self.max_entries, 'hits': self.hits,
+                    'misses': self.misses, 'hit_ratio': self.hits / lookups if lookups else 0.0,
+                    'expirations': self.expirations, 'evictions': self.evictions}
+
+
+def forms_output(ru_word: str, pos: SpeechPart, forms: Optional[List[Tuple[str, int]]]) -> dict:
+    w_output = {'inp': ru_word, 'pos': pos.to_upos()}
+    if forms is not None:
+        w_output['forms'] = [{'code': code, 'form': term, 'desc': code2term(code)} for (term, code) in forms]
+    return w_output
+
+
+def not_found_output(ru_word: str) -> dict:
+    return {'inp': ru_word, 'error': NOT_FOUND_ERROR}
+
+
+def upstream_error_output(ru_word: str, error: UpstreamError) -> Tuple[dict, int]:
+    """
+    Returns the payload for a word that could not be fetched
+    :param ru_word: The requested word
+    :param error: The failure
+    :return: A tuple of the payload and the HTTP status, 504 for a timeout and 502 otherwise
+    """
+    (message, status) = ('Wiktionary timed out', 504) if error.timed_out else ('Wiktionary unavailable', 502)
+    return {'inp': ru_word, 'error': message}, status
+
+
+def forms_arguments(args) -> Tuple[Optional[FrozenSet[int]], Optional[str]]:
+    """
+    Reads the filter arguments of /forms: code=N for one slot, codes=N,M,... for several (the
+    two may be combined) and pos=UPOS to choose a part of speech
+    :param args: A mapping of argument name to value
+    :return: A tuple of the inflection codes (or None for every form) and the UPOS tag (or None)
+    :raises ValueError: if a code is not an inflection code or the tag is not a UPOS tag of ours
+    """
+    values = [args.get('code') or '']
+    values.extend((args.get('codes') or '').split(','))
+    values = [value.strip() for value in values if value.strip()]
+    codes = None
+    if values:
+        codes = frozenset(int(value) for value in values)
+        known = {code for layout in paradigm_layouts().values() for code in layout.codes}
+        if not codes <= known:
+            raise ValueError(f'Unknown inflection codes {sorted(codes - known)}')
+    upos = args.get('pos')
+    if upos:
+        upos = upos.strip().upper()
+        if upos not in {pos.to_upos() for pos in SpeechPart}:
+            raise ValueError(f'Unknown part of speech {upos}')
+    return codes, upos or None
+
+
+def features_argument(args) -> bool:
+    """
+    Reads the features argument of /forms
+    :param args: A mapping of argument name to value
+    :return: True if features=ud asks for the Universal Dependencies features of every form
+    :raises ValueError: for any other value
+    """
+    features = args.get('features')
+    if features and features.lower() != 'ud':
+        raise ValueError(f'Unknown feature set {features}')
+    return bool(features)
+
+
+def with_features(w_output: dict) -> dict:
+    """
+    Adds the UD FEATS string of each form to a payload
+    :param w_output: The payload, which is left as it is (it may be cached)
+    :return: A new payload whose forms have a feats member, or the payload itself if it has no forms
+    """
+    if not w_output.get('forms'):
+        return w_output
+    feats = codes2feats([form['code'] for form in w_output['forms']])
+    output = dict(w_output)
+    output['forms'] = [dict(form, feats=form_feats) for (form, form_feats) in zip(w_output['forms'], feats)]
+    return output
+
+
+def filter_output(w_output: dict, codes: Optional[FrozenSet[int]] = None, upos: Optional[str] = None) -> dict:
+    """
+    Applies the /forms filters to a payload made for every form
+    :param w_output: The payload
+    :param codes: Keep only the forms with these inflection codes, or None for all of them
+    :param upos: The part of speech asked for, or None
+    :return: The filtered payload (a new dict), or the payload itself when there is nothing to filter
+    """
+    if 'error' in w_output:
+        return w_output
+    if upos is not None and w_output['pos'] != upos:
+        return {'inp': w_output['inp'], 'error': NOT_FOUND_AS_POS_ERROR.format(pos=upos)}
+    if codes is None:
+        return w_output
+    filtered = dict(w_output)
+    filtered['forms'] = [form for form in w_output.get('forms', []) if form['code'] in codes]
+    return filtered
+
+
+def lexicon_output(lexicon: Optional[MappedLexicon], ru_word: str, codes: Optional[FrozenSet[int]] = None,
+                   upos: Optional[str] = None) -> Optional[dict]:
+    """
+    Returns the payload for a word held in a lexicon
+    :param lexicon: The mapped lexicon, or None
+    :param ru_word: The lemma or inflected form
+    :param codes: Read only the forms with these inflection codes, or None for all of them
+    :param upos: Answer with the first entry of this part of speech rather than the first entry, or None
+    :return: The payload, or None if the word is not in the lexicon
+    """
+    entries = lexicon.resolve(ru_word, codes) if lexicon is not None else []
+    if not entries:
+        return None
+    if upos is not None:
+        entries = [entry for entry in entries if entry.pos.to_upos() == upos]
+        if not entries:
+            return {'inp': ru_word, 'error': NOT_FOUND_AS_POS_ERROR.format(pos=upos)}
+    entry = entries[0]
+    # uninflected words have no forms, as on the live path, unless particular forms were asked for
+    w_output = forms_output(ru_word, entry.pos, entry.forms if codes is not None else entry.forms or None)
+    if entry.lemma != ru_word:
+        w_output['lemma'] = entry.lemma
+    return w_output
+
+
+def page_output(ru_word: str, page: RuWikitionary) -> dict:
+    """
+    Parses a page and returns the payload for its word
+    :param ru_word: The requested word
+    :param page: The page; it is released once parsed
+    :return: The payload
+    :raises UpstreamError: if the page has to be fetched and the fetch fails
+    """
+    # extract() drops the page tree and the response as soon as the word is parsed
+    (w_pos, w_word) = page.extract()
+    if w_pos is None:
+        return not_found_output(ru_word)
+    try:
+        w_forms = w_word.inflection_code_list
+    except AttributeError:
+        w_forms = None
+    return forms_output(ru_word, w_pos, w_forms)
+
+
+def parse_output(ru_word: str, data: bytes) -> dict:
+    """
+    Returns the payload for an already-fetched page; a module-level function so that it can
+    be handed to a process pool
+    :param ru_word: The requested word
+    :param data: The page HTML
+    :return: The payload
+    """
+    return page_output(ru_word, RuWikitionary.from_bytes(ru_word, data))
+
+
+def stats_output(cache: Optional[ResponseCache], flights=None) -> dict:
+    """
+    Returns the /stats payload
+    :param cache: The response cache, or None
+    :param flights: The SingleFlight (or AsyncSingleFlight) coalescing fetches, or None
+    :return: The cache counters, and how many fetches are in flight and how many requests shared one
+    """
+    return {'cache': cache.stats() if cache is not None else None,
+            'flights': {'in_flight': len(flights.flights), 'shared': flights.shared} if flights is not None else None}
+
+
+def learn_output(index: Optional[SymmetricDeleteIndex], w_output: dict):
+    """
+    Adds the forms of a fetched word to the fuzzy index, so that later misspellings of it find it; the
+    index keeps only the words learned last (see SymmetricDeleteIndex.learn)
+    :param index: The fuzzy index, or None when /suggest is off
+    :param w_output: The payload of the fetched word
+    :return: Nothing
+    """
+    if index is None or 'error' in w_output:
+        return
+    index.learn(w_output['inp'], [(form['form'], form['code']) for form in w_output.get('forms', [])])
+
+
+def suggest_output(index: SymmetricDeleteIndex, ru_word: str, args) -> dict:
+    """
+    Returns the /suggest payload
+    :param index: The fuzzy index
+    :param ru_word: The word, possibly misspelled
+    :param args: A mapping of query argument name to value: distance (at most MAX_DISTANCE) and limit
+    :return: The known forms closest to the word, each with its lemma and edit distance
+    :raises ValueError: if distance or limit is not a non-negative integer
+    """
+    distance = int(args.get('distance') or MAX_DISTANCE)
+    limit = int(args.get('limit') or 10)
+    if distance < 0 or limit < 0:
+        raise ValueError('distance and limit must not be negative')
+    suggestions = index.suggest(ru_word, distance, limit)
+    return {'inp': ru_word, 'suggestions': [suggestion._asdict() for suggestion in suggestions]}
+
+
+def endings_output(index: SuffixIndex, suffix: str, args) -> dict:
+    """
+    Returns the /endings payload
+    :param index: The suffix index of the lexicon
+    :param suffix: The ending
+    :param args: A mapping of query argument name to value: code, codes and pos as for /forms, cursor and limit
+    :return: The number of forms with the ending and those from cursor on, each with its lemma, UPOS and code
+    :raises ValueError: for an unknown filter, or if cursor or limit is not a non-negative integer
+    """
+    (codes, upos) = forms_arguments(args)
+    try:
+        (cursor, limit) = (int(args.get('cursor') or 0), int(args.get('limit') or ENDINGS_LIMIT))
+    except ValueError:
+        raise ValueError('cursor and limit must be non-negative integers') from None
+    if cursor < 0 or limit < 0:
+        raise ValueError('cursor and limit must be non-negative integers')
+    forms = [{'form': ending.form, 'lemma': ending.lemma, 'pos': ending.pos.to_upos(), 'code': ending.code}
+             for ending in index.endings(suffix, codes, upos, cursor, limit)]
+    return {'suffix': suffix, 'count': index.count(suffix, codes, upos), 'forms': forms}
+
+
+def complete_output(trie: CompletionTrie, prefix: str, args) -> dict:
+    """
+    Returns the /complete payload
+    :param trie: The completion trie of the lexicon
+    :param prefix: What has been typed so far
+    :param args: A mapping of query argument name to value: limit, at most the trie's k
+    :return: The best lemmas starting with the prefix
+    :raises ValueError: if limit is not a non-negative integer
+    """
+    limit = int(args.get('limit') or trie.k)
+    if limit < 0:
+        raise ValueError('limit must not be negative')
+    return {'inp': prefix, 'completions': trie.complete(prefix, limit)}
+
+
+def inflect_arguments(payload) -> List[Tuple[str, Slot]]:
+    """
+    Reads the body of POST /inflect: a JSON array of objects, each with a lemma and either an
+    inflection code or UD features, e.g. [{"lemma": "кошка", "code": 4}, {"lemma": "делать",
+    "features": "Gender=Fem|Tense=Past"}]
+    :param payload: The decoded JSON body
+    :return: A list of (lemma, slot) tuples, in order
+    :raises ValueError: for a malformed body, an unknown code or features that no code has
+    """
+    if not isinstance(payload, list):
+        raise ValueError('Expected a JSON array of {"lemma", "code" or "features"} objects')
+    if len(payload) > MAX_INFLECT_REQUESTS:
+        raise ValueError(f'At most {MAX_INFLECT_REQUESTS} lemmas per request')
+    requests = []
+    for (idx, item) in enumerate(payload):
+        if not isinstance(item, dict) or not isinstance(item.get('lemma'), str) or \
+                (item.get('code') is None) == (item.get('features') is None):
+            raise ValueError(f'Item {idx}: expected a lemma and either code or features')
+        slot = item['code'] if item.get('code') is not None else item['features']
+        try:
+            if item.get('code') is not None:
+                # a code sent as a string is answered as a code, not as features
+                slot = int(slot) if isinstance(slot, str) and slot.strip().isdigit() else slot
+                if not isinstance(slot, int):
+                    raise ValueError(f'Not an inflection code: {slot!r}')
+            slot_codes(slot)
+        except ValueError as e:
+            raise ValueError(f'Item {idx}: {e}') from None
+        requests.append((request_key(item['lemma']), slot))
+    return requests
+
+
+def inflect_output(lexicon: MappedLexicon, requests: List[Tuple[str, Slot]]) -> dict:
+    """
+    Returns the POST /inflect payload
+    :param lexicon: The mapped lexicon
+    :param requests: The (lemma, slot) tuples read by inflect_arguments
+    :return: A result per request, in order: the lemma, the slot as given and the forms in it
+    """
+    results = [{'lemma': lemma, 'code' if isinstance(slot, int) else 'features': slot, 'forms': forms}
+               for ((lemma, slot), forms) in zip(requests, inflect_many(lexicon, requests))]
+    return {'results': results}
+
+
+def fetched_output(ru_word: str, cache: Optional[ResponseCache] = None,
+                   index: Optional[SymmetricDeleteIndex] = None) -> Tuple[dict, int, float]:
+    """
+    Fetches and parses a word's page
+    :param ru_word: The requested word
+    :param cache: Where to store the answer, or None
+    :param index: The fuzzy index to add a found word to, or None
+    :return: A tuple of the payload, the HTTP status and the time the answer was made
+    """
+    try:
+        (w_output, status) = page_output(ru_word, RuWikitionary(ru_word, False)), 200
+    except UpstreamError as e:
+        (w_output, status) = upstream_error_output(ru_word, e)
+    else:
+        learn_output(index, w_output)
+    if cache is not None:
+        return cache.put(ru_word, w_output, status)[:3]
+    return w_output, status, time.time()
+
+
+def word_output(ru_word: str, lexicon: Optional[MappedLexicon] = None, cache: Optional[ResponseCache] = None,
+                flights: Optional[SingleFlight] = None, codes: Optional[FrozenSet[int]] = None,
+                upos: Optional[str] = None, index: Optional[SymmetricDeleteIndex] = None) -> Tuple[dict, int, float]:
+    """
+    Returns the payload for a word, from the lexicon if it holds the word and from Wiktionary otherwise
+    :param ru_word: The lemma or inflected form, normalized with request_key
+    :param lexicon: The mapped lexicon, or None
+    :param cache: Where fetched answers are kept, or None to fetch every time
+    :param flights: Concurrent requests for a word share one fetch through this, or None
+    :param codes: Only the forms with these inflection codes, or None for all of them
+    :param upos: The part of speech asked for, or None
+    :param index: The fuzzy index that fetched words are added to, or None
+    :return: A tuple of the payload, the HTTP status and the time the answer was made (for Last-Modified)
+    """
+    ru_word = request_key(ru_word)
+    w_output = lexicon_output(lexicon, ru_word, codes, upos)
+    if w_output is not None:
+        return w_output, 200, lexicon.modified
+    # page titles carry no stress marks, so stressed input shares the plain word's fetch and cache entry
+    ru_word = strip_stress(ru_word)
+    # a page is parsed whole whatever was asked for, so the cache holds every form and the
+    # filters are applied to the answer
+    if cache is not None:
+        cached = cache.get(ru_word)
+        if cached is not None:
+            return filter_output(cached.payload, codes, upos), cached.status, cached.stored
+    if flights is None:
+        (w_output, status, modified) = fetched_output(ru_word, cache, index)
+    else:
+        # the first request stores the answer, so those arriving once it has landed hit the cache
+        (w_output, status, modified) = flights.do(ru_word, fetched_output, ru_word, cache, index)
+    return filter_output(w_output, codes, upos), status, modified
+
+
+def etag_for(payload: dict) -> str:
+    """
+    Returns a strong entity tag for a payload, stable across workers and restarts
+    :param payload: The JSON payload
+    :return: The quoted SHA-1 of the payload's canonical JSON
+    """
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return '"' + hashlib.sha1(canonical.encode('utf-8')).hexdigest() + '"'
+
+
+def caching_headers(payload: dict, status: int, modified: float, max_age: int = MAX_AGE,
+                    negative_max_age: int = NEGATIVE_MAX_AGE) -> dict:
+    """
+    Returns the HTTP caching headers for an answer on /forms
+    :param payload: The JSON payload
+    :param status: The HTTP status
+    :param modified: The time the answer was made
+    :param max_age: Seconds clients and proxies may reuse a found word
+    :param negative_max_age: Seconds they may reuse a "not found" answer
+    :return: A dict of header name to value; upstream failures are not to be stored at all
+    """
+    if status != 200:
+        return {'Cache-Control': 'no-store'}
+    return {'Cache-Control': f'public, max-age={negative_max_age if "error" in payload else max_age}',
+            'ETag': etag_for(payload), 'Last-Modified': email.utils.formatdate(modified, usegmt=True)}
+
+
+def not_modified(headers: dict, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """
+    Evaluates a conditional GET
+    :param headers: The caching headers of the current answer, from caching_headers
+    :param if_none_match: The request's If-None-Match header, or None
+    :param if_modified_since: The request's If-Modified-Since header, or None
+    :return: True if the client's copy is current and a 304 can be sent
+    """
+    etag = headers.get('ETag')
+    if etag is None:
+        return False
+    if if_none_match is not None:
+        # If-None-Match takes precedence and uses the weak comparison
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or etag in [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+    if if_modified_since is not None:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        modified = email.utils.parsedate_to_datetime(headers['Last-Modified']).timestamp()
+        return modified <= since
+    return False
+
+
+# the parts of speech zaliznyak.py has rules for, by UPOS
+COMPACT_POS = {'NOUN': SpeechPart.NOUN, 'ADJ': SpeechPart.ADJECTIVE}
+
+
+def compact_record(entry: LexiconEntry) -> dict:
+    """
+    Returns the forms fields of a compact export line
+    :param entry: The lexicon entry
+    :return: The Zaliznyak index and, for a noun or an adjective whose forms expand back exactly, the stressed
+    lemma the forms are generated from, the forms the rules get wrong as code and form pairs, and the codes
+    the entry lacks; any other entry keeps its forms as export_lines gives them
+    """
+    if entry.forms and entry.pos in COMPACT_POS.values():
+        paradigm = compress(entry.forms, entry.zaliznyak, pos=entry.pos)
+        if expand(paradigm) == entry.forms:
+            return {'index': entry.zaliznyak, 'stressed': paradigm.lemma,
+                    'forms': [{'code': code, 'form': form}
+                              for (code, words) in paradigm.exceptions.items() for form in words],
+                    'absent': [code for (code, words) in paradigm.exceptions.items() if not words]}
+    return {'index': entry.zaliznyak, 'forms': [{'code': code, 'form': form} for (form, code) in entry.forms]}
+
+
+def expand_record(record: dict) -> List[Tuple[str, int]]:
+    """
+    Regenerates the forms of a compact export line
+    :param record: The decoded line
+    :return: A list of (form, inflection code) tuples, as the line's entry holds them
+    """
+    if 'stressed' not in record:
+        return [(pair['form'], pair['code']) for pair in record['forms']]
+    exceptions = {}
+    for pair in record['forms']:
+        exceptions.setdefault(pair['code'], []).append(pair['form'])
+    exceptions.update((code, []) for code in record['absent'])
+    return expand(CompactParadigm(record['stressed'], record['index'], exceptions, COMPACT_POS[record['pos']]))
+
+
+def export_lines(lexicon: MappedLexicon, cursor: int = 0, limit: Optional[int] = None,
+                 compact: bool = False) -> Iterator[bytes]:
+    """
+    Streams lexicon entries as NDJSON, reading one entry at a time from the mapped file
+    :param lexicon: The mapped lexicon
+    :param cursor: The entry to start at: 0, or the cursor of the last line already received
+    :param limit: The most entries to stream, or None for all the rest
+    :param compact: Whether to send nouns and adjectives as their Zaliznyak index and the forms the
+    rules get wrong (see compact_record), rather than every form
+    :return: An iterator of UTF-8 lines, each an object with the lemma, its UPOS, its forms as
+    code and form pairs, and the cursor to resume after it
+    """
+    stop = len(lexicon) if limit is None else min(len(lexicon), cursor + limit)
+    for idx in range(max(cursor, 0), stop):
+        entry = lexicon.entry(idx)
+        record = {'cursor': idx + 1, 'lemma': entry.lemma, 'pos': entry.pos.to_upos()}
+        if compact:
+            record.update(compact_record(entry))
+        else:
+            record['forms'] = [{'code': code, 'form': form} for (form, code) in entry.forms]
+        yield (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def export_chunks(lexicon: MappedLexicon, cursor: int = 0, limit: Optional[int] = None,
+                  compress: bool = False, compact: bool = False) -> Iterator[bytes]:
+    """
+    Groups export_lines into chunks for sending, gzip-compressing them as one stream if asked
+    :param lexicon: The mapped lexicon
+    :param cursor: The entry to start at
+    :param limit: The most entries to stream, or None for all the rest
+    :param compress: Whether to produce a gzip stream
+    :param compact: Whether to write compact lines
+    :return: An iterator of chunks; memory use does not depend on the size of the lexicon
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    batch = []
+    for line in export_lines(lexicon, cursor, limit, compact):
+        batch.append(line)
+        if len(batch) == EXPORT_CHUNK_LINES:
+            chunk = b''.join(batch)
+            batch = []
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    chunk = b''.join(batch)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def export_arguments(args) -> Tuple[int, Optional[int]]:
+    """
+    Reads the query arguments of /export
+    :param args: A mapping of argument name to value
+    :return: A tuple of the cursor and the limit (or None)
+    :raises ValueError: if either is not a non-negative integer
+    """
+    cursor = int(args.get('cursor') or 0)
+    limit = args.get('limit')
+    limit = int(limit) if limit else None
+    if cursor < 0 or (limit is not None and limit < 0):
+        raise ValueError('cursor and limit must not be negative')
+    return cursor, limit
+
+
+def export_compact(args) -> bool:
+    """
+    Reads the compact argument of /export
+    :param args: A mapping of argument name to value
+    :return: True for compact=1 or compact=true
+    """
+    return (args.get('compact') or '').lower() in ('1', 'true')
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    Tells whether a client accepts gzip
+    :param accept_encoding: The request's Accept-Encoding header, or None
+    :return: True if gzip is listed and not refused with q=0
+    """
+    for coding in (accept_encoding or '').split(','):
+        (name, *params) = [part.strip() for part in coding.split(';')]
+        if name.lower() in ('gzip', 'x-gzip'):
+            return not any(param.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000') for param in params)
+    return False
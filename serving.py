@@ -0,0 +1,149 @@
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from typing import Dict
+from werkzeug.serving import make_server
+
+# Production serving: a fixed pool of forked worker processes accepting on one shared
+# listening socket, each running a threaded WSGI server (or uvicorn, for the ASGI app). Forking after the app (and any
+# mapped lexicon) is set up lets the workers share those pages copy-on-write.
+#
+# SIGTERM or SIGINT to the parent is passed on to the workers; each stops accepting,
+# finishes the requests it has in flight and exits, then the parent exits. Until then a
+# worker that crashes or is killed is replaced, no sooner than MIN_WORKER_LIFETIME seconds
+# after it was forked.
+LISTEN_BACKLOG = 128
+MIN_WORKER_LIFETIME = 1.0
+
+
+def listening_socket(host: str, port: int) -> socket.socket:
+    """
+    Returns a bound, listening TCP socket
+    :param host: The address to listen on
+    :param port: The port to listen on; 0 picks a free one
+    :return: The socket
+    """
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(LISTEN_BACKLOG)
+    return sock
+
+
+def run_worker(app, sock: socket.socket):
+    """
+    Serves requests on an already-listening socket until SIGTERM or SIGINT, then waits for
+    the requests in flight to finish
+    :param app: The WSGI application
+    :param sock: The listening socket
+    :return: Nothing
+    """
+    (host, port) = sock.getsockname()[:2]
+    server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+    # werkzeug runs request threads as daemons; joining them on close is what makes the
+    # shutdown graceful
+    server.daemon_threads = False
+    server.block_on_close = True
+    # every worker wakes when a connection arrives but only one accepts it; the others
+    # must get EAGAIN rather than block in accept(), where they would miss a shutdown
+    server.socket.setblocking(False)
+
+    def stop(signum, frame):
+        # shutdown() waits for serve_forever() to return, so it cannot run on the thread
+        # the handler interrupted
+        threading.Thread(target=server.shutdown).start()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def run_asgi_worker(app, sock: socket.socket):
+    """
+    Serves an ASGI application with uvicorn on an already-listening socket; uvicorn handles
+    SIGTERM and SIGINT itself, finishing the requests in flight
+    :param app: The ASGI application
+    :param sock: The listening socket
+    :return: Nothing
+    """
+    import uvicorn
+    uvicorn.Server(uvicorn.Config(app, fd=sock.fileno(), log_level='warning')).run()
+
+
+def serve(app, host: str = '0.0.0.0', port: int = 43561, workers: int = 1, worker=run_worker):
+    """
+    Serves an application until SIGTERM or SIGINT
+    :param app: The application
+    :param host: The address to listen on
+    :param port: The port to listen on
+    :param workers: The number of worker processes; with 1 the requests are served in this process
+    :param worker: The function serving app on the listening socket: run_worker for a WSGI
+    application, run_asgi_worker for an ASGI one
+    :return: Nothing
+    """
+    sock = listening_socket(host, port)
+    if workers <= 1:
+        try:
+            worker(app, sock)
+        finally:
+            sock.close()
+        return
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            # until the worker sets its own, the parent's handlers would signal the siblings
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            status = 0
+            try:
+                worker(app, sock)
+            except BaseException:
+                traceback.print_exc()
+                status = 1
+            finally:
+                os._exit(status)
+        children[pid] = time.monotonic()
+        if stopping:
+            # the signal came between the check and the fork
+            os.kill(pid, signal.SIGTERM)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for child in list(children):
+            try:
+                os.kill(child, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        for _ in range(workers):
+            spawn()
+        while children:
+            try:
+                (pid, status) = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            started = children.pop(pid, None)
+            if started is None or stopping:
+                continue
+            # a clean exit is left alone; a worker that crashed or was killed is replaced
+            if os.WIFSIGNALED(status) or os.WEXITSTATUS(status) != 0:
+                # a worker that cannot start would otherwise be re-forked in a tight loop
+                lifetime = time.monotonic() - started
+                if lifetime < MIN_WORKER_LIFETIME:
+                    time.sleep(MIN_WORKER_LIFETIME - lifetime)
+                if not stopping:
+                    spawn()
+    finally:
+        sock.close()
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from typing import Dict
+
+
+class Flight(object):
+    """
+    A call in progress, which the callers that arrive while it runs wait on
+    """
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent calls by key: while a call for a key is running, further callers with
+    that key wait for it and share its result (or its exception) instead of making their own.
+    Thread-safe, for the threaded servers.
+    """
+    def __init__(self):
+        self.flights: Dict[str, Flight] = {}
+        # callers that were given another caller's result
+        self.shared = 0
+        self._lock = threading.Lock()
+
+    def do(self, key: str, function, *args):
+        """
+        Calls function(*args) unless a call for key is already running, then returns its result
+        :param key: Calls with equal keys are coalesced
+        :param function: The function to call
+        :param args: Its arguments
+        :return: The result of the one call
+        """
+        with self._lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = Flight()
+            else:
+                self.shared += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = function(*args)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self.flights[key]
+            flight.done.set()
+        return flight.result
+
+
+class AsyncSingleFlight(object):
+    """
+    SingleFlight for coroutines on one event loop. The call runs as its own task, so a caller
+    that goes away (a client disconnecting) does not cancel it for the others.
+    """
+    def __init__(self):
+        self.flights: Dict[str, asyncio.Future] = {}
+        self.shared = 0
+
+    async def do(self, key: str, function, *args):
+        """
+        Awaits function(*args) unless a call for key is already running, then returns its result
+        :param key: Calls with equal keys are coalesced
+        :param function: The coroutine function to call
+        :param args: Its arguments
+        :return: The result of the one call
+        """
+        task = self.flights.get(key)
+        if task is None:
+            task = self.flights[key] = asyncio.ensure_future(function(*args))
+
+            def land(finished):
+                if self.flights.get(key) is finished:
+                    del self.flights[key]
+            task.add_done_callback(land)
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
@@ -0,0 +1,179 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, List, Dict, Tuple
+
+
+def write_varint(buffer: bytearray, value: int):
+    """
+    Appends an unsigned integer as a little-endian base-128 varint
+    :param buffer: The buffer to append to
+    :param value: The non-negative integer to write
+    :return: Nothing
+    """
+    while value > 0x7f:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, offset: int) -> Tuple[int, int]:
+    """
+    Reads a varint written by write_varint
+    :param data: The bytes (or any buffer) to read from
+    :param offset: The position of the varint
+    :return: A tuple whose first member is the value and whose second is the offset after it
+    :raises ValueError: if the data ends inside the varint
+    """
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError(f'Truncated varint at offset {offset}')
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def read_strings(data, offset: int = 0) -> Tuple[List[str], int]:
+    """
+    Reads a string table serialized by StringPool.to_bytes without building a pool from it
+    :param data: The bytes (or any buffer) to read from
+    :param offset: The position of the table in data
+    :return: A tuple whose first member is the list of strings and whose second is the offset after it
+    :raises ValueError: if the table is truncated or a string is not valid UTF-8
+    """
+    data = memoryview(data)
+    (count, offset) = read_varint(data, offset)
+    strings = []
+    for _ in range(count):
+        (length, offset) = read_varint(data, offset)
+        if offset + length > len(data):
+            raise ValueError(f'Truncated string table at offset {offset}')
+        strings.append(str(data[offset:offset + length], 'utf-8'))
+        offset += length
+    return strings, offset
+
+
+class StringPool(object):
+    """
+    A string table that keeps one canonical object per distinct string and numbers the
+    strings densely in insertion order, so a lexicon can refer to them by id and
+    serialize the text once.
+    """
+    __slots__ = ('strings', 'ids', '_lock')
+
+    def __init__(self, strings: Optional[List[str]] = None):
+        """
+        Returns a new string pool
+        :param strings: Initial strings, given ids 0, 1, 2...
+        """
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        for text in strings or []:
+            self.id_for(text)
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __contains__(self, text: str):
+        return text in self.ids
+
+    def id_for(self, text: str) -> int:
+        """
+        Returns the id of a string, adding it to the pool if it is new
+        :param text: The string
+        :return: Its id
+        """
+        idx = self.ids.get(text)
+        if idx is None:
+            with self._lock:
+                idx = self.ids.get(text)
+                if idx is None:
+                    idx = len(self.strings)
+                    self.strings.append(text)
+                    self.ids[text] = idx
+        return idx
+
+    def intern(self, text: Optional[str]) -> Optional[str]:
+        """
+        Returns the pool's canonical object for a string, adding it if it is new
+        :param text: The string; None is passed through
+        :return: An equal string that is shared by every caller
+        """
+        if text is None:
+            return None
+        return self.strings[self.id_for(text)]
+
+    def string(self, idx: int) -> str:
+        """
+        Returns the string with a given id
+        :param idx: The id
+        :return: The string
+        """
+        return self.strings[idx]
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the pool: the string count, then each string as a length-prefixed UTF-8 run
+        :return: The serialized pool
+        """
+        buffer = bytearray()
+        write_varint(buffer, len(self.strings))
+        for text in self.strings:
+            encoded = text.encode('utf-8')
+            write_varint(buffer, len(encoded))
+            buffer += encoded
+        return bytes(buffer)
+
+    @classmethod
+    def from_bytes(cls, data, offset: int = 0):
+        """
+        Reads a pool serialized by to_bytes
+        :param data: The bytes (or any buffer) to read from
+        :param offset: The position of the pool in data
+        :return: A tuple whose first member is the pool and whose second is the offset after it
+        """
+        (strings, offset) = read_strings(data, offset)
+        return cls(strings), offset
+
+
+# the pool intern_form routes strings through while a build, a parse or a decode is under
+# way; outside of one, strings are returned as they are, so that nothing accumulates from
+# one request to the next
+ACTIVE_POOL = ContextVar('ACTIVE_POOL', default=None)
+
+
+@contextmanager
+def form_pool(pool: Optional[StringPool] = None):
+    """
+    Interns forms in a pool for the duration of a block, e.g. a lexicon build; the pool is dropped with
+    the last reference to it
+    :param pool: The pool to use; None for the enclosing block's pool, failing that a new one
+    :return: A context manager yielding the pool
+    """
+    if pool is None:
+        pool = ACTIVE_POOL.get()
+    if pool is None:
+        pool = StringPool()
+    token = ACTIVE_POOL.set(pool)
+    try:
+        yield pool
+    finally:
+        ACTIVE_POOL.reset(token)
+
+
+def intern_form(text: Optional[str]) -> Optional[str]:
+    """
+    Interns a form or lemma in the active pool (see form_pool)
+    :param text: The form; None is passed through
+    :return: The pool's canonical string, or text itself when no pool is active
+    """
+    pool = ACTIVE_POOL.get()
+    if pool is None:
+        return text
+    return pool.intern(text)
@@ -0,0 +1,118 @@
+from array import array
+from collections import namedtuple
+from itertools import islice
+from typing import Optional, List, Iterator, Collection
+from grammar import *
+from lexicon import *
+from normalize import normalize_form
+
+# Ending queries (every form in -ость, in -ами) over a mapped lexicon. The forms are sorted
+# by their normalized spelling read backwards, so the forms sharing an ending are one
+# contiguous range, found by binary search like the sections of the lexicon file:
+#
+#   ...  акособ  (собака)   акшок  (кошка)   ...  ималвас  ...
+#
+# Only record numbers are kept in memory, 14 bytes a form; the strings are read from the
+# mapped file. A record is a row of the lexicon, or an uninflected entry, whose lemma is
+# its only form.
+Ending = namedtuple('Ending', ['form', 'lemma', 'pos', 'code'])
+Ending.__doc__ = '''A form with a requested ending: the form as stored, its lemma, the SpeechPart of its entry
+and its inflection code (None for an uninflected word)'''
+
+# ends a range of reversed spellings: the byte does not occur in UTF-8
+PAST_LAST = b'\xff'
+
+
+def reversed_key(text: str) -> bytes:
+    return normalize_form(text)[::-1].encode('utf-8')
+
+
+class SuffixIndex(object):
+    """
+    The forms of a mapped lexicon in order of their reversed normalized spelling
+    """
+    def __init__(self, lexicon: MappedLexicon):
+        """
+        Builds the index, reading every entry of the lexicon once
+        :param lexicon: The mapped lexicon; it must stay open while the index is used
+        """
+        self.lexicon = lexicon
+        # per record: the string id of the form, the entry and the inflection code (0 when uninflected)
+        self.string_ids = array('I')
+        self.entries = array('I')
+        self.codes = array('H')
+        for idx in range(len(lexicon)):
+            (lemma_id, first, count, pos) = lexicon.entry_fields(idx)
+            rows = lexicon.rows(first, count) or [(lemma_id, 0)]
+            for (form_id, code) in rows:
+                self.string_ids.append(form_id)
+                self.entries.append(idx)
+                self.codes.append(code)
+        # the keys are made once per distinct string and dropped once sorted
+        keys = {string_id: reversed_key(lexicon.string(string_id)) for string_id in set(self.string_ids)}
+        self.order = array('I', sorted(range(len(self.string_ids)), key=lambda record: keys[self.string_ids[record]]))
+
+    def __len__(self):
+        return len(self.order)
+
+    def key_at(self, idx: int) -> bytes:
+        return reversed_key(self.lexicon.string(self.string_ids[self.order[idx]]))
+
+    def span(self, suffix: str) -> range:
+        """
+        Finds the forms ending in a suffix, regardless of stress marks, ё and case
+        :param suffix: The ending
+        :return: The range of positions in the index order holding them
+        """
+        target = reversed_key(suffix)
+        start = self.lexicon.lower_bound(len(self.order), self.key_at, target)
+        stop = self.lexicon.lower_bound(len(self.order), self.key_at, target + PAST_LAST)
+        return range(start, stop)
+
+    def records(self, suffix: str, codes: Optional[Collection[int]] = None,
+                upos: Optional[str] = None) -> Iterator[int]:
+        """
+        Iterates over the records ending in a suffix, filtering them without reading their strings
+        :param suffix: The ending
+        :param codes: Only forms with these inflection codes, or None for any
+        :param upos: Only forms of this part of speech, or None for any
+        :return: An iterator of record numbers, in index order
+        """
+        for idx in self.span(suffix):
+            record = self.order[idx]
+            if codes is not None and self.codes[record] not in codes:
+                continue
+            if upos is not None and SpeechPart(self.lexicon.entry_fields(self.entries[record])[3]).to_upos() != upos:
+                continue
+            yield record
+
+    def ending(self, record: int) -> Ending:
+        (lemma_id, first, count, pos) = self.lexicon.entry_fields(self.entries[record])
+        return Ending(self.lexicon.string(self.string_ids[record]), self.lexicon.string(lemma_id), SpeechPart(pos),
+                      self.codes[record] or None)
+
+    def endings(self, suffix: str, codes: Optional[Collection[int]] = None, upos: Optional[str] = None,
+                cursor: int = 0, limit: Optional[int] = None) -> List[Ending]:
+        """
+        Returns the forms ending in a suffix, regardless of stress marks, ё and case
+        :param suffix: The ending, e.g. 'ость'
+        :param codes: Only forms with these inflection codes, or None for any
+        :param upos: Only forms of this part of speech, or None for any
+        :param cursor: The number of matching forms to skip
+        :param limit: The most forms to return, or None for all of them
+        :return: The forms in order of their reversed spelling, so that longer endings group together
+        """
+        stop = None if limit is None else cursor + limit
+        return [self.ending(record) for record in islice(self.records(suffix, codes, upos), cursor, stop)]
+
+    def count(self, suffix: str, codes: Optional[Collection[int]] = None, upos: Optional[str] = None) -> int:
+        """
+        Counts the forms ending in a suffix
+        :param suffix: The ending
+        :param codes: Only forms with these inflection codes, or None for any
+        :param upos: Only forms of this part of speech, or None for any
+        :return: The number of forms endings would return without a limit
+        """
+        if codes is None and upos is None:
+            return len(self.span(suffix))
+        return sum(1 for _ in self.records(suffix, codes, upos))
@@ -0,0 +1,92 @@
+import glob
+import os
+import re
+import threading
+import time
+import urllib.parse
+from functools import lru_cache
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional
+
+
+@lru_cache(maxsize=None)
+def load_sample(local_fn: str) -> bytes:
+    """
+    Reads a page from html_samples once; later test classes reuse the same bytes
+    :param local_fn: The file name within html_samples
+    :return: The raw page content
+    """
+    with open(f'html_samples/{local_fn}', 'rb') as file:
+        return file.read()
+
+
+def sample_pages() -> Dict[str, bytes]:
+    """
+    Returns every page in html_samples keyed by the word in its title
+    :return: A dict of word → raw page content
+    """
+    pages = {}
+    for path in sorted(glob.glob('html_samples/*.html')):
+        data = load_sample(os.path.basename(path))
+        title = re.search(rb'<title>(.*?) \xe2\x80\x94 ', data)
+        pages[title.group(1).decode('utf-8')] = data
+    return pages
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # load tests open many connections at once
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # clients that time out hang up before the page is written
+        pass
+
+
+class StubWiktionary(object):
+    """
+    A local stand-in for ru.wiktionary.org that serves the html_samples pages under /wiki/,
+    answering 404 for any other word; use as a context manager
+    """
+    def __init__(self, delay: float = 0.0, status: Optional[int] = None):
+        """
+        Returns a stub that is not yet listening
+        :param delay: Seconds to wait before answering each request
+        :param status: An error status to answer every request with, as an overloaded upstream does, or None
+        """
+        pages = sample_pages()
+        stub = self
+        # requests received, so tests can tell cached answers from fetched ones
+        self.requests = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                time.sleep(delay)
+                word = urllib.parse.unquote(self.path[len('/wiki/'):])
+                data = pages.get(word) if self.path.startswith('/wiki/') else None
+                if status is not None:
+                    self.send_error(status)
+                    return
+                if data is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=UTF-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = StubServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}/wiki/'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,6 +1,7 @@
 import unittest
 from grammar import *
 from ruwiktionary import *
+from tests import load_sample
 
 
 class TestAdjective(unittest.TestCase):
@@ -11,7 +12,7 @@ class TestAdjective(unittest.TestCase):
 class TestCanParseAdjectiveA(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('хороший', True, 'adj_sample_01.html')
+        cls.page = RuWikitionary.from_bytes('хороший', load_sample('adj_sample_01.html'))
         cls.adjective: Adjective = cls.page.parse_adjective()
 
     def testThatPageIsSet(self):
@@ -194,7 +195,7 @@ class TestCanParseAdjectiveA(unittest.TestCase):
 class TestCanParseAdjectiveB(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('дурацкий', True, 'adj_sample_02.html')
+        cls.page = RuWikitionary.from_bytes('дурацкий', load_sample('adj_sample_02.html'))
         cls.adjective: Adjective = cls.page.parse_adjective()
 
     def testThatPageIsSet(self):
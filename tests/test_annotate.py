@@ -0,0 +1,51 @@
+import unittest
+from annotate import *
+from tests.test_lexicon import LexiconTestCase
+
+
+class TestTokenize(unittest.TestCase):
+    def testWordsAndPunctuation(self):
+        self.assertEqual(['Кто-нибудь', 'видел', 'соба́ку', '?'], tokenize('Кто-нибудь видел соба́ку?'))
+
+    def testBlankLine(self):
+        self.assertEqual([], tokenize('  '))
+
+
+class TestAnnotator(LexiconTestCase):
+    def setUp(self) -> None:
+        self.annotator = Annotator(self.lexicon)
+
+    def columns(self, line: str) -> list:
+        return [row.split('\t') for row in self.annotator.annotate_line(line).splitlines()[1:] if row]
+
+    def testSentenceBlock(self):
+        block = self.annotator.annotate_line('Собаки сделали.')
+        self.assertTrue(block.startswith('# text = Собаки сделали.\n'))
+        self.assertTrue(block.endswith('\n\n'))
+        self.assertEqual([['1', 'Собаки', 'собака', 'NOUN', '2', 'Case=Nom|Number=Plur', '_', '_', '_', 'Codes=2,3'],
+                          ['2', 'сделали', 'сделать', 'VERB', '305', 'Mood=Ind|Number=Plur|Tense=Past|VerbForm=Fin',
+                           '_', '_', '_', '_'],
+                          ['3', '.', '_', 'PUNCT', '_', '_', '_', '_', '_', '_']], self.columns('Собаки сделали.'))
+
+    def testUninflectedReadingComesFirst(self):
+        (row,) = self.columns('но')
+        self.assertEqual(['но', 'CCONJ', '_'], row[2:5])
+
+    def testUnknownWord(self):
+        (row,) = self.columns('абырвалг')
+        self.assertEqual(['_', 'X', '_'], row[2:5])
+
+    def testBlankLine(self):
+        self.assertEqual('', self.annotator.annotate_line('\n'))
+
+
+class TestAnnotateLines(LexiconTestCase):
+    lines = ['Собаки сделали.\n', '\n', 'к магазину\n'] * 5
+
+    def testInProcess(self):
+        output = ''.join(annotate_lines(self.lines, self.path, batch_lines=2))
+        self.assertEqual(10, output.count('# text = '))
+
+    def testPoolKeepsTheOrder(self):
+        expected = ''.join(annotate_lines(self.lines, self.path))
+        self.assertEqual(expected, ''.join(annotate_lines(self.lines, self.path, processes=2, batch_lines=1)))
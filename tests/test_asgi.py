@@ -0,0 +1,306 @@
+import unittest
+import asyncio
+import json
+import gzip
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from asgi import *
+from tests import StubWiktionary
+from tests.test_lexicon import LexiconTestCase
+
+
+async def call(application: FormsApp, path: str, method: str = 'GET',
+               headers: Optional[dict] = None, body: bytes = b'') -> Tuple[int, dict, bytes]:
+    (path, _, query) = path.partition('?')
+    encoded = [(name.encode('latin-1'), value.encode('latin-1')) for (name, value) in (headers or {}).items()]
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode('latin-1'),
+             'headers': encoded}
+    messages = []
+
+    chunks = [body[idx:idx + 16] for idx in range(0, len(body), 16)] or [b'']
+
+    async def receive():
+        chunk = chunks.pop(0)
+        return {'type': 'http.request', 'body': chunk, 'more_body': bool(chunks)}
+
+    async def send(message):
+        messages.append(message)
+    await application(scope, receive, send)
+    (start, *bodies) = messages
+    return start['status'], dict(start['headers']), b''.join(body['body'] for body in bodies)
+
+
+def get(application: FormsApp, path: str, method: str = 'GET',
+        headers: Optional[dict] = None, body: bytes = b'') -> Tuple[int, dict, bytes]:
+    return asyncio.run(call(application, path, method, headers, body))
+
+
+class UpstreamTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.upstream = (RuWikitionary.base_url, RuWikitionary.timeout)
+        RuWikitionary.timeout = 0.5
+
+    def tearDown(self) -> None:
+        (RuWikitionary.base_url, RuWikitionary.timeout) = self.upstream
+
+
+class TestAsgiFromUpstream(UpstreamTestCase):
+    def testFetchedWord(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            (status, headers, body) = get(FormsApp(), '/forms/кошка')
+        self.assertEqual(200, status)
+        self.assertEqual(b'application/json', headers[b'content-type'])
+        output = json.loads(body)
+        self.assertEqual('NOUN', output['pos'])
+        self.assertIn({'code': 1, 'form': 'ко́шка', 'desc': 'noun, nominative singular'}, output['forms'])
+
+    def testSameContractAsFlask(self):
+        from main import app
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            expected = app.test_client().get('/forms/%D0%B8%D0%B4%D1%82%D0%B8').get_json()
+            (status, headers, body) = get(FormsApp(), '/forms/идти')
+        self.assertEqual(expected, json.loads(body))
+
+    def testRepeatedLookupIsServedFromCache(self):
+        application = FormsApp(cache=ResponseCache())
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            first = get(application, '/forms/кошка')
+            second = get(application, '/forms/кошка')
+        self.assertEqual(1, stub.requests)
+        self.assertEqual(first, second)
+
+    def testConcurrentRequestsFetchOnce(self):
+        async def many():
+            application = FormsApp()
+            return await asyncio.gather(*[call(application, '/forms/кошка') for _ in range(20)])
+        RuWikitionary.timeout = 5
+        with StubWiktionary(delay=0.3) as stub:
+            RuWikitionary.base_url = stub.base_url
+            results = asyncio.run(many())
+        self.assertEqual(1, stub.requests)
+        self.assertEqual({200}, {status for (status, headers, body) in results})
+
+    def testFetchedWordIsSuggested(self):
+        application = FormsApp(index=SymmetricDeleteIndex())
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            get(application, '/forms/кошка')
+        (status, headers, body) = get(application, '/suggest/кошька?limit=1')
+        suggestions = json.loads(body)['suggestions']
+        self.assertEqual([{'form': 'кошка', 'lemma': 'кошка', 'distance': 1}], suggestions)
+
+    def testFetchedWordIsNotIndexedWithoutSuggestions(self):
+        application = FormsApp()
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            get(application, '/forms/кошка')
+        self.assertIsNone(application.index)
+        self.assertEqual(404, get(application, '/suggest/кошька')[0])
+
+    def testUnknownWord(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            (status, headers, body) = get(FormsApp(), '/forms/нетслова')
+        self.assertEqual(200, status)
+        self.assertIn('error', json.loads(body))
+
+    def testUpstreamTimeout(self):
+        with StubWiktionary(delay=1.0) as stub:
+            RuWikitionary.base_url = stub.base_url
+            (status, headers, body) = get(FormsApp(), '/forms/кошка')
+        self.assertEqual(504, status)
+
+    def testUpstreamUnavailable(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+        (status, headers, body) = get(FormsApp(), '/forms/кошка')
+        self.assertEqual(502, status)
+
+    def testUpstreamErrorStatusIsNotNotFound(self):
+        cache = ResponseCache()
+        with StubWiktionary(status=503) as stub:
+            RuWikitionary.base_url = stub.base_url
+            (status, headers, body) = get(FormsApp(cache=cache), '/forms/кошка')
+        self.assertEqual(502, status)
+        self.assertEqual(b'no-store', headers[b'cache-control'])
+        cached = cache.get('кошка')
+        self.assertEqual(502, cached.status)
+        self.assertAlmostEqual(cache.error_ttl, cached.expires - cached.stored, delta=1)
+
+    def testFetchesDoNotBlockEachOther(self):
+        async def many():
+            paths = ['/forms/кошка', '/forms/собака', '/forms/делать', '/forms/нетслова'] * 10
+            return await asyncio.gather(*[call(FormsApp(), path) for path in paths])
+        RuWikitionary.timeout = 5
+        with StubWiktionary(delay=0.3) as stub:
+            RuWikitionary.base_url = stub.base_url
+            started = time.monotonic()
+            results = asyncio.run(many())
+            elapsed = time.monotonic() - started
+        self.assertEqual([200] * 40, [status for (status, headers, body) in results])
+        # forty sequential fetches would take twelve seconds
+        self.assertLess(elapsed, 6)
+
+
+async def fetch_raw(response: bytes) -> Optional[bytes]:
+    async def answer(reader, writer):
+        await reader.readuntil(b'\r\n\r\n')
+        writer.write(response)
+        await writer.drain()
+        writer.close()
+    server = await asyncio.start_server(answer, '127.0.0.1', 0)
+    RuWikitionary.base_url = f'http://127.0.0.1:{server.sockets[0].getsockname()[1]}/wiki/'
+    try:
+        return await fetch_word(RuWikitionary('кошка'))
+    finally:
+        server.close()
+
+
+class TestAsgiFetchResponses(UpstreamTestCase):
+    def fetch(self, response: bytes) -> Optional[bytes]:
+        return asyncio.run(fetch_raw(response))
+
+    def testChunkedBody(self):
+        self.assertEqual(b'abcdef', self.fetch(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n'
+                                              b'3\r\nabc\r\n3\r\ndef\r\n0\r\n\r\n'))
+
+    def testTruncatedChunkedBody(self):
+        for body in [b'a\r\nabc', b'3\r\nabc\r\n', b'3\r\nabcXY']:
+            with self.assertRaises(UpstreamError):
+                self.fetch(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n' + body)
+
+    def testBodyTooLarge(self):
+        with mock.patch('asgi.MAX_PAGE_BYTES', 4):
+            self.assertEqual(b'abcd', self.fetch(b'HTTP/1.0 200 OK\r\n\r\nabcd'))
+            for response in [b'HTTP/1.0 200 OK\r\nContent-Length: 5\r\n\r\nabcde',
+                             b'HTTP/1.0 200 OK\r\n\r\nabcde',
+                             b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n3\r\nabc\r\n3\r\ndef\r\n0\r\n\r\n']:
+                with self.assertRaises(UpstreamError):
+                    self.fetch(response)
+
+    def testTooManyHeaders(self):
+        headers = b''.join(b'X-%d: 1\r\n' % idx for idx in range(MAX_RESPONSE_HEADERS + 1))
+        with self.assertRaises(UpstreamError):
+            self.fetch(b'HTTP/1.0 200 OK\r\n' + headers + b'\r\nabc')
+
+    def testStatusesAsOnTheBlockingPath(self):
+        self.assertIsNone(self.fetch(b'HTTP/1.0 404 Not Found\r\n\r\n'))
+        with self.assertRaises(UpstreamError):
+            self.fetch(b'HTTP/1.0 503 Service Unavailable\r\n\r\n')
+
+
+class TestAsgiRouting(unittest.TestCase):
+    def testUnknownPath(self):
+        self.assertEqual(404, get(FormsApp(), '/other/кошка')[0])
+
+    def testMissingWord(self):
+        self.assertEqual(404, get(FormsApp(), '/forms/')[0])
+
+    def testPostIsRejected(self):
+        self.assertEqual(404, get(FormsApp(), '/forms/кошка', 'POST')[0])
+
+    def testStats(self):
+        (status, headers, body) = get(FormsApp(cache=ResponseCache(max_entries=5)), '/stats')
+        self.assertEqual(5, json.loads(body)['cache']['max_entries'])
+
+    def testLifespan(self):
+        async def run():
+            incoming = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+            sent = []
+
+            async def receive():
+                return incoming.pop(0)
+
+            async def send(message):
+                sent.append(message['type'])
+            await FormsApp()({'type': 'lifespan'}, receive, send)
+            return sent
+        self.assertEqual(['lifespan.startup.complete', 'lifespan.shutdown.complete'], asyncio.run(run()))
+
+
+class TestAsgiFromLexicon(LexiconTestCase):
+    def testInflectedForm(self):
+        (status, headers, body) = get(FormsApp(self.lexicon), '/forms/сде́лал')
+        output = json.loads(body)
+        self.assertEqual('сделать', output['lemma'])
+        self.assertEqual('VERB', output['pos'])
+
+    def testCodeFilters(self):
+        (status, headers, body) = get(FormsApp(self.lexicon), '/forms/собака?code=4&pos=NOUN')
+        self.assertEqual([{'code': 4, 'form': 'соба́к', 'desc': 'noun, genitive plural'}],
+                         json.loads(body)['forms'])
+        self.assertEqual(400, get(FormsApp(self.lexicon), '/forms/собака?codes=1,x')[0])
+
+    def testUDFeatures(self):
+        (status, headers, body) = get(FormsApp(self.lexicon), '/forms/сделать?code=302&features=ud')
+        (form,) = json.loads(body)['forms']
+        self.assertEqual('Gender=Masc|Mood=Ind|Number=Sing|Tense=Past|VerbForm=Fin', form['feats'])
+
+    def testEndings(self):
+        application = FormsApp(self.lexicon, suffixes=SuffixIndex(self.lexicon))
+        (status, headers, body) = get(application, '/endings/ами?codes=11&limit=2')
+        output = json.loads(body)
+        self.assertEqual(5, output['count'])
+        self.assertEqual(['соба́ками', 'ко́шками'], [form['form'] for form in output['forms']])
+        self.assertEqual(400, get(application, '/endings/ами?cursor=x')[0])
+        self.assertEqual(404, get(FormsApp(self.lexicon), '/endings/ами')[0])
+
+    def testCompletions(self):
+        application = FormsApp(self.lexicon, completions=CompletionTrie.from_lexicon(self.lexicon))
+        (status, headers, body) = get(application, '/complete/со')
+        self.assertEqual(['собака'], json.loads(body)['completions'])
+        self.assertEqual(404, get(FormsApp(self.lexicon), '/complete/со')[0])
+
+    def testInflect(self):
+        body = json.dumps([{'lemma': 'кошка', 'code': 4}, {'lemma': 'делать', 'features': 'Gender=Fem|Tense=Past'}])
+        (status, headers, body) = get(FormsApp(self.lexicon), '/inflect', 'POST', body=body.encode('utf-8'))
+        self.assertEqual([['ко́шек'], ['де́лала']], [result['forms'] for result in json.loads(body)['results']])
+        self.assertEqual(400, get(FormsApp(self.lexicon), '/inflect', 'POST', body=b'{"lemma"')[0])
+        self.assertEqual(404, get(FormsApp(), '/inflect', 'POST', body=b'[]')[0])
+
+    def testHeadHasNoBody(self):
+        (status, headers, body) = get(FormsApp(self.lexicon), '/forms/собака', 'HEAD')
+        self.assertEqual(200, status)
+        self.assertEqual(b'', body)
+        self.assertNotEqual(b'0', headers[b'content-length'])
+
+
+class TestAsgiConditionalGet(LexiconTestCase):
+    def testMatchingETagIsNotModified(self):
+        application = FormsApp(self.lexicon, max_age=60)
+        (status, headers, body) = get(application, '/forms/собака')
+        self.assertEqual(b'public, max-age=60', headers[b'cache-control'])
+        self.assertEqual(etag_for(json.loads(body)).encode('latin-1'), headers[b'etag'])
+        etag = headers[b'etag'].decode('latin-1')
+        (status, headers, body) = get(application, '/forms/собака', headers={'If-None-Match': etag})
+        self.assertEqual(304, status)
+        self.assertEqual(b'', body)
+        self.assertNotIn(b'content-type', headers)
+
+
+class TestAsgiExport(LexiconTestCase):
+    def testNdjson(self):
+        (status, headers, body) = get(FormsApp(self.lexicon), '/export?cursor=1&limit=2')
+        self.assertEqual(b'application/x-ndjson', headers[b'content-type'])
+        self.assertEqual([2, 3], [json.loads(line)['cursor'] for line in body.decode('utf-8').splitlines()])
+
+    def testGzip(self):
+        (status, headers, body) = get(FormsApp(self.lexicon), '/export', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(b'gzip', headers[b'content-encoding'])
+        self.assertEqual(len(self.lexicon), len(gzip.decompress(body).splitlines()))
+
+    def testChunksAreReadInTheExecutor(self):
+        with ThreadPoolExecutor(1) as executor:
+            submitted = []
+            submit = executor.submit
+            with mock.patch.object(executor, 'submit', lambda *args: submitted.append(args[0]) or submit(*args)):
+                (status, headers, body) = get(FormsApp(self.lexicon, executor), '/export')
+        self.assertEqual(len(self.lexicon), len(body.splitlines()))
+        self.assertIn(next, submitted)
+
+    def testWithoutLexicon(self):
+        self.assertEqual(404, get(FormsApp(), '/export')[0])
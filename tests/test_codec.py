@@ -0,0 +1,92 @@
+import unittest
+import glob
+import os
+from grammar import *
+from ruwiktionary import *
+from codec import *
+from stringpool import StringPool
+from tests import load_sample
+
+
+def sample_words() -> List[Word]:
+    words = []
+    for path in sorted(glob.glob('html_samples/*.html')):
+        local_fn = os.path.basename(path)
+        word = local_fn[:-len('.html')].split('_')[-1]
+        page = RuWikitionary.from_bytes(word, load_sample(local_fn))
+        words.extend([w for (pos, w) in page.parse_all() if w is not None])
+    return words
+
+
+class TestCodecRoundTrip(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.words = sample_words()
+        cls.decoded = decode_words(encode_words(cls.words))
+
+    def testEveryWordClassIsCovered(self):
+        classes = {type(w) for w in self.words}
+        self.assertEqual({Noun, Adjective, Verb, Pronoun, PossessivePronoun, DemonstrativePronoun}, classes)
+
+    def testClassesAndLemmasSurvive(self):
+        self.assertEqual([(type(w), w.value) for w in self.words], [(type(w), w.value) for w in self.decoded])
+
+    def testEveryFieldSurvives(self):
+        for (word, decoded) in zip(self.words, self.decoded):
+            for (path, kind) in WORD_CLASSES[WORD_TAGS[type(word)]][1]:
+                expected = get_field(word, path)
+                if kind == LIST:
+                    expected = expected or []
+                self.assertEqual(expected, get_field(decoded, path), f'{word.value} {path}')
+
+    def testZaliznyakIndicesSurvive(self):
+        self.assertEqual([w.zaliznyak for w in self.words], [w.zaliznyak for w in self.decoded])
+        self.assertIn('жо 3*a', [w.zaliznyak for w in self.decoded])
+
+    def testInflectionCodeListsSurvive(self):
+        for (word, decoded) in zip(self.words, self.decoded):
+            self.assertEqual(word.inflection_code_list, decoded.inflection_code_list)
+
+
+class TestCodecFormat(unittest.TestCase):
+    def testSingleWord(self):
+        verb = Verb('делать')
+        verb.present.add_form_list(['делаю', 'делаешь', 'делает', 'делаем', 'делаете', 'делают'])
+        verb.past_adverbial_participle = ['делав', 'делавши']
+        decoded = decode_word(encode_word(verb))
+        self.assertEqual('делаете', decoded.present.plural.p2)
+        self.assertIsNone(decoded.past.masculine)
+        self.assertEqual(['делав', 'делавши'], decoded.past_adverbial_participle)
+
+    def testHeader(self):
+        data = encode_word(Noun('кошка'))
+        self.assertEqual(MAGIC + bytes([VERSION]), data[:4])
+
+    def testSharedStringsAreStoredOnce(self):
+        noun = Noun('кошка')
+        for casestr in ['genitive', 'accusative']:
+            noun.add_form_case_name(casestr, False, ['кошек'])
+        self.assertEqual(1, encode_word(noun).count('кошек'.encode('utf-8')))
+
+    def testBadMagicRaises(self):
+        with self.assertRaises(ValueError):
+            decode_words(b'XYZ\x01\x00\x00')
+
+    def testUnsupportedVersionRaises(self):
+        with self.assertRaises(ValueError):
+            decode_words(MAGIC + bytes([VERSION + 1]) + b'\x00\x00')
+
+    def testTruncatedBatchRaisesValueError(self):
+        data = encode_word(Noun('кошка'))
+        for end in range(len(data)):
+            with self.assertRaises(ValueError):
+                decode_words(data[:end])
+
+    def testStringIdPastTheTableRaisesValueError(self):
+        data = MAGIC + bytes([VERSION]) + StringPool(['кошка']).to_bytes() + b'\x01\x01\x05'
+        with self.assertRaises(ValueError):
+            decode_words(data + bytes(16))
+
+    def testUnknownClassRaises(self):
+        with self.assertRaises(ValueError):
+            encode_word(Word('к', SpeechPart.PREPOSITION))
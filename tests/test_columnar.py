@@ -0,0 +1,69 @@
+import unittest
+import importlib.util
+import os
+from grammar import *
+from tests.test_lexicon import LexiconTestCase
+
+if importlib.util.find_spec('pyarrow'):
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+    from columnar import *
+
+
+@unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+class TestColumnarExport(LexiconTestCase):
+    def rows(self):
+        return [(entry.lemma, entry.pos.to_upos(), form, code, code2term(code) if code is not None else None)
+                for entry in self.lexicon for (form, code) in entry.forms or [(entry.lemma, None)]]
+
+    def output(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def testParquetRoundTrip(self):
+        path = self.output('forms.parquet')
+        self.assertEqual(len(self.rows()), write_columnar(self.lexicon, path))
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(self.rows(), [tuple(row.values()) for row in table.to_pylist()])
+
+    def testArrowStreamRoundTrip(self):
+        path = self.output('forms.arrows')
+        write_columnar(self.lexicon, path, row_group_rows=7)
+        with pyarrow.ipc.open_stream(path) as reader:
+            table = reader.read_all()
+        self.assertEqual(SCHEMA, table.schema)
+        self.assertEqual(self.rows(), [tuple(row.values()) for row in table.to_pylist()])
+
+    def testRowGroups(self):
+        path = self.output('groups.parquet')
+        rows = write_columnar(self.lexicon, path, row_group_rows=50)
+        metadata = pyarrow.parquet.ParquetFile(path).metadata
+        self.assertEqual(-(-rows // 50), metadata.num_row_groups)
+        self.assertEqual(50, metadata.row_group(0).num_rows)
+
+    def testDictionaryEncoded(self):
+        path = self.output('dictionary.parquet')
+        write_columnar(self.lexicon, path)
+        schema = pyarrow.parquet.read_schema(path)
+        for name in ('lemma', 'pos', 'description'):
+            self.assertTrue(pyarrow.types.is_dictionary(schema.field(name).type))
+        column = pyarrow.parquet.ParquetFile(path).metadata.row_group(0).column(0)
+        self.assertIn('RLE_DICTIONARY', column.encodings)
+
+    def testUninflectedEntry(self):
+        batch = next(record_batches(self.lexicon, cursor=[entry.lemma for entry in self.lexicon].index('но'),
+                                    limit=1))
+        self.assertEqual([{'lemma': 'но', 'pos': 'CCONJ', 'form': 'но', 'code': None, 'description': None}],
+                         batch.to_pylist())
+
+    def testBatchesAreBounded(self):
+        batches = list(record_batches(self.lexicon, batch_rows=10))
+        self.assertEqual({10}, {batch.num_rows for batch in batches[:-1]})
+        self.assertEqual(len(self.rows()), sum(batch.num_rows for batch in batches))
+
+    def testFormatFromName(self):
+        self.assertEqual('parquet', columnar_format('forms.Parquet'))
+        self.assertEqual('arrows', columnar_format('forms.arrows'))
+        self.assertIsNone(columnar_format('forms.ndjson'))
+        with self.assertRaises(ValueError):
+            write_columnar(self.lexicon, self.output('forms.csv'))
@@ -0,0 +1,62 @@
+import unittest
+from complete import *
+from normalize import normalize_form
+from tests.test_lexicon import LexiconTestCase
+
+WORDS = ['собака', 'собачка', 'собачий', 'собор', 'соболь', 'сова', 'совет', 'советник', 'совесть', 'сок', 'сокол',
+         'со́нный', 'сон', 'соль', 'Софья', 'сосна', 'ёж', 'ель']
+
+
+class TestCompletionTrie(unittest.TestCase):
+    def testShorterFirst(self):
+        trie = CompletionTrie(WORDS, k=3)
+        self.assertEqual(['сок', 'сон', 'сова'], trie.complete('со'))
+
+    def testFrequencies(self):
+        trie = CompletionTrie(WORDS, {'собака': 900, 'совет': 500, 'сосна': 10}, k=3)
+        self.assertEqual(['собака', 'совет', 'сосна'], trie.complete('со'))
+        self.assertEqual(['совет', 'сов', 'сова'][:1], trie.complete('сов', 1))
+
+    def testSameAsScan(self):
+        frequencies = {normalize_form(word): len(word) * 7 % 5 for word in WORDS}
+        trie = CompletionTrie(WORDS, frequencies, k=4)
+        for prefix in ['', 'с', 'со', 'соб', 'собач', 'сов', 'сове', 'х', 'е']:
+            matching = [word for word in WORDS if normalize_form(word).startswith(prefix)]
+            expected = sorted(matching, key=lambda word: (-frequencies[normalize_form(word)],
+                                                             len(normalize_form(word)), normalize_form(word)))
+            self.assertEqual(expected[:4], trie.complete(prefix), prefix)
+
+    def testOnlyLargeNodesArePrecomputed(self):
+        trie = CompletionTrie(WORDS, k=3)
+        self.assertIn('со', trie.top)
+        self.assertNotIn('собач', trie.top)
+        self.assertEqual(['собачий', 'собачка'], trie.complete('собач'))
+        self.assertEqual(['собор', 'собака', 'соболь'], trie.complete('соб'))
+
+    def testStressCaseAndYo(self):
+        trie = CompletionTrie(WORDS)
+        self.assertEqual(['ёж', 'ель'], trie.complete('Е'))
+        self.assertEqual(['Софья'], trie.complete('соф'))
+        self.assertEqual(['со́нный'], trie.complete('сонн'))
+
+    def testLimit(self):
+        trie = CompletionTrie(WORDS, k=5)
+        self.assertEqual(2, len(trie.complete('с', 2)))
+        self.assertEqual(5, len(trie.complete('с', 50)))
+        self.assertEqual([], trie.complete('х'))
+
+    def testRepeatedLemmasAreKeptOnce(self):
+        self.assertEqual(['но'], CompletionTrie(['но', 'но', 'но']).complete('н'))
+
+
+class TestFrequencyList(unittest.TestCase):
+    def testEitherOrder(self):
+        lines = ['# word count', 'кошка\t120', '75 собака', '', 'Кошка 5', 'слово', '3.0 Ёж']
+        self.assertEqual({'кошка': 125, 'собака': 75, 'еж': 3}, load_frequencies(lines))
+
+
+class TestCompletionFromLexicon(LexiconTestCase):
+    def testEveryLemma(self):
+        trie = CompletionTrie.from_lexicon(self.lexicon)
+        self.assertEqual(len({entry.lemma for entry in self.entries}), len(trie))
+        self.assertEqual(['кто', 'кошка'], trie.complete('к', 3)[1:])
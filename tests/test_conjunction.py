@@ -1,12 +1,13 @@
 import unittest
 from grammar import *
 from ruwiktionary import *
+from tests import load_sample
 
 
 class TestConjunctionA(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('но', True, 'conj_но.html')
+        cls.page = RuWikitionary.from_bytes('но', load_sample('conj_но.html'))
         cls.pronoun: Pronoun = cls.page.parse_pronoun()
 
     def testThatPageIsSet(self):
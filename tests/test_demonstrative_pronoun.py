@@ -1,12 +1,13 @@
 import unittest
 from grammar import *
 from ruwiktionary import *
+from tests import load_sample
 
 
 class TestCanParseDemonstrativePronounA(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('этот', True, 'demonstrative_pronoun_этот.html')
+        cls.page = RuWikitionary.from_bytes('этот', load_sample('demonstrative_pronoun_этот.html'))
         cls.pronoun: DemonstrativePronoun = cls.page.parse_demonstrative_pronoun()
 
     def testThatPageIsSet(self):
@@ -0,0 +1,86 @@
+import unittest
+import importlib.util
+from grammar import *
+from tests.test_lexicon import LexiconTestCase
+
+if importlib.util.find_spec('numpy'):
+    import numpy
+    from features import *
+
+
+@unittest.skipUnless(importlib.util.find_spec('numpy'), 'numpy is not installed')
+class TestFeatureBits(unittest.TestCase):
+    def testRoundTrip(self):
+        bits = encode_features(4, SpeechPart.NOUN)
+        self.assertEqual({'pos': SpeechPart.NOUN, 'Case': 'Gen', 'Number': 'Plur'}, decode_features(bits))
+
+    def testEveryCodeRoundTrips(self):
+        for (code, feats) in ud_feature_table().items():
+            decoded = decode_features(encode_features(code, SpeechPart.VERB))
+            del decoded['pos']
+            pairs = [f'{name}={decoded[name]}' for name in sorted(decoded, key=str.lower)]
+            self.assertEqual(feats, '|'.join(pairs) or '_')
+
+    def testFieldsDoNotOverlap(self):
+        used = POS_BITS
+        for name in FEATURE_FIELDS:
+            (shift, width, values) = FEATURE_FIELDS[name]
+            self.assertLess(len(values), 1 << width)
+            mask = ((1 << width) - 1) << shift
+            self.assertEqual(0, used & mask)
+            used |= mask
+        self.assertLess(used, 1 << 32)
+
+
+@unittest.skipUnless(importlib.util.find_spec('numpy'), 'numpy is not installed')
+class TestFeatureTable(LexiconTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.table = FeatureTable(cls.lexicon)
+
+    def testOneElementPerRow(self):
+        self.assertEqual(self.lexicon.row_count, len(self.table))
+        self.assertEqual(numpy.uint32, self.table.features.dtype)
+
+    def testSelect(self):
+        selected = self.table.select(SpeechPart.NOUN, Case='Gen', Number='Plur')
+        self.assertIn(('собака', 'соба́к', 4), self.table.forms(selected))
+        self.assertEqual({4}, {code for (lemma, form, code) in self.table.forms(selected)})
+
+    def testSelectWithoutPartOfSpeech(self):
+        selected = self.table.select(VerbForm='Fin', Tense='Past', Gender='Fem')
+        self.assertEqual({303}, set(self.table.codes[selected].tolist()))
+
+    def testLastLetterIn(self):
+        selected = self.table.select(SpeechPart.NOUN, Case='Gen', Number='Plur') & self.table.last_letter_in('к')
+        self.assertEqual({'собака', 'кошка'}, {lemma for (lemma, form, code) in self.table.forms(selected)})
+
+    def testNounGenderAndAnimacyFromIndex(self):
+        self.assertEqual({'собака', 'кошка'}, {lemma for (lemma, form, code) in
+                                                 self.table.forms(self.table.select(SpeechPart.NOUN, Gender='Fem'))})
+        self.assertEqual({'магазин', 'но'}, {lemma for (lemma, form, code) in
+                                             self.table.forms(self.table.select(SpeechPart.NOUN, Gender='Masc'))})
+        animate = self.table.select(SpeechPart.NOUN, Animacy='Anim')
+        self.assertEqual({'собака', 'кошка'}, {lemma for (lemma, form, code) in self.table.forms(animate)})
+
+    def testFeminineNounsWithZeroGenitivePlural(self):
+        selected = (self.table.select(SpeechPart.NOUN, Gender='Fem', Case='Gen', Number='Plur') &
+                    self.table.zero_ending())
+        self.assertEqual({('собака', 'соба́к'), ('кошка', 'ко́шек')},
+                         {(lemma, form) for (lemma, form, code) in self.table.forms(selected)})
+
+    def testZeroEndingFollowsTheTables(self):
+        forms = {(lemma, code) for (lemma, form, code) in self.table.forms(self.table.zero_ending())}
+        self.assertIn(('магазин', 1), forms)
+        self.assertIn(('отсутствие', 4), forms)
+        self.assertNotIn(('магазин', 4), forms)
+        self.assertNotIn(('кошка', 1), forms)
+        self.assertNotIn('но', {lemma for (lemma, code) in forms})
+
+    def testGroupCount(self):
+        counts = self.table.group_count('pos')
+        self.assertEqual(len(self.table), sum(counts.values()))
+        nouns = self.table.group_count('Case', self.table.select(SpeechPart.NOUN))
+        self.assertEqual(counts[SpeechPart.NOUN], sum(nouns.values()))
+        self.assertIn('Gen', nouns)
@@ -0,0 +1,69 @@
+import unittest
+from fuzzy import *
+from tests.test_lexicon import LexiconTestCase
+
+
+class TestEditDistance(unittest.TestCase):
+    def testOperations(self):
+        self.assertEqual(0, edit_distance('кошка', 'кошка', 2))
+        self.assertEqual(1, edit_distance('кошка', 'кошька', 2))
+        self.assertEqual(1, edit_distance('кошка', 'кшока', 2))
+        self.assertEqual(2, edit_distance('собака', 'сабак', 2))
+
+    def testLimit(self):
+        self.assertEqual(3, edit_distance('abc', 'xyz', 2))
+        self.assertEqual(2, edit_distance('a', 'abcdef', 1))
+
+    def testDeletions(self):
+        self.assertEqual({'ab', 'a', 'b'}, deletions('ab', 1))
+        self.assertEqual({'ab', 'a', 'b', ''}, deletions('ab', 2))
+
+
+class TestSymmetricDeleteIndex(LexiconTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.index = SymmetricDeleteIndex.from_lexicon(cls.lexicon)
+
+    def testMisspelledForm(self):
+        (first, *rest) = self.index.suggest('сабаки')
+        self.assertEqual(Suggestion('соба́ки', 'собака', 1), first)
+
+    def testTransposition(self):
+        self.assertEqual('магазин', self.index.suggest('мгаазин')[0].lemma)
+
+    def testKnownWordComesFirst(self):
+        self.assertEqual(Suggestion('собака', 'собака', 0), self.index.suggest('Собака')[0])
+
+    def testDistanceAndLimit(self):
+        self.assertEqual([], self.index.suggest('сбкаа', max_distance=1))
+        self.assertEqual(2, len(self.index.suggest('собака', limit=2)))
+        self.assertEqual([], self.index.suggest('абвгдежз'))
+
+    def testIncrementalAdd(self):
+        index = SymmetricDeleteIndex()
+        self.assertEqual([], index.suggest('ёшик'))
+        index.add_paradigm('ёжик', [('ёжика', 3)])
+        self.assertEqual({'ёжик', 'ёжика'}, {suggestion.form for suggestion in index.suggest('ежек')})
+        self.assertEqual(2, len(index))
+
+    def testLearnedLemmasAreEvicted(self):
+        index = SymmetricDeleteIndex(max_learned=2)
+        index.learn('ёжик', [('ёжика', 3)])
+        index.learn('кошка', [('ко́шки', 2)])
+        index.learn('ёжик', [('ёжика', 3)])
+        index.learn('собака', [('соба́ки', 2)])
+        self.assertEqual(['ёжик', 'собака'], list(index.learned))
+        self.assertEqual([], index.suggest('кошки'))
+        self.assertEqual(4, len(index))
+        deletes = SymmetricDeleteIndex()
+        deletes.add_paradigm('ёжик', [('ёжика', 3)])
+        deletes.add_paradigm('собака', [('соба́ки', 2)])
+        self.assertEqual(deletes.deletes, index.deletes)
+
+    def testRemoveKeepsSharedSpellings(self):
+        index = SymmetricDeleteIndex()
+        index.add('стекла', 'стекло')
+        index.add('стекла', 'стечь')
+        index.remove('стекла', 'стечь')
+        self.assertEqual([Suggestion('стекла', 'стекло', 0)], index.suggest('стекла'))
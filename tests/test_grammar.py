@@ -1,4 +1,5 @@
 import unittest
+import importlib.util
 from grammar import *
 
 
@@ -481,3 +482,77 @@ class TestCode2TermDemonstrativePronoun(unittest.TestCase):
     def testCode927(self):
         self.c(None, 927)
 
+
+
+class TestCompactGrammarObjects(unittest.TestCase):
+    def assertNoInstanceDict(self, obj):
+        self.assertFalse(hasattr(obj, '__dict__'))
+
+    def testValueClassesHaveNoInstanceDict(self):
+        for cls in [NounInflection, AdjectiveInflection, VerbTensePlurality, VerbTense, VerbPastTense,
+                    VerbImperativeTense]:
+            self.assertNoInstanceDict(cls())
+
+    def testWordClassesHaveNoInstanceDict(self):
+        for cls in [Noun, Pronoun, Adjective, PossessivePronoun, DemonstrativePronoun, Verb]:
+            self.assertNoInstanceDict(cls('test'))
+
+    def testUnknownAttributeRaises(self):
+        with self.assertRaises(AttributeError):
+            Noun('test').ablative = NounInflection()
+
+    def testInflectionCodesAreCachedPerInstance(self):
+        first, second = Noun('test'), Noun('test')
+        first.add_form_case_name('nominative', True, ['first'])
+        second.add_form_case_name('nominative', True, ['second'])
+        self.assertIs(first.inflection_code_list, first.inflection_code_list)
+        self.assertEqual([('second', 1)], second.inflection_code_list)
+
+    def testFromTermListKeepsAttributes(self):
+        inflection = AdjectiveInflection.from_term_list(['m', 'n', 'f', 'p'])
+        self.assertEqual(('m', 'f', 'n', 'p'),
+                         (inflection.masculine, inflection.feminine, inflection.neuter, inflection.plural))
+
+
+class TestUDFeatures(unittest.TestCase):
+    def testNoun(self):
+        self.assertEqual('Case=Gen|Number=Plur', code2feats(4))
+        self.assertEqual('Case=Loc', code2feats(17))
+
+    def testAdjective(self):
+        self.assertEqual('Animacy=Anim|Case=Acc|Gender=Masc|Number=Sing', code2feats(203))
+        self.assertEqual('Gender=Fem|Number=Sing|Variant=Short', code2feats(230))
+
+    def testVerb(self):
+        self.assertEqual('Mood=Ind|Number=Sing|Person=1|Tense=Pres|VerbForm=Fin', code2feats(306))
+        self.assertEqual('Mood=Imp|Number=Plur|Person=2|VerbForm=Fin', code2feats(301))
+        self.assertEqual('Tense=Past|VerbForm=Part|Voice=Pass', code2feats(323))
+        self.assertEqual('Tense=Pres|VerbForm=Conv', code2feats(320))
+
+    def testUninflectedAndUnknown(self):
+        self.assertEqual('_', code2feats(500))
+        self.assertIsNone(code2feats(10))
+
+    def testEveryCodeHasFeatures(self):
+        def codes(node):
+            return [code for child in node.values() for code in codes(child)] if isinstance(node, dict) else [node]
+        self.assertEqual(set(codes(load_inflection_codes())), set(ud_feature_table()))
+
+    def testBulk(self):
+        self.assertEqual(['Case=Nom|Number=Sing', 'Case=Gen|Number=Plur', None], codes2feats([1, 4, 10]))
+
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'numpy is not installed')
+    def testBulkNumpy(self):
+        import numpy
+        feats = codes2feats(numpy.array([1, 4, 306], dtype=numpy.uint16))
+        self.assertEqual([code2feats(1), code2feats(4), code2feats(306)], list(feats))
+
+    def testBulkOutOfRange(self):
+        self.assertEqual([None, None, 'Case=Nom|Number=Sing'], codes2feats([100000, -1, 1]))
+
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'numpy is not installed')
+    def testBulkNumpyOutOfRange(self):
+        import numpy
+        feats = codes2feats(numpy.array([100000, -1, 1, 10], dtype=numpy.int64))
+        self.assertEqual([None, None, 'Case=Nom|Number=Sing', None], list(feats))
+        self.assertIs(ud_feature_object_array(), ud_feature_object_array())
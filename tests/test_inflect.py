@@ -0,0 +1,60 @@
+import unittest
+from inflect import *
+from tests.test_lexicon import LexiconTestCase
+
+
+class TestSlots(unittest.TestCase):
+    def testCode(self):
+        self.assertEqual({4}, slot_codes(4))
+        self.assertEqual({4}, slot_codes('4'))
+
+    def testFeatures(self):
+        self.assertEqual({4}, slot_codes('Case=Gen|Number=Plur') & set(range(1, 18)))
+        self.assertEqual(slot_codes('Number=Plur|Case=Gen'), slot_codes({'Case': 'Gen', 'Number': 'Plur'}))
+        for code in slot_codes('Case=Gen|Number=Plur'):
+            self.assertIn('Case=Gen', code2feats(code))
+
+    def testUnknown(self):
+        for slot in (9999, 'Case=Bad', '', True, 4.0):
+            with self.assertRaises(ValueError):
+                slot_codes(slot)
+
+
+class TestInflectMany(LexiconTestCase):
+    def testInputOrder(self):
+        requests = [('кошка', 4), ('делать', 'Gender=Fem|Tense=Past'), ('кошка', 1), ('идти', {'Mood': 'Imp'})]
+        self.assertEqual([['ко́шек'], ['де́лала'], ['ко́шка'], ['иди́', 'иди́те']],
+                         inflect_many(self.lexicon, requests))
+
+    def testSameAsParadigm(self):
+        for entry in self.entries:
+            for (form, code) in entry.forms:
+                self.assertIn(form, inflect_many(self.lexicon, [(entry.lemma, code)])[0])
+
+    def testVariantsAndHomographs(self):
+        # кошка is stored three times; its forms are given once
+        self.assertEqual([['ко́шкой', 'ко́шкою']], inflect_many(self.lexicon, [('кошка', 9)]))
+
+    def testMissing(self):
+        self.assertEqual([[], []], inflect_many(self.lexicon, [('нетслова', 1), ('кошка', 306)]))
+
+    def testLemmaSpelling(self):
+        self.assertEqual(inflect_many(self.lexicon, [('собака', 4)]), inflect_many(self.lexicon, [('Соба́ка', 4)]))
+
+    def testEachLemmaIsLookedUpOnce(self):
+        calls = []
+        resolve = self.lexicon.resolve
+
+        def counting(word, codes=None):
+            calls.append((word, frozenset(codes)))
+            return resolve(word, codes)
+        self.lexicon.resolve = counting
+        try:
+            inflect_many(self.lexicon, [('кошка', 4), ('собака', 1), ('кошка', 2)])
+        finally:
+            del self.lexicon.resolve
+        self.assertEqual([('кошка', frozenset({2, 4})), ('собака', frozenset({1}))], calls)
+
+    def testInflect(self):
+        self.assertEqual('соба́кой', inflect(self.lexicon, 'собака', 'Case=Ins|Number=Sing'))
+        self.assertIsNone(inflect(self.lexicon, 'нетслова', 1))
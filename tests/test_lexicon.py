@@ -0,0 +1,108 @@
+import unittest
+import glob
+import os
+import tempfile
+from grammar import *
+from ruwiktionary import *
+from lexicon import *
+from tests import load_sample
+
+
+def sample_entries() -> List[LexiconEntry]:
+    entries = []
+    for path in sorted(glob.glob('html_samples/*.html')):
+        local_fn = os.path.basename(path)
+        word = local_fn[:-len('.html')].split('_')[-1]
+        if word.isdigit():
+            continue
+        entries.extend(entries_from_page(RuWikitionary.from_bytes(word, load_sample(local_fn))))
+    return entries
+
+
+class LexiconTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'samples.lex')
+        cls.entries = sample_entries()
+        write_lexicon(cls.path, cls.entries)
+        cls.lexicon = MappedLexicon(cls.path)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.lexicon.close()
+        cls.directory.cleanup()
+
+
+class TestMappedLexicon(LexiconTestCase):
+    def testEveryEntryIsStored(self):
+        self.assertEqual(len(self.entries), len(self.lexicon))
+        self.assertEqual(sorted(self.entries, key=repr), sorted(self.lexicon, key=repr))
+
+    def testLookupLemma(self):
+        (entry,) = self.lexicon.lookup('собака')
+        self.assertEqual(SpeechPart.NOUN, entry.pos)
+        self.assertIn(('соба́к', 4), entry.forms)
+
+    def testLookupHomographs(self):
+        self.assertEqual(3, len(self.lexicon.lookup('кошка')))
+        self.assertEqual([SpeechPart.CONJUNCTION, SpeechPart.INTERJECTION, SpeechPart.NOUN],
+                         [entry.pos for entry in self.lexicon.lookup('но')])
+
+    def testLookupOnlySomeCodes(self):
+        (entry,) = self.lexicon.lookup('собака', {4, 1})
+        self.assertEqual([('соба́ка', 1), ('соба́к', 4)], entry.forms)
+
+    def testResolveFormOnlySomeCodes(self):
+        (entry,) = self.lexicon.resolve('сде́лал', {302})
+        self.assertEqual({302}, {code for (form, code) in entry.forms})
+
+    def testLookupNormalized(self):
+        matches = self.lexicon.lookup_normalized('СОБАКИ')
+        self.assertEqual({'соба́ки'}, {match.form for match in matches})
+        self.assertEqual({3}, {match.stress for match in matches})
+        self.assertEqual({'собака'}, {self.lexicon.entry(match.entry).lemma for match in matches})
+
+    def testResolveUnstressedForm(self):
+        self.assertEqual([], self.lexicon.lookup_form('сделал'))
+        entries = self.lexicon.resolve('сделал', {302})
+        self.assertEqual(['сделать'], [entry.lemma for entry in entries])
+        self.assertEqual({302}, {code for (form, code) in entries[0].forms})
+
+    def testLookupMissingLemma(self):
+        self.assertEqual([], self.lexicon.lookup('собак'))
+        self.assertEqual([], self.lexicon.lookup('яяя'))
+        self.assertEqual([], self.lexicon.lookup(''))
+
+    def testLookupForm(self):
+        readings = self.lexicon.lookup_form('де́лаю')
+        self.assertEqual([('делать', SpeechPart.VERB, 306)], readings)
+
+    def testLookupFormWithSeveralReadings(self):
+        codes = {code for (lemma, pos, code) in self.lexicon.lookup_form('соба́ки')}
+        self.assertEqual({2, 3}, codes)
+
+    def testResolveForm(self):
+        entries = self.lexicon.resolve('сде́лал')
+        self.assertEqual(['сделать'], [entry.lemma for entry in entries])
+
+    def testResolveLemma(self):
+        self.assertEqual('магазин', self.lexicon.resolve('магазин')[0].lemma)
+
+    def testZaliznyakIndicesAreStored(self):
+        self.assertEqual(['жо 3*a', 'ж 3*a', 'ж 3*a'], [entry.zaliznyak for entry in self.lexicon.lookup('кошка')])
+        self.assertEqual('м 1a', self.lexicon.lookup('магазин')[0].zaliznyak)
+
+    def testOtherVersionRaises(self):
+        with open(self.path, 'rb') as file:
+            data = bytearray(file.read())
+        data[len(MAGIC):len(MAGIC) + 2] = (VERSION - 1).to_bytes(2, 'little')
+        path = os.path.join(self.directory.name, 'old.lex')
+        with open(path, 'wb') as file:
+            file.write(data)
+        with self.assertRaises(ValueError):
+            MappedLexicon(path)
+
+    def testNotALexiconRaises(self):
+        with self.assertRaises(ValueError):
+            MappedLexicon('html_samples/noun_sample_01.html')
@@ -0,0 +1,28 @@
+import unittest
+from normalize import *
+
+
+class TestNormalize(unittest.TestCase):
+    def testStripStress(self):
+        self.assertEqual('собаки', strip_stress('соба́ки'))
+        self.assertEqual('йогурт', strip_stress('йо́гурт'))
+        self.assertEqual('ёж', strip_stress('ёж'))
+        self.assertEqual('полмесяца', strip_stress('по̀лме́сяца'))
+
+    def testNormalizeForm(self):
+        self.assertEqual('еж', normalize_form('Ёж'))
+        self.assertEqual('еще', normalize_form('ещё'))
+        self.assertEqual('собаки', normalize_form('СОБА́КИ'))
+
+    def testSplitStress(self):
+        self.assertEqual(('собаки', 3), split_stress('соба́ки'))
+        self.assertEqual(('йогурт', 1), split_stress('йо́гурт'))
+        self.assertEqual(('собака', None), split_stress('собака'))
+
+    def testYoIsStressed(self):
+        self.assertEqual(('ещё', 2), split_stress('ещё'))
+        self.assertEqual(('Ёлка', 0), split_stress('Ёлка'))
+
+    def testJoinStress(self):
+        for form in ['соба́ки', 'йо́гурт', 'ещё', 'собака', 'пол-ме́сяца']:
+            self.assertEqual(form, join_stress(*split_stress(form)))
@@ -1,6 +1,7 @@
 import unittest
 from grammar import *
 from ruwiktionary import *
+from tests import load_sample
 
 
 class TestNounAddForm(unittest.TestCase):
@@ -214,7 +215,7 @@ class TestNounVocativeInflectionCodes(TestNounInflectionCodes):
 class TestCanParseNounA(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('дошкольница', True, 'noun_sample_01.html')
+        cls.page = RuWikitionary.from_bytes('дошкольница', load_sample('noun_sample_01.html'))
         cls.noun: Noun = cls.page.parse_noun()
 
     def testThatPageIsSet(self):
@@ -279,7 +280,7 @@ class TestCanParseNounA(unittest.TestCase):
 class TestCanParseNounNeuterA(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('отсутствие', True, 'noun_neuter_отсутствие.html')
+        cls.page = RuWikitionary.from_bytes('отсутствие', load_sample('noun_neuter_отсутствие.html'))
         cls.noun: Noun = cls.page.parse_noun()
 
     def testThatPageIsSet(self):
@@ -340,7 +341,7 @@ class TestCanParseNounNeuterA(unittest.TestCase):
 class TestCanParseNounMasculineA(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('магазин', True, 'noun_masculine_магазин.html')
+        cls.page = RuWikitionary.from_bytes('магазин', load_sample('noun_masculine_магазин.html'))
         cls.noun: Noun = cls.page.parse_noun()
 
     def testThatPageIsSet(self):
@@ -401,7 +402,7 @@ class TestCanParseNounMasculineA(unittest.TestCase):
 class TestCanParseNounFeminineB(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('собака', True, 'noun_feminine_собака.html')
+        cls.page = RuWikitionary.from_bytes('собака', load_sample('noun_feminine_собака.html'))
         cls.noun: Noun = cls.page.parse_noun()
 
     def testThatPageIsSet(self):
@@ -430,7 +431,7 @@ class TestCanParseNounFeminineB(unittest.TestCase):
 class TestCanParseNounFeminineC(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('кошка', True, 'noun_feminine_кошка.html')
+        cls.page = RuWikitionary.from_bytes('кошка', load_sample('noun_feminine_кошка.html'))
         cls.noun: Noun = cls.page.parse_noun()
 
     def testThatPageIsSet(self):
@@ -0,0 +1,58 @@
+import unittest
+from grammar import *
+from ruwiktionary import *
+from paradigm import *
+from stringpool import intern_form, form_pool
+from tests import load_sample
+
+
+class TestParadigmLayout(unittest.TestCase):
+    def testNounSlotsAreDistinctCodes(self):
+        layout = paradigm_layouts()['noun']
+        self.assertEqual((1, 2, 3, 4, 5, 6, 7, 8, 9, 11, 12, 14, 15, 17), layout.codes)
+
+    def testSlotIsDerivedFromCode(self):
+        layout = paradigm_layouts()['verb']
+        self.assertEqual(0, layout.slot_for_code(300))
+        self.assertEqual(23, layout.slot_for_code(323))
+
+    def testForeignCodeHasNoSlot(self):
+        self.assertIsNone(paradigm_layouts()['noun'].slot_for_code(300))
+
+    def testScalarSectionsHaveOneSlot(self):
+        self.assertEqual((600,), paradigm_layouts()['prep'].codes)
+
+
+class TestParadigmRecordFromNoun(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        page = RuWikitionary.from_bytes('кошка', load_sample('noun_feminine_кошка.html'))
+        cls.noun = page.parse()
+        cls.record = ParadigmRecord.from_word(cls.noun)
+
+    def testFormForCode(self):
+        self.assertEqual('ко́шек', self.record.form_for_code(4))
+
+    def testAlternateFormsShareSlot(self):
+        self.assertEqual(('ко́шкой', 'ко́шкою'), self.record.forms_for_code(9))
+
+    def testMissingCode(self):
+        self.assertEqual((), self.record.forms_for_code(300))
+        self.assertIsNone(self.record.form_for_code(300))
+
+    def testSameFormsAsWord(self):
+        self.assertEqual(sorted(self.noun.inflection_code_list, key=lambda x: x[1]),
+                         self.record.inflection_code_list)
+
+    def testFormsAreInterned(self):
+        with form_pool():
+            record = ParadigmRecord.from_word(self.noun)
+            self.assertIs(record.form_for_code(4), intern_form('ко́шек'))
+
+
+class TestParadigmRecordFromVerb(unittest.TestCase):
+    def testPresentTense(self):
+        verb = RuWikitionary.from_bytes('делать', load_sample('verb_ipf_делать.html')).parse()
+        record = ParadigmRecord.from_word(verb)
+        self.assertEqual('де́лаю', record.form_for_code(306))
+        self.assertEqual(len(verb.inflection_code_list), len(record.inflection_code_list))
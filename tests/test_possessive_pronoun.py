@@ -1,6 +1,7 @@
 import unittest
 from grammar import *
 from ruwiktionary import *
+from tests import load_sample
 
 
 class TestPossessivePronoun(unittest.TestCase):
@@ -11,7 +12,7 @@ class TestPossessivePronoun(unittest.TestCase):
 class TestCanParsePossessivePronounA(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('свой', True, 'poss_pronoun_свой.html')
+        cls.page = RuWikitionary.from_bytes('свой', load_sample('poss_pronoun_свой.html'))
         cls.pronoun: PossessivePronoun = cls.page.parse_possessive_pronoun()
 
     def testThatPageIsSet(self):
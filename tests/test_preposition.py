@@ -1,12 +1,13 @@
 import unittest
 from grammar import *
 from ruwiktionary import *
+from tests import load_sample
 
 
 class TestParsePrepositionA(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('к', True, 'preposition_к.html')
+        cls.page = RuWikitionary.from_bytes('к', load_sample('preposition_к.html'))
 
     def testThatPageIsSet(self):
         """
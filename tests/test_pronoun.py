@@ -1,12 +1,13 @@
 import unittest
 from grammar import *
 from ruwiktionary import *
+from tests import load_sample
 
 
 class TestPronounA(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('кто', True, 'pronoun_кто.html')
+        cls.page = RuWikitionary.from_bytes('кто', load_sample('pronoun_кто.html'))
         cls.pronoun: Pronoun = cls.page.parse_pronoun()
 
     def testThatPageIsSet(self):
@@ -48,7 +49,7 @@ class TestPronounA(unittest.TestCase):
 class TestPronounB(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('что', True, 'pronoun_что.html')
+        cls.page = RuWikitionary.from_bytes('что', load_sample('pronoun_что.html'))
         cls.pronoun: Pronoun = cls.page.parse_pronoun()
 
     def testThatPageIsSet(self):
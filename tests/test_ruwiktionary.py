@@ -1,5 +1,8 @@
 import unittest
+import mmap
+from unittest import mock
 from ruwiktionary import *
+from tests import load_sample, StubWiktionary
 
 
 class TestColIndexToPlurality(unittest.TestCase):
@@ -22,3 +25,159 @@ class TestWiktionaryURL(unittest.TestCase):
         w = RuWikitionary('хорошо', False)
         actual = w.url
         self.assertEqual(expected, actual)
+
+    def testConfiguredBaseURL(self):
+        w = RuWikitionary('кот', False)
+        w.base_url = 'http://127.0.0.1:8000/wiki/'
+        self.assertEqual('http://127.0.0.1:8000/wiki/%D0%BA%D0%BE%D1%82', w.url)
+
+
+class TestPageSources(unittest.TestCase):
+    def testLocalFileSource(self):
+        page = RuWikitionary('собака', True, 'noun_feminine_собака.html')
+        self.assertEqual(page.pos, SpeechPart.NOUN)
+
+    def testBytesSource(self):
+        page = RuWikitionary.from_bytes('собака', load_sample('noun_feminine_собака.html'))
+        self.assertEqual(page.pos, SpeechPart.NOUN)
+        self.assertIn('соба́ки', page.parse().genitive.singular)
+
+    def testStrSource(self):
+        data = load_sample('noun_feminine_собака.html').decode('utf-8')
+        page = RuWikitionary.from_bytes('собака', data)
+        self.assertEqual(page.pos, SpeechPart.NOUN)
+
+    def testMemoryMappedSource(self):
+        with open('html_samples/noun_feminine_собака.html', 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                page = RuWikitionary.from_bytes('собака', data)
+                self.assertEqual(page.pos, SpeechPart.NOUN)
+
+    def testTreeSource(self):
+        tree = RuWikitionary.from_bytes('собака', load_sample('noun_feminine_собака.html')).root_tree
+        page = RuWikitionary.from_tree('собака', tree)
+        self.assertIs(page.root_tree, tree)
+        self.assertEqual(page.pos, SpeechPart.NOUN)
+
+
+class TestParseAllHomographs(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.cat_blocks = RuWikitionary.from_bytes('кошка', load_sample('noun_feminine_кошка.html')).parse_all()
+        cls.no_blocks = RuWikitionary.from_bytes('но', load_sample('conj_но.html')).parse_all()
+
+    def testEverySenseIsParsed(self):
+        self.assertEqual([SpeechPart.NOUN] * 3, [pos for (pos, word) in self.cat_blocks])
+
+    def testSensesKeepTheirOwnTables(self):
+        self.assertEqual(['ко́шек'], self.cat_blocks[0][1].accusative.plural)
+        self.assertEqual(['ко́шки'], self.cat_blocks[1][1].accusative.plural)
+
+    def testEveryPartOfSpeechIsFound(self):
+        expected = [SpeechPart.CONJUNCTION, SpeechPart.INTERJECTION, SpeechPart.NOUN]
+        self.assertEqual(expected, [pos for (pos, word) in self.no_blocks])
+
+    def testUninflectedBlocksHaveNoGrammarObject(self):
+        self.assertIsNone(self.no_blocks[0][1])
+        self.assertIsInstance(self.no_blocks[2][1], Noun)
+
+    def testOtherLanguagesAreSkipped(self):
+        blocks = RuWikitionary.from_bytes('собака', load_sample('noun_feminine_собака.html')).parse_all()
+        self.assertEqual(1, len(blocks))
+
+    def testFirstBlockMatchesParse(self):
+        page = RuWikitionary.from_bytes('делать', load_sample('verb_ipf_делать.html'))
+        (pos, verb) = page.parse_all()[0]
+        self.assertEqual(SpeechPart.VERB, pos)
+        self.assertEqual(page.parse().inflection_code_list, verb.inflection_code_list)
+
+
+class TestZaliznyakIndex(unittest.TestCase):
+    def testNounIndexCarriesGenderAndAnimacy(self):
+        blocks = RuWikitionary.from_bytes('кошка', load_sample('noun_feminine_кошка.html')).parse_all()
+        self.assertEqual(['жо 3*a', 'ж 3*a', 'ж 3*a'], [word.zaliznyak for (pos, word) in blocks])
+
+    def testIndeclinableNoun(self):
+        blocks = RuWikitionary.from_bytes('но', load_sample('conj_но.html')).parse_all()
+        self.assertEqual('м 0', blocks[2][1].zaliznyak)
+
+    def testIndexAfterDash(self):
+        for (word, file_name, index) in [('делать', 'verb_ipf_делать.html', '1a'),
+                                         ('идти', 'verb_ipf_идти.html', '^b/b(9)'),
+                                         ('хороший', 'adj_sample_01.html', '4a/b'),
+                                         ('этот', 'demonstrative_pronoun_этот.html', '<1a>')]:
+            self.assertEqual(index, RuWikitionary.from_bytes(word, load_sample(file_name)).parse().zaliznyak)
+
+    def testExtractKeepsIndex(self):
+        (pos, noun) = RuWikitionary.from_bytes('магазин', load_sample('noun_masculine_магазин.html')).extract()
+        self.assertEqual('м 1a', noun.zaliznyak)
+
+    def testParagraphWithoutIndex(self):
+        self.assertIsNone(zaliznyak_index('предлог'))
+
+
+class TestExtractReleasesTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.page = RuWikitionary.from_bytes('делать', load_sample('verb_ipf_делать.html'))
+        (self.pos, self.verb) = self.page.extract()
+
+    def testExtractReturnsGrammarObject(self):
+        self.assertEqual(SpeechPart.VERB, self.pos)
+        self.assertEqual('де́лаю', self.verb.present.singular.p1)
+
+    def testPartOfSpeechOutlivesTree(self):
+        self.assertEqual(SpeechPart.VERB, self.page.pos)
+
+    def testPageDropsContent(self):
+        self.assertIsNone(self.page.tree)
+        self.assertIsNone(self.page.data)
+
+    def testFormsArePlainStrings(self):
+        self.assertTrue(all(type(form) is str for (form, code) in self.verb.inflection_code_list))
+
+    def testReleasedPageIsNotFetchedAgain(self):
+        with mock.patch('ruwiktionary.urlopen') as urlopen:
+            with self.assertRaises(ValueError):
+                self.page.root_tree
+            with self.assertRaises(ValueError):
+                self.page.parse_all()
+        urlopen.assert_not_called()
+
+
+class TestUpstreamFetch(unittest.TestCase):
+    def fetch(self, stub: StubWiktionary, word: str, timeout: float = 5.0):
+        page = RuWikitionary(word, False)
+        page.base_url = stub.base_url
+        page.timeout = timeout
+        return page.extract()
+
+    def testPageIsFetched(self):
+        with StubWiktionary() as stub:
+            (pos, noun) = self.fetch(stub, 'кошка')
+        self.assertEqual(SpeechPart.NOUN, pos)
+        self.assertEqual('ко́шки', noun.genitive.singular[0])
+
+    def testMissingPageIsNotFound(self):
+        with StubWiktionary() as stub:
+            self.assertEqual((None, None), self.fetch(stub, 'нетслова'))
+
+    def testErrorStatusIsUpstreamError(self):
+        for status in (429, 503):
+            with StubWiktionary(status=status) as stub:
+                with self.assertRaises(UpstreamError) as context:
+                    self.fetch(stub, 'кошка')
+            self.assertEqual(status, context.exception.reason.code)
+            self.assertFalse(context.exception.timed_out)
+
+    def testSlowUpstreamTimesOut(self):
+        with StubWiktionary(delay=1.0) as stub:
+            with self.assertRaises(UpstreamError) as context:
+                self.fetch(stub, 'кошка', timeout=0.2)
+        self.assertTrue(context.exception.timed_out)
+
+    def testUnreachableUpstream(self):
+        with StubWiktionary() as stub:
+            pass
+        with self.assertRaises(UpstreamError) as context:
+            self.fetch(stub, 'кошка')
+        self.assertFalse(context.exception.timed_out)
@@ -0,0 +1,289 @@
+import unittest
+import gzip
+import json
+import urllib.parse
+from main import app
+from service import *
+from ruwiktionary import RuWikitionary
+from lexicon import *
+from tests import StubWiktionary
+from tests.test_lexicon import LexiconTestCase
+
+
+class ServerTestCase(LexiconTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        app.config['LEXICON'] = cls.lexicon
+        cls.client = app.test_client()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        app.config['LEXICON'] = None
+        super().tearDownClass()
+
+    def get_json(self, path: str, word: str, **kwargs):
+        response = self.client.get(f'{path}/{urllib.parse.quote(word)}', **kwargs)
+        return response.get_json()
+
+
+class TestFormsFromLexicon(ServerTestCase):
+    def testLemma(self):
+        output = self.get_json('/forms', 'собака')
+        self.assertEqual('NOUN', output['pos'])
+        self.assertIn({'code': 4, 'form': 'соба́к', 'desc': 'noun, genitive plural'}, output['forms'])
+        self.assertNotIn('lemma', output)
+
+    def testInflectedForm(self):
+        output = self.get_json('/forms', 'сде́лал')
+        self.assertEqual('сделать', output['lemma'])
+        self.assertEqual('VERB', output['pos'])
+
+    def testUnstressedForm(self):
+        output = self.get_json('/forms', 'собаки')
+        self.assertEqual('собака', output['lemma'])
+        self.assertIn({'code': 4, 'form': 'соба́к', 'desc': 'noun, genitive plural'}, output['forms'])
+
+    def testUninflectedWord(self):
+        output = self.get_json('/forms', 'к')
+        self.assertEqual({'inp': 'к', 'pos': 'ADP'}, output)
+
+
+    def testCodeFilters(self):
+        output = self.get_json('/forms', 'собака', query_string={'codes': '4,1'})
+        self.assertEqual([1, 4], sorted(form['code'] for form in output['forms']))
+        output = self.get_json('/forms', 'но', query_string={'pos': 'NOUN', 'code': '1'})
+        self.assertEqual('NOUN', output['pos'])
+
+    def testUDFeatures(self):
+        output = self.get_json('/forms', 'собака', query_string={'code': '4', 'features': 'ud'})
+        self.assertEqual([{'code': 4, 'form': 'соба́к', 'desc': 'noun, genitive plural',
+                           'feats': 'Case=Gen|Number=Plur'}], output['forms'])
+        self.assertNotIn('feats', self.get_json('/forms', 'собака')['forms'][0])
+        self.assertEqual(400, self.client.get('/forms/%D0%BA?features=xpos').status_code)
+
+    def testBadFilter(self):
+        response = self.client.get('/forms/%D1%81%D0%BE%D0%B1%D0%B0%D0%BA%D0%B0?code=abc')
+        self.assertEqual(400, response.status_code)
+
+
+class TestSuggestEndpoint(ServerTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        app.config['FUZZY_INDEX'] = SymmetricDeleteIndex.from_lexicon(cls.lexicon)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        app.config.pop('FUZZY_INDEX')
+        super().tearDownClass()
+
+    def testSuggestions(self):
+        output = self.get_json('/suggest', 'сабаки', query_string={'limit': '1'})
+        self.assertEqual([{'form': 'соба́ки', 'lemma': 'собака', 'distance': 1}], output['suggestions'])
+
+    def testBadDistance(self):
+        self.assertEqual(400, self.client.get('/suggest/%D0%B0?distance=x').status_code)
+
+
+class TestSuggestEndpointOff(ServerTestCase):
+    def testNotLoaded(self):
+        response = self.client.get('/suggest/%D0%B0')
+        self.assertEqual(404, response.status_code)
+        self.assertEqual(SUGGESTIONS_NOT_LOADED, response.get_json()['error'])
+
+
+class TestEndingsEndpoint(ServerTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        app.config['SUFFIX_INDEX'] = SuffixIndex(cls.lexicon)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        app.config['SUFFIX_INDEX'] = None
+        super().tearDownClass()
+
+    def testEndings(self):
+        output = self.get_json('/endings', 'ками', query_string={'pos': 'NOUN', 'limit': '1'})
+        self.assertEqual(4, output['count'])
+        self.assertEqual([{'form': 'соба́ками', 'lemma': 'собака', 'pos': 'NOUN', 'code': 11}], output['forms'])
+
+    def testCodeFilter(self):
+        output = self.get_json('/endings', 'к', query_string={'code': '4'})
+        self.assertEqual({4}, {form['code'] for form in output['forms']})
+
+    def testBadLimit(self):
+        self.assertEqual(400, self.client.get('/endings/%D0%B0?limit=-1').status_code)
+
+    def testWithoutLexicon(self):
+        app.config['SUFFIX_INDEX'] = None
+        try:
+            self.assertEqual(404, self.client.get('/endings/%D0%B0').status_code)
+        finally:
+            app.config['SUFFIX_INDEX'] = SuffixIndex(self.lexicon)
+
+
+class TestCompleteEndpoint(ServerTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        app.config['COMPLETION_TRIE'] = CompletionTrie.from_lexicon(cls.lexicon, {'кошка': 10})
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        app.config['COMPLETION_TRIE'] = None
+        super().tearDownClass()
+
+    def testCompletions(self):
+        output = self.get_json('/complete', 'К', query_string={'limit': '2'})
+        self.assertEqual({'inp': 'К', 'completions': ['кошка', 'к']}, output)
+
+    def testBadLimit(self):
+        self.assertEqual(400, self.client.get('/complete/%D0%BA?limit=x').status_code)
+
+
+class TestInflectEndpoint(ServerTestCase):
+    def testInflect(self):
+        requests = [{'lemma': 'собака', 'features': {'Case': 'Ins', 'Number': 'Sing'}},
+                    {'lemma': 'кошка', 'code': '4'}, {'lemma': 'нетслова', 'code': 1}]
+        response = self.client.post('/inflect', json=requests)
+        self.assertEqual({'results': [
+            {'lemma': 'собака', 'features': {'Case': 'Ins', 'Number': 'Sing'}, 'forms': ['соба́кой', 'соба́кою']},
+            {'lemma': 'кошка', 'code': 4, 'forms': ['ко́шек']},
+            {'lemma': 'нетслова', 'code': 1, 'forms': []}]}, response.get_json())
+
+    def testBadRequests(self):
+        for payload in ({'lemma': 'кошка'}, [{'lemma': 'кошка'}], [{'code': 4}],
+                        [{'lemma': 'кошка', 'code': 4, 'features': 'Case=Gen'}], [{'lemma': 'кошка', 'code': 9999}],
+                        [{'lemma': 'кошка', 'features': 'Case=Bad'}], [{'lemma': 'кошка', 'code': 'Case=Gen'}]):
+            self.assertEqual(400, self.client.post('/inflect', json=payload).status_code, payload)
+        self.assertEqual(400, self.client.post('/inflect', data='[').status_code)
+
+    def testGetIsNotAllowed(self):
+        self.assertEqual(405, self.client.get('/inflect').status_code)
+
+
+class TestExportEndpoint(ServerTestCase):
+    def testNdjson(self):
+        response = self.client.get('/export?limit=3')
+        self.assertEqual('application/x-ndjson', response.mimetype)
+        lines = response.data.decode('utf-8').splitlines()
+        self.assertEqual([1, 2, 3], [json.loads(line)['cursor'] for line in lines])
+
+    def testGzip(self):
+        response = self.client.get('/export?cursor=2', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual('gzip', response.headers['Content-Encoding'])
+        records = [json.loads(line) for line in gzip.decompress(response.data).decode('utf-8').splitlines()]
+        self.assertEqual(len(self.lexicon) - 2, len(records))
+
+    def testBadCursor(self):
+        self.assertEqual(400, self.client.get('/export?cursor=abc').status_code)
+
+
+class TestConditionalGet(ServerTestCase):
+    forms_path = '/forms/%D1%81%D0%BE%D0%B1%D0%B0%D0%BA%D0%B0'
+
+    def testCachingHeaders(self):
+        response = self.client.get(self.forms_path)
+        self.assertEqual(etag_for(response.get_json()), response.headers['ETag'])
+        self.assertEqual(f'public, max-age={MAX_AGE}', response.headers['Cache-Control'])
+        self.assertEqual(int(self.lexicon.modified), response.last_modified.timestamp())
+
+    def testMatchingETagIsNotModified(self):
+        etag = self.client.get(self.forms_path).headers['ETag']
+        response = self.client.get(self.forms_path, headers={'If-None-Match': etag})
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b'', response.data)
+        self.assertEqual(etag, response.headers['ETag'])
+
+    def testStaleETagGetsTheBody(self):
+        response = self.client.get(self.forms_path, headers={'If-None-Match': '"stale"'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('NOUN', response.get_json()['pos'])
+
+
+class TestFormsFromUpstream(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.client = app.test_client()
+
+    def setUp(self) -> None:
+        self.upstream = (RuWikitionary.base_url, RuWikitionary.timeout)
+        RuWikitionary.timeout = 0.2
+
+    def tearDown(self) -> None:
+        (RuWikitionary.base_url, RuWikitionary.timeout) = self.upstream
+
+    def get(self, word: str):
+        return self.client.get(f'/forms/{urllib.parse.quote(word)}')
+
+    def testFetchedWord(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            output = self.get('кошка').get_json()
+        self.assertEqual('NOUN', output['pos'])
+        self.assertIn({'code': 1, 'form': 'ко́шка', 'desc': 'noun, nominative singular'}, output['forms'])
+
+    def testFetchedWordIsNotIndexedWithoutSuggestions(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            self.get('кошка')
+        self.assertIsNone(app.config.get('FUZZY_INDEX'))
+
+    def testUnknownWord(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            response = self.get('нетслова')
+        self.assertEqual(200, response.status_code)
+        self.assertIn('error', response.get_json())
+
+    def testUpstreamTimeout(self):
+        with StubWiktionary(delay=1.0) as stub:
+            RuWikitionary.base_url = stub.base_url
+            response = self.get('кошка')
+        self.assertEqual(504, response.status_code)
+        self.assertEqual('кошка', response.get_json()['inp'])
+
+    def testUpstreamUnavailable(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+        response = self.get('кошка')
+        self.assertEqual(502, response.status_code)
+        self.assertEqual('no-store', response.headers['Cache-Control'])
+
+    def testUpstreamErrorStatusIsNotNotFound(self):
+        with StubWiktionary(status=503) as stub:
+            RuWikitionary.base_url = stub.base_url
+            response = self.get('кошка')
+        self.assertEqual(502, response.status_code)
+        self.assertEqual('no-store', response.headers['Cache-Control'])
+        self.assertNotIn('ETag', response.headers)
+
+
+class TestStats(unittest.TestCase):
+    def tearDown(self) -> None:
+        app.config['CACHE'] = None
+
+    def testExportWithoutLexicon(self):
+        self.assertEqual(404, app.test_client().get('/export').status_code)
+
+    def testStatsWithoutCache(self):
+        stats = app.test_client().get('/stats').get_json()
+        self.assertIsNone(stats['cache'])
+        self.assertEqual(0, stats['flights']['in_flight'])
+
+    def testCacheCounters(self):
+        app.config['CACHE'] = ResponseCache()
+        client = app.test_client()
+        upstream = RuWikitionary.base_url
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            try:
+                for _ in range(3):
+                    client.get('/forms/%D0%BA%D0%BE%D1%88%D0%BA%D0%B0')
+            finally:
+                RuWikitionary.base_url = upstream
+        stats = client.get('/stats').get_json()['cache']
+        self.assertEqual((1, 2, 1), (stats['entries'], stats['hits'], stats['misses']))
+        self.assertEqual(1, stub.requests)
@@ -0,0 +1,255 @@
+import unittest
+import gzip
+import json
+from unittest import mock
+from service import *
+from tests import StubWiktionary
+from tests.test_lexicon import LexiconTestCase
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.cache = ResponseCache(max_entries=2, ttl=100, negative_ttl=10, error_ttl=1, clock=self.clock)
+
+    def testHitAndMiss(self):
+        self.assertIsNone(self.cache.get('кошка'))
+        self.cache.put('кошка', {'inp': 'кошка', 'pos': 'NOUN'}, 200)
+        self.assertEqual(({'inp': 'кошка', 'pos': 'NOUN'}, 200), self.cache.get('кошка')[:2])
+        stats = self.cache.stats()
+        self.assertEqual((1, 1, 0.5), (stats['hits'], stats['misses'], stats['hit_ratio']))
+
+    def testTTLsByOutcome(self):
+        found = self.cache.put('кошка', {'inp': 'кошка', 'pos': 'NOUN'}, 200)
+        not_found = self.cache.put('кошкаа', not_found_output('кошкаа'), 200)
+        failed = self.cache.put('собака', {'inp': 'собака', 'error': 'Wiktionary timed out'}, 504)
+        self.assertEqual([100, 10, 1], [c.expires - c.stored for c in [found, not_found, failed]])
+
+    def testExpiredEntryIsAMiss(self):
+        self.cache.put('кошка', not_found_output('кошка'), 200)
+        self.clock.now += 9
+        self.assertIsNotNone(self.cache.get('кошка'))
+        self.clock.now += 1
+        self.assertIsNone(self.cache.get('кошка'))
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(1, self.cache.stats()['expirations'])
+
+    def testLeastRecentlyUsedIsEvicted(self):
+        self.cache.put('кошка', {}, 200)
+        self.cache.put('собака', {}, 200)
+        self.cache.get('кошка')
+        self.cache.put('магазин', {}, 200)
+        self.assertIsNone(self.cache.get('собака'))
+        self.assertIsNotNone(self.cache.get('кошка'))
+        self.assertEqual(1, self.cache.stats()['evictions'])
+
+    def testZeroSizeStoresNothing(self):
+        cache = ResponseCache(max_entries=0)
+        cache.put('кошка', {}, 200)
+        self.assertEqual(0, len(cache))
+
+    def testRequestKey(self):
+        self.assertEqual('ёж', request_key(' ёж\n'))
+
+
+class TestCachedWordOutput(unittest.TestCase):
+    def setUp(self) -> None:
+        self.upstream = (RuWikitionary.base_url, RuWikitionary.timeout)
+        RuWikitionary.timeout = 0.5
+        self.cache = ResponseCache()
+
+    def tearDown(self) -> None:
+        (RuWikitionary.base_url, RuWikitionary.timeout) = self.upstream
+
+    def testRepeatedLookupIsServedFromCache(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            first = word_output('кошка', cache=self.cache)
+            second = word_output(' кошка ', cache=self.cache)
+        self.assertEqual(1, stub.requests)
+        self.assertEqual(first, second)
+        self.assertEqual('кошка', second[0]['inp'])
+
+    def testNotFoundIsCached(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            word_output('нетслова', cache=self.cache)
+            (w_output, status, modified) = word_output('нетслова', cache=self.cache)
+        self.assertEqual(1, stub.requests)
+        self.assertEqual(NOT_FOUND_ERROR, w_output['error'])
+
+    def testUpstreamErrorIsCachedBriefly(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+        self.assertEqual(502, word_output('кошка', cache=self.cache)[1])
+        self.assertEqual(self.cache.error_ttl, self.cache.get('кошка').expires - self.cache.get('кошка').stored)
+
+
+    def testStressedInputSharesTheFetch(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            word_output('ко́шка', cache=self.cache)
+            (w_output, status, modified) = word_output('кошка', cache=self.cache)
+        self.assertEqual(1, stub.requests)
+        self.assertEqual('NOUN', w_output['pos'])
+
+    def testFetchedWordIsLearned(self):
+        index = SymmetricDeleteIndex()
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            word_output('кошка', index=index)
+            word_output('нетслова', index=index)
+        self.assertEqual('кошка', suggest_output(index, 'кошька', {})['suggestions'][0]['lemma'])
+        self.assertEqual([], suggest_output(index, 'нетслова', {'distance': '1'})['suggestions'])
+
+    def testFiltersApplyToTheCachedAnswer(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            (w_output, status, modified) = word_output('кошка', cache=self.cache, codes=frozenset({4}))
+            (full, status, modified) = word_output('кошка', cache=self.cache)
+        self.assertEqual(1, stub.requests)
+        self.assertEqual([4], [form['code'] for form in w_output['forms']])
+        self.assertGreater(len(full['forms']), 1)
+
+    def testWrongPartOfSpeech(self):
+        with StubWiktionary() as stub:
+            RuWikitionary.base_url = stub.base_url
+            (w_output, status, modified) = word_output('кошка', cache=self.cache, upos='VERB')
+        self.assertEqual({'inp': 'кошка', 'error': 'Not found as VERB'}, w_output)
+
+
+class TestFormsFilters(LexiconTestCase):
+    def testArguments(self):
+        self.assertEqual((None, None), forms_arguments({}))
+        self.assertEqual((frozenset({4}), None), forms_arguments({'code': '4'}))
+        self.assertEqual((frozenset({1, 4, 5}), 'NOUN'), forms_arguments({'code': '5', 'codes': '1, 4', 'pos': 'noun'}))
+        for args in [{'code': 'x'}, {'codes': '1,9999'}, {'pos': 'NOPE'}]:
+            with self.assertRaises(ValueError):
+                forms_arguments(args)
+
+    def testLexiconReadsOnlyTheAskedForCodes(self):
+        w_output = lexicon_output(self.lexicon, 'собака', frozenset({4}))
+        self.assertEqual([{'code': 4, 'form': 'соба́к', 'desc': 'noun, genitive plural'}], w_output['forms'])
+
+    def testLexiconHomographByPartOfSpeech(self):
+        self.assertEqual('CCONJ', lexicon_output(self.lexicon, 'но')['pos'])
+        self.assertEqual('NOUN', lexicon_output(self.lexicon, 'но', upos='NOUN')['pos'])
+        self.assertIn('error', lexicon_output(self.lexicon, 'но', upos='VERB'))
+
+    def testUninflectedWordWithCodes(self):
+        self.assertEqual([], lexicon_output(self.lexicon, 'к', frozenset({1}))['forms'])
+
+    def testFilterOutputLeavesErrorsAlone(self):
+        not_found = not_found_output('кошкаа')
+        self.assertEqual(not_found, filter_output(not_found, frozenset({1}), 'NOUN'))
+
+
+class TestCachingHeaders(unittest.TestCase):
+    def setUp(self) -> None:
+        self.payload = {'inp': 'к', 'pos': 'ADP'}
+        self.headers = caching_headers(self.payload, 200, 1700000000.0, max_age=60, negative_max_age=5)
+
+    def testFoundWord(self):
+        self.assertEqual('public, max-age=60', self.headers['Cache-Control'])
+        self.assertEqual('Tue, 14 Nov 2023 22:13:20 GMT', self.headers['Last-Modified'])
+
+    def testETagIgnoresKeyOrder(self):
+        self.assertEqual(self.headers['ETag'], etag_for({'pos': 'ADP', 'inp': 'к'}))
+        self.assertNotEqual(self.headers['ETag'], etag_for({'inp': 'к', 'pos': 'SCONJ'}))
+
+    def testNotFound(self):
+        headers = caching_headers(not_found_output('кк'), 200, 1700000000.0, max_age=60, negative_max_age=5)
+        self.assertEqual('public, max-age=5', headers['Cache-Control'])
+
+    def testUpstreamFailureIsNotStored(self):
+        headers = caching_headers({'inp': 'к', 'error': 'Wiktionary timed out'}, 504, 1700000000.0)
+        self.assertEqual({'Cache-Control': 'no-store'}, headers)
+        self.assertFalse(not_modified(headers, '*', None))
+
+    def testIfNoneMatch(self):
+        etag = self.headers['ETag']
+        self.assertTrue(not_modified(self.headers, etag, None))
+        self.assertTrue(not_modified(self.headers, f'"other", W/{etag}', None))
+        self.assertTrue(not_modified(self.headers, '*', None))
+        self.assertFalse(not_modified(self.headers, '"other"', None))
+        self.assertFalse(not_modified(self.headers, None, None))
+
+    def testIfNoneMatchTakesPrecedence(self):
+        self.assertFalse(not_modified(self.headers, '"other"', self.headers['Last-Modified']))
+
+    def testIfModifiedSince(self):
+        self.assertTrue(not_modified(self.headers, None, 'Tue, 14 Nov 2023 22:13:20 GMT'))
+        self.assertFalse(not_modified(self.headers, None, 'Tue, 14 Nov 2023 22:13:19 GMT'))
+        self.assertFalse(not_modified(self.headers, None, 'yesterday'))
+
+
+class TestExport(LexiconTestCase):
+    def records(self, chunks) -> list:
+        return [json.loads(line) for line in b''.join(chunks).decode('utf-8').splitlines()]
+
+    def testEveryEntryIsExported(self):
+        records = self.records(export_chunks(self.lexicon))
+        self.assertEqual(len(self.lexicon), len(records))
+        self.assertEqual(list(range(1, len(self.lexicon) + 1)), [r['cursor'] for r in records])
+        entry = self.lexicon.entry(0)
+        self.assertEqual(entry.lemma, records[0]['lemma'])
+        self.assertEqual([{'code': code, 'form': form} for (form, code) in entry.forms], records[0]['forms'])
+
+    def testResumeFromCursor(self):
+        first = self.records(export_chunks(self.lexicon, limit=5))
+        rest = self.records(export_chunks(self.lexicon, cursor=first[-1]['cursor']))
+        self.assertEqual(self.records(export_chunks(self.lexicon)), first + rest)
+
+    def testChunks(self):
+        with mock.patch('service.EXPORT_CHUNK_LINES', 4):
+            chunks = list(export_chunks(self.lexicon))
+        self.assertEqual((len(self.lexicon) + 3) // 4, len(chunks))
+        self.assertEqual(4, chunks[0].count(b'\n'))
+
+    def testGzip(self):
+        with mock.patch('service.EXPORT_CHUNK_LINES', 4):
+            compressed = b''.join(export_chunks(self.lexicon, compress=True))
+        self.assertEqual(b''.join(export_chunks(self.lexicon)), gzip.decompress(compressed))
+
+    def testCursorPastTheEnd(self):
+        self.assertEqual([], list(export_chunks(self.lexicon, cursor=len(self.lexicon))))
+
+    def testCompactLinesExpandToTheEntries(self):
+        records = self.records(export_chunks(self.lexicon, compact=True))
+        self.assertEqual(len(self.lexicon), len(records))
+        for (entry, record) in zip(self.lexicon, records):
+            self.assertEqual(entry.forms, expand_record(record), entry.lemma)
+            self.assertEqual(entry.zaliznyak, record['index'])
+
+    def testCompactLinesOmitRegularForms(self):
+        records = self.records(export_chunks(self.lexicon, compact=True))
+        regular = [(r['lemma'], r['index'], r['stressed']) for r in records if 'stressed' in r and not r['forms']]
+        self.assertIn(('кошка', 'жо 3*a', 'ко́шка'), regular)
+        self.assertIn(('магазин', 'м 1a', 'магази́н'), regular)
+        self.assertNotIn('stressed', [r for r in records if r['lemma'] == 'свой'][0])
+        self.assertLess(sum(map(len, export_chunks(self.lexicon, compact=True))),
+                        sum(map(len, export_chunks(self.lexicon))))
+
+    def testArguments(self):
+        self.assertEqual((0, None), export_arguments({}))
+        self.assertEqual((7, 3), export_arguments({'cursor': '7', 'limit': '3'}))
+        for args in [{'cursor': 'x'}, {'cursor': '-1'}, {'limit': '-5'}]:
+            with self.assertRaises(ValueError):
+                export_arguments(args)
+        self.assertTrue(export_compact({'compact': '1'}))
+        self.assertFalse(export_compact({}))
+
+    def testAcceptsGzip(self):
+        self.assertTrue(accepts_gzip('gzip, deflate, br'))
+        self.assertTrue(accepts_gzip('br;q=1.0, gzip;q=0.8'))
+        self.assertFalse(accepts_gzip('gzip;q=0'))
+        self.assertFalse(accepts_gzip('identity'))
+        self.assertFalse(accepts_gzip(None))
@@ -0,0 +1,110 @@
+import unittest
+import os
+import signal
+import socket
+import threading
+import time
+import urllib.request
+from serving import *
+
+
+def slow_app(environ, start_response):
+    time.sleep(float(environ.get('QUERY_STRING') or 0))
+    body = str(os.getpid()).encode('ascii')
+    start_response('200 OK', [('Content-Type', 'text/plain'), ('Content-Length', str(len(body)))])
+    return [body]
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'prefork serving needs os.fork')
+class TestPreforkServer(unittest.TestCase):
+    def setUp(self) -> None:
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            self.port = probe.getsockname()[1]
+        self.pid = os.fork()
+        if self.pid == 0:
+            try:
+                serve(slow_app, '127.0.0.1', self.port, workers=2)
+            finally:
+                os._exit(0)
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def tearDown(self) -> None:
+        if self.pid:
+            # a failed test may leave workers that outlive a killed server
+            orphans = self.workers() if os.path.isdir('/proc/self') else set()
+            os.kill(self.pid, signal.SIGKILL)
+            for orphan in orphans:
+                try:
+                    os.kill(orphan, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            os.waitpid(self.pid, 0)
+
+    def get(self, query: str = '') -> bytes:
+        with urllib.request.urlopen(f'http://127.0.0.1:{self.port}/?{query}', timeout=5) as response:
+            return response.read()
+
+    def workers(self) -> set:
+        # the pids whose parent is the server, from their /proc/PID/stat
+        pids = set()
+        for entry in os.listdir('/proc'):
+            try:
+                with open(f'/proc/{entry}/stat') as stat:
+                    fields = stat.read().rsplit(')', 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            if int(fields[1]) == self.pid and fields[0] != 'Z':
+                pids.add(int(entry))
+        return pids
+
+    def stop(self) -> int:
+        os.kill(self.pid, signal.SIGTERM)
+        (pid, status) = os.waitpid(self.pid, 0)
+        self.pid = 0
+        return status
+
+    def testRequestsAreServedByWorkers(self):
+        worker = int(self.get())
+        self.assertNotEqual(self.pid, worker)
+        self.assertEqual(0, self.stop())
+
+    def testShutdownFinishesRequestsInFlight(self):
+        results = []
+        client = threading.Thread(target=lambda: results.append(self.get('0.5')))
+        client.start()
+        time.sleep(0.2)
+        self.assertEqual(0, self.stop())
+        client.join()
+        self.assertEqual(1, len(results))
+        with self.assertRaises(OSError):
+            socket.create_connection(('127.0.0.1', self.port), timeout=1)
+
+    @unittest.skipUnless(os.path.isdir('/proc/self'), 'finding the workers needs /proc')
+    def testKilledWorkerIsReplaced(self):
+        deadline = time.monotonic() + 5
+        while len(self.workers()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        before = self.workers()
+        self.assertEqual(2, len(before))
+        killed = before.pop()
+        os.kill(killed, signal.SIGKILL)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            after = self.workers()
+            if len(after) == 2 and killed not in after:
+                break
+            time.sleep(0.05)
+        self.assertEqual(2, len(after))
+        self.assertIn(before.pop(), after)
+        self.assertNotIn(killed, after)
+        self.assertTrue(self.get())
+        self.assertEqual(0, self.stop())
@@ -0,0 +1,111 @@
+import unittest
+import asyncio
+import threading
+import time
+from singleflight import *
+from service import *
+from tests import StubWiktionary
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self) -> None:
+        self.flights = SingleFlight()
+        self.calls = 0
+
+    def slow(self, value):
+        self.calls += 1
+        time.sleep(0.2)
+        return value
+
+    def failing(self):
+        self.calls += 1
+        time.sleep(0.2)
+        raise ValueError('upstream')
+
+    def run_concurrently(self, count: int, target) -> list:
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def testConcurrentCallsShareOneCall(self):
+        results = self.run_concurrently(10, lambda: self.flights.do('кошка', self.slow, 'кошки'))
+        self.assertEqual(['кошки'] * 10, results)
+        self.assertEqual(1, self.calls)
+        self.assertEqual(9, self.flights.shared)
+        self.assertEqual({}, self.flights.flights)
+
+    def testExceptionReachesEveryCaller(self):
+        def call():
+            try:
+                return self.flights.do('кошка', self.failing)
+            except ValueError as e:
+                return str(e)
+        self.assertEqual(['upstream'] * 5, self.run_concurrently(5, call))
+        self.assertEqual(1, self.calls)
+
+    def testKeysAreIndependent(self):
+        results = self.run_concurrently(1, lambda: self.flights.do('кошка', self.slow, 1)) + \
+            self.run_concurrently(1, lambda: self.flights.do('собака', self.slow, 2))
+        self.assertEqual([1, 2], results)
+        self.assertEqual(2, self.calls)
+
+    def testLaterCallsRunAgain(self):
+        self.flights.do('кошка', self.slow, 1)
+        self.flights.do('кошка', self.slow, 1)
+        self.assertEqual(2, self.calls)
+
+
+class TestAsyncSingleFlight(unittest.TestCase):
+    def setUp(self) -> None:
+        self.flights = AsyncSingleFlight()
+        self.calls = 0
+
+    async def slow(self, value):
+        self.calls += 1
+        await asyncio.sleep(0.1)
+        return value
+
+    def testConcurrentCallsShareOneCall(self):
+        async def run():
+            return await asyncio.gather(*[self.flights.do('кошка', self.slow, 'кошки') for _ in range(10)])
+        self.assertEqual(['кошки'] * 10, asyncio.run(run()))
+        self.assertEqual(1, self.calls)
+        self.assertEqual(9, self.flights.shared)
+        self.assertEqual({}, self.flights.flights)
+
+    def testCancelledCallerDoesNotCancelTheCall(self):
+        async def run():
+            first = asyncio.ensure_future(self.flights.do('кошка', self.slow, 'кошки'))
+            second = asyncio.ensure_future(self.flights.do('кошка', self.slow, 'кошки'))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+        self.assertEqual('кошки', asyncio.run(run()))
+        self.assertEqual(1, self.calls)
+
+
+class TestCoalescedWordOutput(unittest.TestCase):
+    def setUp(self) -> None:
+        self.upstream = (RuWikitionary.base_url, RuWikitionary.timeout)
+        RuWikitionary.timeout = 5
+
+    def tearDown(self) -> None:
+        (RuWikitionary.base_url, RuWikitionary.timeout) = self.upstream
+
+    def testConcurrentRequestsFetchOnce(self):
+        (flights, outputs) = (SingleFlight(), [])
+        with StubWiktionary(delay=0.3) as stub:
+            RuWikitionary.base_url = stub.base_url
+            threads = [threading.Thread(target=lambda: outputs.append(word_output('кошка', flights=flights)))
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(1, stub.requests)
+        self.assertEqual(8, len(outputs))
+        self.assertTrue(all(output == outputs[0] for output in outputs))
@@ -0,0 +1,87 @@
+import unittest
+from ruwiktionary import *
+from stringpool import *
+from tests import load_sample
+
+
+class TestVarint(unittest.TestCase):
+    def roundTrip(self, value):
+        buffer = bytearray()
+        write_varint(buffer, value)
+        self.assertEqual((value, len(buffer)), read_varint(buffer, 0))
+        return buffer
+
+    def testSmallValueIsOneByte(self):
+        self.assertEqual(1, len(self.roundTrip(127)))
+
+    def testLargeValues(self):
+        self.assertEqual(2, len(self.roundTrip(128)))
+        self.roundTrip(2 ** 40 + 5)
+
+    def testTruncatedVarintRaises(self):
+        with self.assertRaises(ValueError):
+            read_varint(self.roundTrip(2 ** 40)[:-1], 0)
+
+
+class TestStringPool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pool = StringPool()
+
+    def testIdsAreDense(self):
+        self.assertEqual(0, self.pool.id_for('кошка'))
+        self.assertEqual(1, self.pool.id_for('кошки'))
+        self.assertEqual(0, self.pool.id_for('кошка'))
+        self.assertEqual(2, len(self.pool))
+
+    def testInternReturnsCanonicalObject(self):
+        first = self.pool.intern(''.join(['кош', 'ки']))
+        self.assertIs(first, self.pool.intern(''.join(['кошк', 'и'])))
+
+    def testInternPassesNone(self):
+        self.assertIsNone(self.pool.intern(None))
+        self.assertEqual(0, len(self.pool))
+
+    def testSerializationRoundTrip(self):
+        for text in ['ко́шка', 'ко́шки', '', 'буду делать']:
+            self.pool.id_for(text)
+        data = b'header' + self.pool.to_bytes()
+        (pool, offset) = StringPool.from_bytes(data, len(b'header'))
+        self.assertEqual(self.pool.strings, pool.strings)
+        self.assertEqual(len(data), offset)
+        self.assertEqual(3, pool.id_for('буду делать'))
+
+
+class TestParsersInternForms(unittest.TestCase):
+    def testRepeatedFormsAreOneObject(self):
+        noun = RuWikitionary.from_bytes('кошка', load_sample('noun_feminine_кошка.html')).parse_all()[1][1]
+        self.assertIs(noun.genitive.singular[0], noun.nominative.plural[0])
+        self.assertIs(noun.nominative.plural[0], noun.accusative.plural[0])
+
+    def testFormsAreInEnclosingPool(self):
+        with form_pool() as pool:
+            adjective = RuWikitionary.from_bytes('хороший', load_sample('adj_sample_01.html')).parse()
+            self.assertIn(adjective.genitive.masculine, pool)
+            self.assertIs(adjective.genitive.masculine, intern_form('хоро́шего'))
+
+
+class TestFormPoolScope(unittest.TestCase):
+    def testNothingIsInternedOutsideAPool(self):
+        text = ''.join(['zz', 'request'])
+        self.assertIs(text, intern_form(text))
+        self.assertIsNone(ACTIVE_POOL.get())
+
+    def testPagesDoNotGrowAPool(self):
+        with form_pool() as pool:
+            for idx in range(100):
+                RuWikitionary(f'zz{idx}')
+            self.assertEqual(0, len(pool))
+
+    def testParseDropsItsPool(self):
+        RuWikitionary.from_bytes('кошка', load_sample('noun_feminine_кошка.html')).parse()
+        self.assertIsNone(ACTIVE_POOL.get())
+
+    def testNestedBlocksShareThePool(self):
+        with form_pool() as outer:
+            with form_pool() as inner:
+                self.assertIs(outer, inner)
+            self.assertIs(outer, ACTIVE_POOL.get())
@@ -0,0 +1,52 @@
+import unittest
+from grammar import *
+from suffix import *
+from normalize import normalize_form
+from tests.test_lexicon import LexiconTestCase
+
+
+class TestSuffixIndex(LexiconTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.index = SuffixIndex(cls.lexicon)
+
+    def testEveryFormIsIndexed(self):
+        self.assertEqual(sum(len(entry.forms) or 1 for entry in self.entries), len(self.index))
+
+    def testEnding(self):
+        forms = {(ending.form, ending.lemma, ending.code) for ending in self.index.endings('ами')}
+        self.assertEqual({('соба́ками', 'собака', 11), ('ко́шками', 'кошка', 11), ('магази́нами', 'магазин', 11)},
+                         forms)
+
+    def testSameAsScan(self):
+        for suffix in ('а', 'ет', 'ой', 'о'):
+            expected = sorted((form, entry.lemma) for entry in self.entries
+                              for (form, code) in entry.forms or [(entry.lemma, None)]
+                              if normalize_form(form).endswith(suffix))
+            self.assertEqual(expected, sorted((e.form, e.lemma) for e in self.index.endings(suffix)), suffix)
+
+    def testReversedOrder(self):
+        keys = [reversed_key(ending.form) for ending in self.index.endings('и')]
+        self.assertEqual(sorted(keys), keys)
+
+    def testStressCaseAndYo(self):
+        self.assertEqual(self.index.endings('ами'), self.index.endings('А́МИ'))
+        self.assertEqual(self.index.count('ет'), self.index.count('ёт'))
+
+    def testUninflectedWord(self):
+        self.assertIn(Ending('но', 'но', SpeechPart.CONJUNCTION, None), self.index.endings('но'))
+
+    def testFilters(self):
+        self.assertEqual({4}, {ending.code for ending in self.index.endings('к', codes={4})})
+        self.assertEqual({SpeechPart.VERB}, {ending.pos for ending in self.index.endings('ет', upos='VERB')})
+        self.assertEqual(len(self.index.endings('ет', upos='VERB')), self.index.count('ет', upos='VERB'))
+
+    def testCursorAndLimit(self):
+        every = self.index.endings('и')
+        self.assertEqual(every[2:5], self.index.endings('и', cursor=2, limit=3))
+        self.assertEqual(len(every), self.index.count('и'))
+
+    def testUnknownEnding(self):
+        self.assertEqual([], self.index.endings('щщщ'))
+        self.assertEqual(0, self.index.count('щщщ'))
@@ -1,6 +1,7 @@
 import unittest
 from grammar import *
 from ruwiktionary import *
+from tests import load_sample
 
 
 class TestVerbTense(unittest.TestCase):
@@ -276,7 +277,7 @@ class TestPastAdverbialParticiple(TestVerbInflectionCodes):
 class TestParsePerfectiveVerb(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('отсидеть', True, 'verb_pf_отсидеть.html')
+        cls.page = RuWikitionary.from_bytes('отсидеть', load_sample('verb_pf_отсидеть.html'))
         cls.verb = cls.page.parse_verb()
 
     def testThatPageIsSet(self):
@@ -354,7 +355,7 @@ class TestParsePerfectiveVerb(unittest.TestCase):
 class TestParsePerfectiveVerbB(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('сделать', True, 'verb_pf_сделать.html')
+        cls.page = RuWikitionary.from_bytes('сделать', load_sample('verb_pf_сделать.html'))
         cls.verb = cls.page.parse_verb()
 
     def testThatPageIsSet(self):
@@ -432,7 +433,7 @@ class TestParsePerfectiveVerbB(unittest.TestCase):
 class TestParseImperfectiveVerbA(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('делать', True, 'verb_ipf_делать.html')
+        cls.page = RuWikitionary.from_bytes('делать', load_sample('verb_ipf_делать.html'))
         cls.verb = cls.page.parse_verb()
 
     def testThatPageIsSet(self):
@@ -518,7 +519,7 @@ class TestParseImperfectiveVerbA(unittest.TestCase):
 class TestParseImperfectiveVerbB(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('идти', True, 'verb_ipf_идти.html')
+        cls.page = RuWikitionary.from_bytes('идти', load_sample('verb_ipf_идти.html'))
         cls.verb = cls.page.parse_verb()
 
     def testThatPageIsSet(self):
@@ -610,7 +611,7 @@ class TestParseImperfectiveVerbB(unittest.TestCase):
 class TestParseImperfectiveVerbC(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.page = RuWikitionary('приглашать', True, 'verb_ipf_приглашать.html')
+        cls.page = RuWikitionary.from_bytes('приглашать', load_sample('verb_ipf_приглашать.html'))
         cls.verb = cls.page.parse_verb()
 
     def testThatPageIsSet(self):
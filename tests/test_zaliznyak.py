@@ -0,0 +1,171 @@
+import unittest
+from ruwiktionary import *
+from zaliznyak import *
+from tests import load_sample
+
+NOUN_SAMPLES = [('магазин', 'noun_masculine_магазин.html'), ('собака', 'noun_feminine_собака.html'),
+                ('кошка', 'noun_feminine_кошка.html'), ('дошкольница', 'noun_sample_01.html'),
+                ('отсутствие', 'noun_neuter_отсутствие.html'), ('но', 'conj_но.html')]
+ADJECTIVE_SAMPLES = [('хороший', 'adj_sample_01.html'), ('дурацкий', 'adj_sample_02.html')]
+
+
+def sample_words(samples, pos: SpeechPart):
+    words = []
+    for (word, file_name) in samples:
+        blocks = RuWikitionary.from_bytes(word, load_sample(file_name)).parse_all()
+        words.extend(parsed for (block_pos, parsed) in blocks if block_pos == pos)
+    return words
+
+
+def sample_nouns():
+    return sample_words(NOUN_SAMPLES, SpeechPart.NOUN)
+
+
+class TestGenerateSamples(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.nouns = sample_nouns()
+
+    def testEverySampleNounIsRegenerated(self):
+        self.assertEqual(8, len(self.nouns))
+        for noun in self.nouns:
+            lemma = noun.inflection_code_list[0][0]
+            self.assertEqual(noun.inflection_code_list, generate(lemma, noun.zaliznyak), noun.value)
+
+    def testCompressedSamplesHaveNoExceptions(self):
+        for noun in self.nouns:
+            self.assertEqual({}, compress_word(noun).exceptions, noun.value)
+
+    def testRoundTrip(self):
+        for noun in self.nouns:
+            self.assertEqual(noun.inflection_code_list, expand(compress_word(noun)))
+
+
+class TestGenerateAdjectiveSamples(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.adjectives = sample_words(ADJECTIVE_SAMPLES, SpeechPart.ADJECTIVE)
+
+    def testEverySampleAdjectiveIsRegenerated(self):
+        self.assertEqual(['4a/b', '3a✕~'], [adjective.zaliznyak for adjective in self.adjectives])
+        for adjective in self.adjectives:
+            forms = [(form, code) for (form, code) in adjective.inflection_code_list if form]
+            lemma = dict((code, form) for (form, code) in forms)[204]
+            self.assertEqual(forms, generate(lemma, adjective.zaliznyak, SpeechPart.ADJECTIVE), adjective.value)
+
+    def testCompressedSamplesHaveNoExceptions(self):
+        for adjective in self.adjectives:
+            paradigm = compress_word(adjective)
+            self.assertEqual(SpeechPart.ADJECTIVE, paradigm.pos)
+            self.assertEqual({}, paradigm.exceptions, adjective.value)
+
+    def testRoundTrip(self):
+        for adjective in self.adjectives:
+            forms = [(form, code) for (form, code) in adjective.inflection_code_list if form]
+            self.assertEqual(forms, expand(compress_word(adjective)))
+
+
+class TestGenerateRules(unittest.TestCase):
+    def forms(self, lemma: str, index: str):
+        return [form for (form, code) in generate(lemma, index)]
+
+    def testMasculineFleetingVowel(self):
+        self.assertEqual(['па́лец', 'па́льцы', 'па́льца', 'па́льцев'], self.forms('па́лец', 'м 5*a')[:4])
+        self.assertEqual('за́йца', self.forms('за́яц', 'мо 5*a')[6])
+
+    def testFeminineInsertedVowel(self):
+        self.assertEqual('ло́док', self.forms('ло́дка', 'ж 3*a')[3])
+        self.assertEqual('копе́ек', self.forms('копе́йка', 'ж 3*a')[3])
+        self.assertEqual('полоте́нец', self.forms('полоте́нце', 'с 5*a')[3])
+
+    def testAnimacyDecidesAccusative(self):
+        self.assertEqual(['това́рища', 'това́рищей'], self.forms('това́рищ', 'мо 4a')[6:8])
+        self.assertEqual(['жи́лище', 'жи́лища'], self.forms('жи́лище', 'с 4a')[6:8])
+
+    def testSoftStems(self):
+        self.assertEqual(['а́рмий', 'а́рмии'], self.forms('а́рмия', 'ж 7a')[3:5])
+        self.assertEqual(['тетра́дей', 'тетра́ди', 'тетра́дям'], self.forms('тетра́дь', 'ж 8a')[3:6])
+
+    def adjective(self, lemma: str, index: str):
+        return dict((code, form) for (form, code) in generate(lemma, index, SpeechPart.ADJECTIVE))
+
+    def testAdjectiveStemTypes(self):
+        self.assertEqual(('си́няя', 'си́нюю', 'си́него'),
+                         tuple(self.adjective('си́ний', '2a✕')[c] for c in (207, 210, 215)))
+        self.assertEqual(('ры́жая', 'ры́жего', 'ры́жее'),
+                         tuple(self.adjective('ры́жий', '4a')[c] for c in (207, 215, 214)))
+        self.assertEqual(('ку́цые', 'ку́цего'), tuple(self.adjective('ку́цый', '5a')[c] for c in (220, 215)))
+
+    def testShortFormStress(self):
+        short = (229, 230, 231, 232)
+        self.assertEqual(('у́мен', 'умна́', 'у́мно', 'у́мны'),
+                         tuple(self.adjective('у́мный', '1*a/c')[c] for c in short))
+        self.assertEqual(('красён', 'красна́', 'красно́', 'красны́'),
+                         tuple(self.adjective('кра́сный', '1*a/b')[c] for c in short))
+        self.assertEqual(('колю́ч', 'колю́ча', 'колю́че', 'колю́чи'),
+                         tuple(self.adjective('колю́чий', '4a/a')[c] for c in short))
+
+    def testNoShortForms(self):
+        self.assertFalse({229, 230, 231, 232} & set(self.adjective('си́ний', '2a✕')))
+
+    def testUnsupportedAdjectiveIndex(self):
+        for index in ['1b', '6a', '2*a', '1a/c\'', 'жо 3*a']:
+            with self.assertRaises(ValueError):
+                generate('но́вый', index, SpeechPart.ADJECTIVE)
+        with self.assertRaises(ValueError):
+            generate('но́вый', '1a', SpeechPart.VERB)
+
+    def testNounEndings(self):
+        endings = noun_endings('жо 3*a')
+        self.assertEqual(('',), endings[4])
+        self.assertEqual(('ой', 'ою'), endings[9])
+        self.assertEqual(('',), endings[6])
+        self.assertEqual((('',), ('ы',)), (noun_endings('м 1a')[5], noun_endings('м 1a')[2]))
+        self.assertEqual(('а',), noun_endings('мо 1a')[5])
+        self.assertEqual({}, noun_endings('м 0'))
+
+    def testUnsupportedIndex(self):
+        for index in ['м 1b', 'ж 8*b', 'мо-жо 1a', '1a', None]:
+            with self.assertRaises(ValueError):
+                generate('стол', index)
+
+    def testLemmaMustFitIndex(self):
+        with self.assertRaises(ValueError):
+            generate('ко́шка', 'м 1a')
+
+
+class TestCompactParadigm(unittest.TestCase):
+    def testIrregularFormsAreExceptions(self):
+        forms = generate('ребёнок', 'мо 3*a')
+        forms[1] = ('де́ти', forms[1][1])
+        paradigm = compress(forms, 'мо 3*a')
+        self.assertEqual(CompactParadigm('ребёнок', 'мо 3*a', {2: ['де́ти']}), paradigm)
+        self.assertEqual(forms, expand(paradigm))
+
+    def testMissingCodesAreEmptyExceptions(self):
+        forms = [(form, code) for (form, code) in generate('отсу́тствие', 'с 7a') if code in (1, 3, 7, 5, 9, 12)]
+        paradigm = compress(forms, 'с 7a')
+        self.assertEqual({2: [], 4: [], 8: [], 6: [], 11: [], 14: []}, paradigm.exceptions)
+        self.assertEqual(forms, expand(paradigm))
+
+    def testIrregularAdjectiveForms(self):
+        forms = generate('ма́ленький', '3a/a', SpeechPart.ADJECTIVE)
+        short = {229: 'мал', 230: 'мала́', 231: 'мало́', 232: 'малы́'}
+        forms = [(short.get(code, form), code) for (form, code) in forms]
+        paradigm = compress(forms, '3a/a', pos=SpeechPart.ADJECTIVE)
+        self.assertEqual('ма́ленький', paradigm.lemma)
+        self.assertEqual({229: ['мал'], 230: ['мала́'], 231: ['мало́'], 232: ['малы́']}, paradigm.exceptions)
+        self.assertEqual(forms, expand(paradigm))
+
+    def testOtherPartsOfSpeechKeepEveryForm(self):
+        forms = [('мой', 400), ('моего́', 401)]
+        paradigm = compress(forms, '1a', pos=SpeechPart.PRONOUN_POSSESSIVE)
+        self.assertEqual({400: ['мой'], 401: ['моего́']}, paradigm.exceptions)
+        self.assertEqual(forms, expand(paradigm))
+
+    def testUnsupportedIndexKeepsEveryForm(self):
+        forms = [('стол', 1), ('столы́', 2), ('стола́', 3), ('столо́в', 4), ('на столе́', 17)]
+        paradigm = compress(forms, 'м 1b')
+        self.assertEqual({1: ['стол'], 2: ['столы́'], 3: ['стола́'], 4: ['столо́в'], 17: ['на столе́']},
+                         paradigm.exceptions)
+        self.assertEqual(forms, expand(paradigm))
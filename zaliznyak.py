@@ -0,0 +1,453 @@
+import re
+from collections import namedtuple
+from typing import Optional, List, Dict, Tuple
+from grammar import *
+from normalize import split_stress, join_stress
+
+# Noun and adjective paradigms regenerated from the lemma and its Zaliznyak index, as the
+# morphology paragraph of a page gives it ('жо 3*a': feminine, animate, stem type 3,
+# fleeting vowel, stress scheme a; '4a/b': stem type 4, full forms stressed as a, short
+# forms as b). A paradigm is then stored as the lemma, the index and the forms the rules
+# do not produce:
+#
+#   ко́шка      жо 3*a   {}                     every form regular
+#   но         м 0      {}                     indeclinable
+#   ребёнок    мо 3*a   {2: ['де́ти'], ...}      suppletive plural
+#   хоро́ший    4a/b     {}
+#
+# Nouns are generated for stress scheme a (stress on the same stem letter throughout) and
+# stem types 0-8; adjectives for full forms stressed as a, stem types 1-5, and short forms
+# stressed as a, b or c, or none (✕). A paradigm with any other index, or of another part
+# of speech, keeps every form as an exception, so that expanding it still gives back the
+# parsed table.
+ZaliznyakIndex = namedtuple('ZaliznyakIndex', ['gender', 'animate', 'stem_type', 'fleeting', 'stress'])
+ZaliznyakIndex.__doc__ = '''A parsed noun index: gender ('м', 'ж' or 'с'), whether the noun is animate, the stem type
+0-8, whether the stem has a fleeting vowel (*) and the stress scheme letter ('' for type 0)'''
+
+CompactParadigm = namedtuple('CompactParadigm', ['lemma', 'index', 'exceptions', 'pos'],
+                             defaults=(SpeechPart.NOUN,))
+CompactParadigm.__doc__ = '''A paradigm as stored: the stressed lemma, its Zaliznyak index (None if the page has none),
+a dict of inflection code to the forms the rules get wrong, in table order (an empty list is a code the word
+lacks), and the SpeechPart, a noun unless given'''
+
+AdjectiveIndex = namedtuple('AdjectiveIndex', ['stem_type', 'fleeting', 'stress', 'short_stress'])
+AdjectiveIndex.__doc__ = '''A parsed adjective index: the stem type 1-5, whether the short masculine has a fleeting
+vowel (*), the stress scheme letter of the full forms and that of the short forms (None when there are none)'''
+
+NOUN_INDEX = re.compile(r'^(м|ж|с)(о?) ([0-8])(\*?)([a-f]?)$')
+# ✕ marks an adjective without short forms, ~ one whose comparative is awkward, which changes none of its forms
+ADJECTIVE_INDEX = re.compile(r'^([1-6])(\*?)([a-f])(?:/([a-f]))?(✕?)~?$')
+SUPPORTED_STRESS = {'a'}
+SUPPORTED_SHORT_STRESS = {'a', 'b', 'c'}
+
+# endings by (gender, stem type): nominative, genitive, dative, accusative (None: by animacy, as
+# the masculine and neuter), instrumental variants, prepositional; then the nominative and genitive plural
+ENDINGS: Dict[Tuple[str, int], Tuple[str, str, str, Optional[str], Tuple[str, ...], str, str, str]] = {
+    ('м', 1): ('', 'а', 'у', None, ('ом',), 'е', 'ы', 'ов'),
+    ('м', 2): ('ь', 'я', 'ю', None, ('ем',), 'е', 'и', 'ей'),
+    ('м', 3): ('', 'а', 'у', None, ('ом',), 'е', 'и', 'ов'),
+    ('м', 4): ('', 'а', 'у', None, ('ем',), 'е', 'и', 'ей'),
+    ('м', 5): ('', 'а', 'у', None, ('ем',), 'е', 'ы', 'ев'),
+    ('м', 6): ('й', 'я', 'ю', None, ('ем',), 'е', 'и', 'ев'),
+    ('м', 7): ('й', 'я', 'ю', None, ('ем',), 'и', 'и', 'ев'),
+    ('ж', 1): ('а', 'ы', 'е', 'у', ('ой', 'ою'), 'е', 'ы', ''),
+    ('ж', 2): ('я', 'и', 'е', 'ю', ('ей', 'ею'), 'е', 'и', 'ь'),
+    ('ж', 3): ('а', 'и', 'е', 'у', ('ой', 'ою'), 'е', 'и', ''),
+    ('ж', 4): ('а', 'и', 'е', 'у', ('ей', 'ею'), 'е', 'и', ''),
+    ('ж', 5): ('а', 'ы', 'е', 'у', ('ей', 'ею'), 'е', 'ы', ''),
+    ('ж', 6): ('я', 'и', 'е', 'ю', ('ей', 'ею'), 'е', 'и', 'й'),
+    ('ж', 7): ('я', 'и', 'и', 'ю', ('ей', 'ею'), 'и', 'и', 'й'),
+    ('ж', 8): ('ь', 'и', 'и', 'ь', ('ью',), 'и', 'и', 'ей'),
+    ('с', 1): ('о', 'а', 'у', None, ('ом',), 'е', 'а', ''),
+    ('с', 2): ('е', 'я', 'ю', None, ('ем',), 'е', 'я', 'ей'),
+    ('с', 3): ('о', 'а', 'у', None, ('ом',), 'е', 'а', ''),
+    ('с', 4): ('е', 'а', 'у', None, ('ем',), 'е', 'а', ''),
+    ('с', 5): ('е', 'а', 'у', None, ('ем',), 'е', 'а', ''),
+    ('с', 6): ('е', 'я', 'ю', None, ('ем',), 'е', 'я', 'й'),
+    ('с', 7): ('е', 'я', 'ю', None, ('ем',), 'и', 'я', 'й'),
+}
+# dative, instrumental and prepositional plural after a hard and a soft stem
+HARD_PLURAL = ('ам', 'ами', 'ах')
+SOFT_PLURAL = ('ям', 'ями', 'ях')
+SOFT_TYPES = {2, 6, 7, 8}
+SIBILANTS = 'жшчщ'
+VELARS = 'кгх'
+VOWELS = 'аеёиоуыэюя'
+# written endings that are zero endings: no letter, or a soft sign or й that only spells the stem's
+# last consonant (дынь, ли́ний)
+ZERO_ENDINGS = {'', 'ь', 'й'}
+
+# full adjective endings by stem type: masculine (nominative, genitive, dative, instrumental, prepositional),
+# feminine (nominative, genitive, dative, accusative, instrumental variants, prepositional), neuter nominative
+# and plural (nominative, genitive, dative, instrumental, prepositional); the neuter's other cases are the
+# masculine's
+ADJECTIVE_ENDINGS = {
+    1: (('ый', 'ого', 'ому', 'ым', 'ом'), ('ая', 'ой', 'ой', 'ую', ('ой', 'ою'), 'ой'), 'ое',
+        ('ые', 'ых', 'ым', 'ыми', 'ых')),
+    2: (('ий', 'его', 'ему', 'им', 'ем'), ('яя', 'ей', 'ей', 'юю', ('ей', 'ею'), 'ей'), 'ее',
+        ('ие', 'их', 'им', 'ими', 'их')),
+    3: (('ий', 'ого', 'ому', 'им', 'ом'), ('ая', 'ой', 'ой', 'ую', ('ой', 'ою'), 'ой'), 'ое',
+        ('ие', 'их', 'им', 'ими', 'их')),
+    4: (('ий', 'его', 'ему', 'им', 'ем'), ('ая', 'ей', 'ей', 'ую', ('ей', 'ею'), 'ей'), 'ее',
+        ('ие', 'их', 'им', 'ими', 'их')),
+    5: (('ый', 'его', 'ему', 'ым', 'ем'), ('ая', 'ей', 'ей', 'ую', ('ей', 'ею'), 'ей'), 'ее',
+        ('ые', 'ых', 'ым', 'ыми', 'ых')),
+}
+# short adjective endings by stem type: masculine, feminine, neuter when unstressed and when stressed, plural
+SHORT_ENDINGS = {
+    1: ('', 'а', 'о', 'о', 'ы'),
+    2: ('ь', 'я', 'е', 'е', 'и'),
+    3: ('', 'а', 'о', 'о', 'и'),
+    4: ('', 'а', 'е', 'о', 'и'),
+    5: ('', 'а', 'е', 'о', 'ы'),
+}
+
+
+def noun_codes() -> List[Tuple[str, str, int]]:
+    """
+    Returns the noun inflection codes in the order Noun.inflection_code_list gives them
+    :return: A list of (case, 'singular' or 'plural', code) tuples, without the locative and vocative
+    """
+    codes = load_inflection_codes()['noun']
+    cases = ['nominative', 'genitive', 'dative', 'accusative', 'instrumental', 'prepositional']
+    return [(case, number, codes[number][case]) for case in cases for number in ('singular', 'plural')]
+
+
+def parse_index(index: str) -> ZaliznyakIndex:
+    """
+    Parses a noun's Zaliznyak index
+    :param index: The index as zaliznyak_index reads it, e.g. 'жо 3*a'
+    :return: The parsed index
+    :raises ValueError: for an index the rules cannot generate
+    """
+    match = NOUN_INDEX.match(index or '')
+    if match is None:
+        raise ValueError(f'Not a noun index the rules cover: {index!r}')
+    (gender, animate, stem_type, fleeting, stress) = match.groups()
+    parsed = ZaliznyakIndex(gender, bool(animate), int(stem_type), bool(fleeting), stress)
+    if parsed.stem_type != 0 and (parsed.stress not in SUPPORTED_STRESS or (gender, parsed.stem_type) not in
+                                  ENDINGS):
+        raise ValueError(f'Not a noun index the rules cover: {index!r}')
+    if parsed.fleeting and (parsed.stem_type in SOFT_TYPES or parsed.stem_type == 0):
+        raise ValueError(f'Not a noun index the rules cover: {index!r}')
+    return parsed
+
+
+def drop_vowel(stem: str) -> Tuple[str, int]:
+    """
+    Removes the fleeting vowel of a masculine stem: па́лец → па́льц, за́яц → за́йц, ры́нок → ры́нк
+    :param stem: The stem without stress marks
+    :return: The stem and the index of the change
+    :raises ValueError: if the stem does not end in a vowel and a consonant
+    """
+    at = len(stem) - 2
+    if at < 1 or stem[at] not in 'оеёя' or stem[-1] in VOWELS:
+        raise ValueError(f'No fleeting vowel in {stem}')
+    if stem[at - 1] in VOWELS:
+        return stem[:at] + 'й' + stem[-1], at
+    if stem[at - 1] == 'л' and stem[at] != 'о':
+        return stem[:at] + 'ь' + stem[-1], at
+    return stem[:at] + stem[-1], at
+
+
+def insert_vowel(stem: str) -> Tuple[str, int]:
+    """
+    Inserts the fleeting vowel of a feminine or neuter genitive plural: ко́шк → ко́шек, ло́дк → ло́док,
+    копе́йк → копе́ек
+    :param stem: The stem without stress marks
+    :return: The stem and the index of the change
+    :raises ValueError: if the stem does not end in two consonants
+    """
+    if len(stem) < 3 or stem[-1] in VOWELS or stem[-2] in VOWELS:
+        raise ValueError(f'No place for a fleeting vowel in {stem}')
+    (first, last) = (stem[-2], stem[-1])
+    if first in 'йь':
+        return stem[:-2] + 'е' + last, len(stem) - 2
+    if first in VELARS or (last in VELARS and first not in SIBILANTS + 'ц'):
+        vowel = 'о'
+    else:
+        vowel = 'е'
+    return stem[:-1] + vowel + last, len(stem) - 1
+
+
+def noun_endings(index: str) -> Dict[int, Tuple[str, ...]]:
+    """
+    Returns the endings the rules give a noun, without needing its lemma
+    :param index: The noun's Zaliznyak index, e.g. 'ж 3*a'
+    :return: A dict of inflection code to its endings (the instrumental singular may have two); the
+    plural dative, instrumental and prepositional of type 8 are given soft, although a stem in a sibilant
+    takes them hard. An indeclinable noun (type 0) has no endings, so the dict is empty
+    :raises ValueError: for an index the rules cannot generate
+    """
+    parsed = parse_index(index)
+    if parsed.stem_type == 0:
+        return {}
+    (nominative, genitive, dative, accusative, instrumental, prepositional, plural, genitive_plural) = \
+        ENDINGS[(parsed.gender, parsed.stem_type)]
+    if accusative is None:
+        accusative = genitive if parsed.animate and parsed.gender == 'м' else nominative
+    plural_endings = SOFT_PLURAL if parsed.stem_type in SOFT_TYPES else HARD_PLURAL
+    singular = {'nominative': (nominative,), 'genitive': (genitive,), 'dative': (dative,),
+                'accusative': (accusative,), 'instrumental': instrumental, 'prepositional': (prepositional,)}
+    plurals = {'nominative': (plural,), 'genitive': (genitive_plural,), 'dative': (plural_endings[0],),
+               'accusative': (genitive_plural if parsed.animate else plural,),
+               'instrumental': (plural_endings[1],), 'prepositional': (plural_endings[2],)}
+    return {code: (singular if number == 'singular' else plurals)[case] for (case, number, code) in noun_codes()}
+
+
+def generate_noun(lemma: str, index: str) -> List[Tuple[str, int]]:
+    """
+    Generates a noun's paradigm
+    :param lemma: The nominative singular, stress-marked as the page gives it
+    :param index: The noun's Zaliznyak index, e.g. 'м 1a'
+    :return: A list of (form, inflection code) tuples, in the order of Noun.inflection_code_list
+    :raises ValueError: for an index the rules cannot generate, or a lemma that does not fit it
+    """
+    parsed = parse_index(index)
+    if parsed.stem_type == 0:
+        return [(lemma, code) for (case, number, code) in noun_codes()]
+    (bare, stress) = split_stress(lemma)
+    endings = ENDINGS[(parsed.gender, parsed.stem_type)]
+    (nominative, genitive, dative, accusative, instrumental, prepositional, plural, genitive_plural) = endings
+    if not bare.endswith(nominative) or len(bare) == len(nominative) or (not nominative and bare[-1] in VOWELS):
+        raise ValueError(f'{lemma} does not end in -{nominative} as {index} declines')
+    stem = bare[:len(bare) - len(nominative)]
+    oblique = stem
+    if parsed.fleeting and parsed.gender == 'м':
+        (oblique, at) = drop_vowel(stem)
+        if stress == at:
+            raise ValueError(f'The fleeting vowel of {lemma} is stressed')
+    plural_endings = SOFT_PLURAL if parsed.stem_type in SOFT_TYPES else HARD_PLURAL
+    if parsed.stem_type == 8 and stem[-1] in SIBILANTS:
+        plural_endings = HARD_PLURAL
+
+    def form(ending: str, base: str = oblique, position: Optional[int] = stress) -> str:
+        return join_stress(base + ending, position)
+
+    genitive_plural_form = form(genitive_plural)
+    if parsed.fleeting and genitive_plural == '':
+        (inserted, at) = insert_vowel(stem)
+        genitive_plural_form = join_stress(inserted, stress if stress is None or stress < at else stress + 1)
+    nominative_plural_form = form(plural)
+    singular = {
+        'nominative': [lemma],
+        'genitive': [form(genitive)],
+        'dative': [form(dative)],
+        'instrumental': [form(ending) for ending in instrumental],
+        'prepositional': [form(prepositional)],
+    }
+    if accusative is not None:
+        singular['accusative'] = [form(accusative, stem, stress)]
+    elif parsed.animate and parsed.gender == 'м':
+        singular['accusative'] = singular['genitive']
+    else:
+        singular['accusative'] = [lemma]
+    plurals = {
+        'nominative': [nominative_plural_form],
+        'genitive': [genitive_plural_form],
+        'dative': [form(plural_endings[0])],
+        'accusative': [genitive_plural_form if parsed.animate else nominative_plural_form],
+        'instrumental': [form(plural_endings[1])],
+        'prepositional': [form(plural_endings[2])],
+    }
+    forms = []
+    for (case, number, code) in noun_codes():
+        forms.extend((word, code) for word in (singular if number == 'singular' else plurals)[case])
+    return forms
+
+
+def parse_adjective_index(index: str) -> AdjectiveIndex:
+    """
+    Parses an adjective's Zaliznyak index
+    :param index: The index as zaliznyak_index reads it, e.g. '4a/b' or '3a✕~'
+    :return: The parsed index
+    :raises ValueError: for an index the rules cannot generate
+    """
+    match = ADJECTIVE_INDEX.match(index or '')
+    if match is None:
+        raise ValueError(f'Not an adjective index the rules cover: {index!r}')
+    (stem_type, fleeting, stress, short_stress, no_short) = match.groups()
+    parsed = AdjectiveIndex(int(stem_type), bool(fleeting), stress, None if no_short else short_stress or stress)
+    if parsed.stem_type not in ADJECTIVE_ENDINGS or parsed.stress not in SUPPORTED_STRESS or \
+            (parsed.short_stress is not None and parsed.short_stress not in SUPPORTED_SHORT_STRESS) or \
+            (parsed.fleeting and parsed.stem_type == 2):
+        raise ValueError(f'Not an adjective index the rules cover: {index!r}')
+    return parsed
+
+
+def adjective_inflection(masculine: Optional[str], feminine: Optional[str], neuter: Optional[str],
+                         plural: Optional[str]) -> AdjectiveInflection:
+    inflection = AdjectiveInflection()
+    (inflection.masculine, inflection.feminine, inflection.neuter, inflection.plural) = \
+        (masculine, feminine, neuter, plural)
+    return inflection
+
+
+def short_forms(stem: str, stress: int, parsed: AdjectiveIndex) -> AdjectiveInflection:
+    """
+    Generates an adjective's short forms
+    :param stem: The stem without stress marks
+    :param stress: The index of the stressed letter of the full forms
+    :param parsed: The parsed index
+    :return: The short masculine, feminine, neuter and plural
+    """
+    (masculine, feminine, neuter_unstressed, neuter_stressed, plural) = SHORT_ENDINGS[parsed.stem_type]
+    # b stresses every ending, c only the feminine's; a masculine with stress b takes it on its last vowel
+    on_ending = {'feminine': parsed.short_stress in ('b', 'c'), 'other': parsed.short_stress == 'b'}
+    (base, position) = (stem, stress)
+    if parsed.fleeting:
+        (base, at) = insert_vowel(stem)
+        if on_ending['other']:
+            position = at
+            if base[at] == 'е':
+                base = base[:at] + 'ё' + base[at + 1:]
+        elif stress >= at:
+            position = stress + 1
+    elif on_ending['other']:
+        position = max(idx for (idx, letter) in enumerate(stem) if letter in VOWELS)
+
+    def short(ending: str, stressed: bool) -> str:
+        return join_stress(stem + ending, len(stem) if stressed else stress)
+
+    return adjective_inflection(
+        join_stress(base + masculine, position),
+        short(feminine, on_ending['feminine']),
+        short(neuter_stressed if on_ending['other'] else neuter_unstressed, on_ending['other']),
+        short(plural, on_ending['other']))
+
+
+def generate_adjective(lemma: str, index: str) -> List[Tuple[Optional[str], int]]:
+    """
+    Generates an adjective's paradigm
+    :param lemma: The masculine nominative singular, stress-marked as the page gives it
+    :param index: The adjective's Zaliznyak index, e.g. '4a/b'
+    :return: A list of (form, inflection code) tuples, as Adjective.inflection_code_list gives them
+    :raises ValueError: for an index the rules cannot generate, or a lemma that does not fit it
+    """
+    parsed = parse_adjective_index(index)
+    (bare, stress) = split_stress(lemma)
+    (masculine, feminine, neuter, plural) = ADJECTIVE_ENDINGS[parsed.stem_type]
+    stem = bare[:-2]
+    if not bare.endswith(masculine[0]) or not stem:
+        raise ValueError(f'{lemma} does not end in -{masculine[0]} as {index} declines')
+    if stress is None or stress >= len(stem):
+        raise ValueError(f'{lemma} is not stressed on its stem as {index} is')
+
+    def full(endings):
+        return [join_stress(stem + ending, stress) if isinstance(ending, str)
+                else ' '.join(join_stress(stem + variant, stress) for variant in ending) for ending in endings]
+
+    (m, f, p) = (full(masculine), full(feminine), full(plural))
+    n = full([neuter])[0]
+    # the forms go through an Adjective so that they come out in the order, and with the repeats, of a parsed one
+    adjective = Adjective(lemma)
+    adjective.nominative = adjective_inflection(m[0], f[0], n, p[0])
+    adjective.genitive = adjective_inflection(m[1], f[1], m[1], p[1])
+    adjective.dative = adjective_inflection(m[2], f[2], m[2], p[2])
+    adjective.accusative_animate = adjective_inflection(m[1], f[3], n, p[1])
+    adjective.accusative_inanimate = adjective_inflection(m[0], f[3], n, p[0])
+    adjective.instrumental = adjective_inflection(m[3], f[4], m[3], p[3])
+    adjective.prepositional = adjective_inflection(m[4], f[5], m[4], p[4])
+    if parsed.short_stress is not None:
+        adjective.short_form = short_forms(stem, stress, parsed)
+    return adjective.inflection_code_list
+
+
+def generate(lemma: str, index: str, pos: SpeechPart = SpeechPart.NOUN) -> List[Tuple[str, int]]:
+    """
+    Generates a paradigm
+    :param lemma: The dictionary form, stress-marked as the page gives it
+    :param index: The Zaliznyak index
+    :param pos: SpeechPart.NOUN or SpeechPart.ADJECTIVE
+    :return: A list of (form, inflection code) tuples, in the order of the part of speech's inflection_code_list,
+    without the forms the word lacks
+    :raises ValueError: for another part of speech, an index the rules cannot generate or a lemma that does not fit it
+    """
+    if pos == SpeechPart.NOUN:
+        return generate_noun(lemma, index)
+    if pos == SpeechPart.ADJECTIVE:
+        return [(word, code) for (word, code) in generate_adjective(lemma, index) if word]
+    raise ValueError(f'No rules for {pos} paradigms')
+
+
+def forms_by_code(forms: List[Tuple[str, int]]) -> Dict[int, List[str]]:
+    grouped: Dict[int, List[str]] = {}
+    for (word, code) in forms:
+        grouped.setdefault(code, []).append(word)
+    return grouped
+
+
+def lemma_codes(pos: SpeechPart) -> List[int]:
+    """
+    Returns the codes whose form is the stressed lemma
+    :param pos: The SpeechPart
+    :return: The codes, by preference
+    """
+    codes = load_inflection_codes()
+    if pos == SpeechPart.ADJECTIVE:
+        # the inanimate accusative equals the nominative, and Adjective.inflection_code_list gives only the former
+        masculine = codes['adj']['masculine']
+        return [masculine['nominative'], masculine['accusative']['inanimate']]
+    return [codes['noun']['singular']['nominative']]
+
+
+def generated_forms(lemma: str, index: Optional[str], pos: SpeechPart) -> List[Tuple[str, int]]:
+    try:
+        return generate(lemma, index, pos)
+    except ValueError:
+        return []
+
+
+def compress(forms: List[Tuple[Optional[str], int]], index: Optional[str], lemma: Optional[str] = None,
+             pos: SpeechPart = SpeechPart.NOUN) -> CompactParadigm:
+    """
+    Reduces a parsed paradigm to the lemma, the index and the forms the rules get wrong
+    :param forms: (form, inflection code) tuples, as inflection_code_list returns them; missing forms (None)
+    are dropped, as the lexicon drops them
+    :param index: The word's Zaliznyak index, or None
+    :param lemma: The stressed lemma; None for the first form of the part of speech's lemma codes
+    :param pos: The SpeechPart, which chooses the rules
+    :return: The compact paradigm; expand gives the same forms back, and in the same order unless the rules do not
+    cover the index and a code recurs apart from its first forms (as an adjective's feminine accusative does)
+    """
+    forms = [(word, code) for (word, code) in forms if word]
+    grouped = forms_by_code(forms)
+    if lemma is None:
+        lemma = next((grouped[code][0] for code in lemma_codes(pos) if code in grouped), forms[0][0])
+    generated = forms_by_code(generated_forms(lemma, index, pos))
+    exceptions = {code: words for (code, words) in grouped.items() if generated.get(code) != words}
+    exceptions.update((code, []) for code in generated if code not in grouped)
+    return CompactParadigm(lemma, index, exceptions, pos)
+
+
+def expand(paradigm: CompactParadigm) -> List[Tuple[str, int]]:
+    """
+    Regenerates a paradigm from its compact form
+    :param paradigm: The compact paradigm
+    :return: A list of (form, inflection code) tuples: the generated forms in the order of the part of
+    speech's inflection_code_list, a code's exceptions where its first form would be, then the codes only
+    the exceptions have, in their order
+    """
+    generated = generated_forms(paradigm.lemma, paradigm.index, paradigm.pos)
+    forms = []
+    for (idx, (word, code)) in enumerate(generated):
+        if code not in paradigm.exceptions:
+            forms.append((word, code))
+        elif all(earlier != code for (_, earlier) in generated[:idx]):
+            forms.extend((exception, code) for exception in paradigm.exceptions[code])
+    codes = {code for (word, code) in generated}
+    forms.extend((word, code) for (code, words) in paradigm.exceptions.items() if code not in codes for word in words)
+    return forms
+
+
+# grammar classes whose own pos is not their SpeechPart (AdjectiveLike objects record ADJECTIVE)
+WORD_POS = {PossessivePronoun: SpeechPart.PRONOUN_POSSESSIVE, DemonstrativePronoun: SpeechPart.PRONOUN_DEMONSTRATIVE}
+
+
+def compress_word(word: Word) -> CompactParadigm:
+    """
+    Returns the compact paradigm of a parsed grammar object
+    :param word: The grammar object, with the index the parser read in its zaliznyak attribute
+    :return: The compact paradigm; only nouns and adjectives have rules, so any other keeps all its forms
+    """
+    return compress(word.inflection_code_list, word.zaliznyak, pos=WORD_POS.get(type(word), word.pos))